@@ -2,6 +2,7 @@ from flask import Flask, render_template, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from markupsafe import Markup
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 from dotenv import load_dotenv
 
@@ -45,6 +46,9 @@ def create_app(test_config=None):
         NOTIFICATION_CHECK_INTERVAL=int(
             os.environ.get("NOTIFICATION_CHECK_INTERVAL", 60)
         ),
+        # 前段のプロキシの数（Renderなどのプロキシ経由の場合に1以上を設定すると、
+        # X-Forwarded-Forの接続元IPアドレスをrequest.remote_addrとして使う）
+        PROXY_FIX_X_FOR=int(os.environ.get("PROXY_FIX_X_FOR", 0)),
     )
 
     if test_config is None:
@@ -54,6 +58,11 @@ def create_app(test_config=None):
         # テスト設定を読み込む
         app.config.from_mapping(test_config)
 
+    # プロキシ経由の場合は接続元IPアドレスをX-Forwarded-Forから取得する
+    # （ログインの試行制限をクライアントごとに行うため）
+    if app.config["PROXY_FIX_X_FOR"]:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"])
+
     # インスタンスフォルダが確実に存在するようにする
     try:
         os.makedirs(app.instance_path)
@@ -88,8 +97,24 @@ def create_app(test_config=None):
         photo,
         air_conditioner,
         schedule,
+        schedule_exception,
+        notification_log,
+        outbox_message,
+        notification_digest,
+        pdf_job,
+        monthly_rollup,
     )
 
+    # 受注月間表の集計済みテーブルを変更に合わせて更新するイベントを登録
+    from app.services.monthly_rollup_service import monthly_rollup_service
+
+    monthly_rollup_service.register()
+
+    # スケジュールの保存時に次の通知日時を更新するイベントを登録
+    from app.services.notification_queue_service import notification_queue_service
+
+    notification_queue_service.register()
+
     # ルートの登録
     from app.routes import (
         main,
@@ -135,8 +160,17 @@ def create_app(test_config=None):
         try:
             from app.services.scheduler_service import scheduler_service
 
-            scheduler_service.start()
+            scheduler_service.start(app)
         except Exception as e:
             print(f"スケジューラー開始エラー: {e}")
 
+        # 待機中のまま残っているPDF生成ジョブを再開
+        try:
+            from app.services.pdf_job_service import pdf_job_service
+
+            with app.app_context():
+                pdf_job_service.requeue_pending()
+        except Exception as e:
+            print(f"PDFジョブ再開エラー: {e}")
+
     return app
@@ -9,3 +9,9 @@ from app.models.work_time import WorkTime
 from app.models.work_detail import WorkDetail
 from app.models.work_item import WorkItem
 from app.models.schedule import Schedule
+from app.models.pdf_job import PdfJob
+from app.models.monthly_rollup import MonthlyRollup
+from app.models.schedule_exception import ScheduleException
+from app.models.notification_log import NotificationLog
+from app.models.outbox_message import OutboxMessage
+from app.models.notification_digest import NotificationDigest
@@ -0,0 +1,31 @@
+from app import db
+from datetime import datetime
+
+
+class MonthlyRollup(db.Model):
+    """受注月間表の集計済みデータモデル（作業月・受付種別・ステータスごと）"""
+
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "year", "month", "reception_type", "status", name="uq_monthly_rollup_key"
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    year = db.Column(db.Integer, nullable=False)  # 作業年
+    month = db.Column(db.Integer, nullable=False)  # 作業月
+    reception_type = db.Column(db.String(50), nullable=False)  # 受付種別
+    status = db.Column(db.String(20), nullable=False)  # 報告書のステータス
+
+    # 集計値
+    report_count = db.Column(db.Integer, default=0, nullable=False)  # 件数
+    ac_quantity = db.Column(db.Integer, default=0, nullable=False)  # エアコン台数
+    amount = db.Column(db.Integer, default=0, nullable=False)  # 金額
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return (
+            f"<MonthlyRollup {self.year}-{self.month} {self.reception_type} {self.status}>"
+        )
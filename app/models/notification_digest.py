@@ -0,0 +1,42 @@
+from app import db
+from datetime import datetime
+
+
+class NotificationDigest(db.Model):
+    """まとめて通知の送信記録モデル（同じ期間のまとめを二重に送信しないために使用）"""
+
+    __tablename__ = "notification_digests"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id",
+            "digest_type",
+            "window_start",
+            name="uq_notification_digest_user_window",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    digest_type = db.Column(db.String(20), nullable=False)  # hourly, daily
+    # まとめる期間の開始日時（dailyはその日の0時、hourlyは対象の1時間の開始日時）
+    window_start = db.Column(db.DateTime, nullable=False)
+    status = db.Column(
+        db.String(20), default="sending", nullable=False
+    )  # sending, sent, empty（対象のスケジュールなし）
+    schedule_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    # リレーションシップ
+    user = db.relationship(
+        "User",
+        backref=db.backref(
+            "notification_digests", lazy=True, cascade="all, delete-orphan"
+        ),
+    )
+
+    def __repr__(self):
+        return (
+            f"<NotificationDigest {self.user_id} {self.digest_type} "
+            f"{self.window_start}>"
+        )
@@ -0,0 +1,43 @@
+from app import db
+from datetime import datetime
+
+
+class NotificationLog(db.Model):
+    """スケジュール通知の送信記録モデル（同じ通知を二重に送信しないために使用）"""
+
+    __tablename__ = "notification_logs"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "schedule_id",
+            "occurrence_date",
+            "notification_type",
+            name="uq_notification_log_occurrence_type",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    schedule_id = db.Column(
+        db.Integer, db.ForeignKey("schedules.id"), nullable=False
+    )
+    # 開始日（繰り返しスケジュールの場合は回の本来の開始日）
+    occurrence_date = db.Column(db.Date, nullable=False)
+    notification_type = db.Column(db.String(20), nullable=False)  # reminder, start
+    status = db.Column(
+        db.String(20), default="sending", nullable=False
+    )  # sending, sent
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    # リレーションシップ
+    schedule = db.relationship(
+        "Schedule",
+        backref=db.backref(
+            "notification_logs", lazy=True, cascade="all, delete-orphan"
+        ),
+    )
+
+    def __repr__(self):
+        return (
+            f"<NotificationLog {self.schedule_id} {self.occurrence_date} "
+            f"{self.notification_type}>"
+        )
@@ -0,0 +1,54 @@
+from app import db
+from datetime import datetime
+
+
+class OutboxMessage(db.Model):
+    """送信待ちメールモデル（送信はバックグラウンドの送信処理で行う）"""
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        # 送信処理で送信日時になった待機中のメールを取得するためのインデックス
+        db.Index("ix_outbox_messages_status_next_attempt", "status", "next_attempt_at"),
+        # 直近1分間の送信数（送信数の制限）を求めるためのインデックス
+        db.Index("ix_outbox_messages_sent_at", "sent_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    to_addresses = db.Column(db.Text, nullable=False)  # カンマ区切り
+    subject = db.Column(db.String(255), nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+    text_body = db.Column(db.Text)
+
+    status = db.Column(
+        db.String(20), default="queued", nullable=False
+    )  # queued, sending, sent, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)  # 送信を試みた回数
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+
+    # 外部キー
+    created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+
+    # システム項目
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)  # 送信を開始した日時（送信中のまま残った判定用）
+    sent_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<OutboxMessage {self.id} - {self.status}>"
+
+    @property
+    def recipients(self):
+        """送信先メールアドレスのリスト"""
+        return [address for address in self.to_addresses.split(",") if address]
+
+    @property
+    def status_display(self):
+        """ステータスの日本語表示"""
+        status_map = {
+            "queued": "送信待ち",
+            "sending": "送信中",
+            "sent": "送信済み",
+            "failed": "送信失敗",
+        }
+        return status_map.get(self.status, self.status)
@@ -0,0 +1,61 @@
+from app import db
+from datetime import datetime
+import uuid
+
+
+class PdfJob(db.Model):
+    """報告書PDFのバックグラウンド生成ジョブモデル"""
+
+    __tablename__ = "pdf_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # 状態確認・ダウンロードURLに使う推測されにくいID
+    token = db.Column(
+        db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4())
+    )
+    status = db.Column(
+        db.String(20), default="queued", nullable=False
+    )  # queued, running, completed, failed
+    progress = db.Column(db.Integer, default=0)  # 進捗（0〜100）
+    file_path = db.Column(db.String(500))  # 生成したPDFの保存先
+    error_message = db.Column(db.Text)
+
+    # 外部キー
+    report_id = db.Column(db.Integer, db.ForeignKey("reports.id"), nullable=False)
+    requested_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+
+    # システム項目
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    # リレーションシップ
+    report = db.relationship("Report", backref="pdf_jobs", lazy=True)
+
+    def __repr__(self):
+        return f"<PdfJob {self.token} - {self.status}>"
+
+    def to_dict(self):
+        """ジョブ情報を辞書形式で返す"""
+        return {
+            "job_id": self.token,
+            "report_id": self.report_id,
+            "status": self.status,
+            "status_display": self.status_display,
+            "progress": self.progress,
+            "error_message": self.error_message,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    @property
+    def status_display(self):
+        """ステータスの日本語表示"""
+        status_map = {
+            "queued": "待機中",
+            "running": "作成中",
+            "completed": "完了",
+            "failed": "失敗",
+        }
+        return status_map.get(self.status, self.status)
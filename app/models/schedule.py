@@ -2,10 +2,31 @@ from app import db
 from datetime import datetime
 
 
+# 繰り返しの種類（recurrence_typeの値）
+RECURRENCE_TYPES = ("daily", "weekly", "monthly")
+RECURRENCE_TYPE_DISPLAY = {"daily": "毎日", "weekly": "毎週", "monthly": "毎月"}
+
+
 class Schedule(db.Model):
     """スケジュール管理モデル"""
 
     __tablename__ = "schedules"
+    __table_args__ = (
+        # カレンダー表示の期間・ステータス絞り込み用
+        db.Index("ix_schedules_start_datetime_status", "start_datetime", "status"),
+        # 報告書との同期・削除時の検索用
+        db.Index("ix_schedules_report_id", "report_id"),
+        # 繰り返しスケジュールの検索用（繰り返しの行のみを含む部分インデックス）
+        db.Index(
+            "ix_schedules_recurring",
+            "recurrence_type",
+            "start_datetime",
+            sqlite_where=db.text("recurrence_type IS NOT NULL"),
+            postgresql_where=db.text("recurrence_type IS NOT NULL"),
+        ),
+        # 通知チェックで送信時刻になったスケジュールを取得する用
+        db.Index("ix_schedules_next_notification_at", "next_notification_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)  # スケジュールタイトル
@@ -27,13 +48,15 @@ class Schedule(db.Model):
     google_calendar_id = db.Column(db.String(500))  # GoogleカレンダーのイベントID
     google_calendar_sync = db.Column(db.Boolean, default=False)  # 同期フラグ
 
-    # 繰り返し設定（後のフェーズで使用）
+    # 繰り返し設定（元のスケジュール1件のみ保存し、表示期間の分だけ展開する）
     recurrence_type = db.Column(db.String(20))  # none, daily, weekly, monthly
-    recurrence_end = db.Column(db.Date)  # 繰り返し終了日
+    recurrence_end = db.Column(db.Date)  # 繰り返し終了日（この日を含む）
 
     # 通知設定
     notification_enabled = db.Column(db.Boolean, default=True)
     notification_minutes = db.Column(db.Integer, default=30)  # 何分前に通知
+    # 次に通知を確認する日時（保存時・通知送信後に更新、通知がない場合はNone）
+    next_notification_at = db.Column(db.DateTime)
 
     # システム項目
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
@@ -48,9 +71,22 @@ class Schedule(db.Model):
     report = db.relationship("Report", backref="schedules", lazy=True)
     creator = db.relationship("User", backref="schedules", lazy=True)
 
+    # 繰り返しの展開結果ではない（ScheduleOccurrenceと同じ属性で扱うため）
+    occurrence_date = None
+
     def __repr__(self):
         return f"<Schedule {self.title} - {self.start_datetime}>"
 
+    @property
+    def is_recurring(self):
+        """繰り返しスケジュールかどうか"""
+        return self.recurrence_type in RECURRENCE_TYPES
+
+    @property
+    def recurrence_type_display(self):
+        """繰り返しの種類の日本語表示"""
+        return RECURRENCE_TYPE_DISPLAY.get(self.recurrence_type, "なし")
+
     def to_dict(self):
         """スケジュール情報を辞書形式で返す"""
         return {
@@ -73,6 +109,10 @@ class Schedule(db.Model):
             "property_name": (
                 self.schedule_property.name if self.schedule_property else None
             ),
+            "recurrence_type": self.recurrence_type,
+            "recurrence_end": (
+                self.recurrence_end.isoformat() if self.recurrence_end else None
+            ),
             "notification_enabled": self.notification_enabled,
             "notification_minutes": self.notification_minutes,
             "created_by": self.created_by,
@@ -0,0 +1,39 @@
+from app import db
+from datetime import datetime
+
+
+class ScheduleException(db.Model):
+    """繰り返しスケジュールの特定の回の例外（取り消し・日時やステータスの変更）モデル"""
+
+    __tablename__ = "schedule_exceptions"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "schedule_id", "occurrence_date", name="uq_schedule_exception_occurrence"
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    schedule_id = db.Column(
+        db.Integer, db.ForeignKey("schedules.id"), nullable=False
+    )  # 繰り返しの元のスケジュール
+    occurrence_date = db.Column(db.Date, nullable=False)  # 本来の開始日
+    cancelled = db.Column(db.Boolean, default=False, nullable=False)  # この回を取り消し
+
+    # この回だけ変更する値（Noneの場合は元のスケジュールの値を使用）
+    start_datetime = db.Column(db.DateTime)
+    end_datetime = db.Column(db.DateTime)
+    status = db.Column(db.String(20))
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    # リレーションシップ
+    schedule = db.relationship(
+        "Schedule",
+        backref=db.backref("exceptions", lazy=True, cascade="all, delete-orphan"),
+    )
+
+    def __repr__(self):
+        return f"<ScheduleException {self.schedule_id} {self.occurrence_date}>"
@@ -1,7 +1,24 @@
+import os
+from functools import lru_cache
 from app import db
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# パスワードハッシュの方式の既定値（werkzeugの形式。例: scrypt:32768:8:1、pbkdf2:sha256:600000）
+DEFAULT_PASSWORD_HASH_METHOD = 'scrypt'
+
+
+def get_password_hash_method():
+    """パスワードハッシュの方式（環境変数 PASSWORD_HASH_METHOD で変更可能）"""
+    return os.environ.get('PASSWORD_HASH_METHOD') or DEFAULT_PASSWORD_HASH_METHOD
+
+
+@lru_cache(maxsize=8)
+def _password_hash_prefix(method):
+    """方式のパラメータを含むハッシュの先頭部分（例: pbkdf2:sha256:600000）"""
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
 class User(db.Model):
     """ユーザーモデル"""
     
@@ -22,6 +39,25 @@ class User(db.Model):
         ROLE_USER: '一般ユーザー'
     }
     
+    # 操作ごとの権限を持つ権限レベル
+    PERMISSION_ROLES = {
+        'view': [ROLE_ADMIN, ROLE_ALL_ACCESS, ROLE_EDITOR, ROLE_VIEWER, ROLE_USER],
+        'edit': [ROLE_ADMIN, ROLE_ALL_ACCESS, ROLE_EDITOR],
+        'delete': [ROLE_ADMIN, ROLE_ALL_ACCESS],
+        'create': [ROLE_ADMIN, ROLE_ALL_ACCESS]
+    }
+    
+    # スケジュール通知の受け取り方の定数
+    NOTIFICATION_MODE_IMMEDIATE = 'immediate'
+    NOTIFICATION_MODE_HOURLY = 'hourly'
+    NOTIFICATION_MODE_DAILY = 'daily'
+    
+    NOTIFICATION_MODES = {
+        NOTIFICATION_MODE_IMMEDIATE: 'スケジュールごとに通知',
+        NOTIFICATION_MODE_HOURLY: '1時間ごとにまとめて通知（次の1時間の予定）',
+        NOTIFICATION_MODE_DAILY: '1日1回まとめて通知（その日の予定）'
+    }
+    
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -29,6 +65,10 @@ class User(db.Model):
     name = db.Column(db.String(100))
     role = db.Column(db.String(20), default='viewer')  # デフォルトを閲覧のみに変更
     active = db.Column(db.Boolean, default=True)
+    notification_mode = db.Column(
+        db.String(20), default=NOTIFICATION_MODE_IMMEDIATE,
+        server_default=NOTIFICATION_MODE_IMMEDIATE, nullable=False
+    )
     last_login = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -38,36 +78,58 @@ class User(db.Model):
     
     def set_password(self, password):
         """パスワードハッシュを生成して保存"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(
+            password, method=get_password_hash_method()
+        )
     
     def check_password(self, password):
         """パスワードを検証"""
         return check_password_hash(self.password_hash, password)
     
+    def password_needs_rehash(self):
+        """パスワードハッシュの方式・パラメータが現在の設定と異なるかチェック"""
+        current_prefix = _password_hash_prefix(get_password_hash_method())
+        return self.password_hash.split('$', 1)[0] != current_prefix
+    
     def is_admin(self):
         """管理者権限を持つかチェック"""
         return self.role == self.ROLE_ADMIN
     
+    @classmethod
+    def role_has_permission(cls, role, permission):
+        """権限レベルが操作の権限を持つかチェック"""
+        return role in cls.PERMISSION_ROLES.get(permission, [])
+    
     def can_view(self):
         """閲覧権限を持つかチェック"""
-        return self.role in [self.ROLE_ADMIN, self.ROLE_ALL_ACCESS, self.ROLE_EDITOR, self.ROLE_VIEWER, self.ROLE_USER]
+        return self.role_has_permission(self.role, 'view')
     
     def can_edit(self):
         """編集権限を持つかチェック"""
-        return self.role in [self.ROLE_ADMIN, self.ROLE_ALL_ACCESS, self.ROLE_EDITOR]
+        return self.role_has_permission(self.role, 'edit')
     
     def can_delete(self):
         """削除権限を持つかチェック"""
-        return self.role in [self.ROLE_ADMIN, self.ROLE_ALL_ACCESS]
+        return self.role_has_permission(self.role, 'delete')
     
     def can_create(self):
         """作成権限を持つかチェック"""
-        return self.role in [self.ROLE_ADMIN, self.ROLE_ALL_ACCESS]
+        return self.role_has_permission(self.role, 'create')
     
     def get_role_display_name(self):
         """権限の表示名を取得"""
         return self.ROLES.get(self.role, self.role)
     
+    def receives_immediate_notifications(self):
+        """スケジュールごとの通知を受け取るかチェック（まとめて通知の場合はFalse）"""
+        return self.notification_mode not in (
+            self.NOTIFICATION_MODE_HOURLY, self.NOTIFICATION_MODE_DAILY
+        )
+    
+    def get_notification_mode_display_name(self):
+        """通知の受け取り方の表示名を取得"""
+        return self.NOTIFICATION_MODES.get(self.notification_mode, self.notification_mode)
+    
     def to_dict(self):
         """ユーザー情報を辞書形式で返す"""
         return {
@@ -78,6 +140,7 @@ class User(db.Model):
             'role': self.role,
             'role_display': self.get_role_display_name(),
             'active': self.active,
+            'notification_mode': self.notification_mode,
             'last_login': self.last_login.isoformat() if self.last_login else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
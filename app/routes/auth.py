@@ -8,14 +8,25 @@ from flask import (
     session,
     g,
 )
+from werkzeug.local import LocalProxy
 from werkzeug.security import check_password_hash
 from app.models.user import User
+from app.services.user_auth_service import user_auth_service
+from app.services.login_throttle_service import login_throttle_service
 from app import db
 from datetime import datetime
 import functools
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
+# 権限がない場合のメッセージ
+PERMISSION_ERRORS = {
+    "view": "閲覧権限がありません。",
+    "edit": "編集権限がありません。",
+    "create": "作成権限がありません。",
+    "delete": "削除権限がありません。",
+}
+
 
 def login_required(view):
     """ログイン必須デコレータ"""
@@ -37,8 +48,9 @@ def admin_required(view):
         if "user_id" not in session:
             return redirect(url_for("auth.login"))
 
-        user = User.query.get(session["user_id"])
-        if not user or user.role != "admin":
+        # 権限はキャッシュから確認し、リクエストごとにユーザーを検索しない
+        auth = user_auth_service.current_auth()
+        if not auth or auth.role != User.ROLE_ADMIN:
             flash("この操作には管理者権限が必要です。", "danger")
             return redirect(url_for("main.index"))
 
@@ -55,23 +67,16 @@ def permission_required(permission):
             if "user_id" not in session:
                 return redirect(url_for("auth.login"))
 
-            user = User.query.get(session["user_id"])
-            if not user or not user.active:
+            auth = user_auth_service.current_auth()
+            if not auth or not auth.active:
                 flash("アカウントが無効化されています。", "danger")
                 return redirect(url_for("auth.login"))
 
             # 権限チェック
-            if permission == 'view' and not user.can_view():
-                flash("閲覧権限がありません。", "danger")
-                return redirect(url_for("main.index"))
-            elif permission == 'edit' and not user.can_edit():
-                flash("編集権限がありません。", "danger")
-                return redirect(url_for("main.index"))
-            elif permission == 'create' and not user.can_create():
-                flash("作成権限がありません。", "danger")
-                return redirect(url_for("main.index"))
-            elif permission == 'delete' and not user.can_delete():
-                flash("削除権限がありません。", "danger")
+            if permission in PERMISSION_ERRORS and not User.role_has_permission(
+                auth.role, permission
+            ):
+                flash(PERMISSION_ERRORS[permission], "danger")
                 return redirect(url_for("main.index"))
 
             return view(**kwargs)
@@ -108,16 +113,32 @@ def login():
         password = request.form["password"]
         error = None
 
+        # 失敗回数が上限に達している場合はパスワードを検証しない
+        retry_after = login_throttle_service.retry_after(username, request.remote_addr)
+        if retry_after:
+            flash(
+                f"ログインの失敗が続いたため、{retry_after}秒後にもう一度お試しください。",
+                "danger",
+            )
+            return render_template("auth/login.html"), 429
+
         user = User.query.filter_by(username=username).first()
 
         if user is None:
             error = "ユーザー名が正しくありません。"
-        elif not user.check_password(password):
-            error = "パスワードが正しくありません。"
-        elif not user.active:
-            error = "このアカウントは現在無効になっています。"
+        else:
+            verified = login_throttle_service.verify_password(user, password)
+            if verified is None:
+                flash("ログインが混雑しています。しばらくしてからもう一度お試しください。", "danger")
+                return render_template("auth/login.html"), 503
+            if not verified:
+                error = "パスワードが正しくありません。"
+            elif not user.active:
+                error = "このアカウントは現在無効になっています。"
 
         if error is None:
+            login_throttle_service.record_success(username)
+
             # セッションをクリアし、ユーザーIDを保存
             session.clear()
             session["user_id"] = user.id
@@ -128,6 +149,7 @@ def login():
 
             return redirect(url_for("main.index"))
 
+        login_throttle_service.record_failure(username, request.remote_addr)
         flash(error, "danger")
 
     return render_template("auth/login.html")
@@ -145,7 +167,7 @@ def logout():
 @admin_required
 def admin_settings():
     """管理者設定変更"""
-    user = User.query.get(session["user_id"])
+    user = user_auth_service.current_user()
 
     if request.method == "POST":
         current_password = request.form.get("current_password", "").strip()
@@ -223,12 +245,13 @@ def admin_settings():
 @bp.before_app_request
 def load_logged_in_user():
     """リクエスト前にログイン中のユーザー情報をロード"""
-    user_id = session.get("user_id")
+    user_auth_service.start_request()
 
-    if user_id is None:
+    if session.get("user_id") is None:
         g.user = None
     else:
-        g.user = User.query.get(user_id)
+        # 画面の描画などで使われたときにリクエスト中に1回だけ検索する
+        g.user = LocalProxy(user_auth_service.current_user)
 
 
 @bp.route("/admin/users")
@@ -322,6 +345,7 @@ def toggle_user_status(user_id):
     
     try:
         db.session.commit()
+        user_auth_service.invalidate(user.id)
         status = "有効" if user.active else "無効"
         flash(f"ユーザー「{user.username}」を{status}にしました。", "success")
     except Exception as e:
@@ -342,6 +366,9 @@ def edit_user(user_id):
         email = request.form.get("email", "").strip()
         name = request.form.get("name", "").strip()
         role = request.form.get("role", "").strip()
+        notification_mode = request.form.get(
+            "notification_mode", user.notification_mode
+        ).strip()
         new_password = request.form.get("new_password", "").strip()
         confirm_password = request.form.get("confirm_password", "").strip()
         
@@ -362,6 +389,8 @@ def edit_user(user_id):
             error = "そのメールアドレスは既に使用されています。"
         elif not role or role not in User.ROLES:
             error = "有効な権限を選択してください。"
+        elif notification_mode not in User.NOTIFICATION_MODES:
+            error = "有効な通知の受け取り方を選択してください。"
         elif new_password and len(new_password) < 6:
             error = "パスワードは6文字以上で入力してください。"
         elif new_password and new_password != confirm_password:
@@ -379,6 +408,7 @@ def edit_user(user_id):
             user.email = email
             user.name = name if name else username
             user.role = role
+            user.notification_mode = notification_mode
             user.updated_at = datetime.utcnow()
             
             if new_password:
@@ -386,6 +416,7 @@ def edit_user(user_id):
             
             try:
                 db.session.commit()
+                user_auth_service.invalidate(user.id)
                 flash(f"ユーザー「{username}」を更新しました。", "success")
                 return redirect(url_for("auth.user_list"))
             except Exception as e:
@@ -394,4 +425,9 @@ def edit_user(user_id):
         
         flash(error, "danger")
     
-    return render_template("auth/edit_user.html", user=user, roles=User.ROLES)
+    return render_template(
+        "auth/edit_user.html",
+        user=user,
+        roles=User.ROLES,
+        notification_modes=User.NOTIFICATION_MODES,
+    )
@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request
 from app.models.customer import Customer
 from app.models.property import Property
 from app import db
+from app.services.dashboard_service import dashboard_service
 from app.routes.auth import login_required, view_permission_required, edit_permission_required, create_permission_required, delete_permission_required
 from sqlalchemy import or_
 
@@ -61,6 +62,7 @@ def create():
             )
             db.session.add(customer)
             db.session.commit()
+            dashboard_service.invalidate()
             flash("顧客が正常に登録されました", "success")
             return redirect(url_for("customers.list"))
 
@@ -127,6 +129,7 @@ def delete(id):
     try:
         db.session.delete(customer)
         db.session.commit()
+        dashboard_service.invalidate()
         flash("顧客情報が正常に削除されました", "success")
     except Exception as e:
         db.session.rollback()
@@ -1,33 +1,16 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
-from app.models.customer import Customer
-from app.models.property import Property
-from app.models.report import Report
-from app import db
+from app.services.dashboard_service import dashboard_service
 
 bp = Blueprint('main', __name__)
 
 @bp.route('/')
 def index():
     """ダッシュボード画面を表示"""
-    # 統計情報の取得
-    stats = {
-        'customer_count': Customer.query.count(),
-        'property_count': Property.query.count(),
-        'report_count': Report.query.count(),
-        'pending_count': Report.query.filter_by(status='pending').count()
-    }
-    
-    # 最近の報告書を取得（最新5件）
-    recent_reports = Report.query.order_by(Report.created_at.desc()).limit(5).all()
-    
-    # 最近のお客様を取得（最新5件）
-    recent_customers = Customer.query.order_by(Customer.created_at.desc()).limit(5).all()
-    
-    # 最近の物件を取得（最新5件）
-    recent_properties = Property.query.order_by(Property.created_at.desc()).limit(5).all()
+    # 統計情報・最近の登録データはキャッシュから取得（登録・削除時に破棄される）
+    snapshot = dashboard_service.get_snapshot()
     
     return render_template('index.html', 
-                          stats=stats,
-                          recent_reports=recent_reports,
-                          recent_customers=recent_customers,
-                          recent_properties=recent_properties) 
\ No newline at end of file
+                          stats=snapshot['stats'],
+                          recent_reports=snapshot['recent_reports'],
+                          recent_customers=snapshot['recent_customers'],
+                          recent_properties=snapshot['recent_properties']) 
\ No newline at end of file
@@ -21,6 +21,7 @@ from app import db
 from app.models.schedule import Schedule
 from app.models.user import User
 from app.services.email_service import email_service
+from app.services.outbox_service import outbox_service
 from app.routes.auth import login_required, admin_required, view_permission_required
 
 
@@ -64,11 +65,15 @@ def dashboard():
             "upcoming_24h": len(upcoming_schedules),
         }
 
+        # 送信待ちメールの状況
+        outbox = outbox_service.get_status()
+
         return render_template(
             "notifications/dashboard.html",
             upcoming_schedules=upcoming_schedules,
             mail_configured=mail_configured,
             stats=stats,
+            outbox=outbox,
         )
 
     except Exception as e:
@@ -159,18 +164,19 @@ def send_test_email():
 このメールは自動送信されています。
         """
 
-        success = email_service.send_email(
+        # 送信待ちに登録（SMTPでの送信はバックグラウンドで行う）
+        success = email_service.queue_email(
             test_recipients, subject, html_body, text_body
         )
 
         if success:
             flash(
-                f"テストメールを全ユーザー（{len(test_recipients)}名）に送信しました。",
+                f"テストメールを全ユーザー（{len(test_recipients)}名）宛に送信待ちに登録しました。",
                 "success",
             )
         else:
             flash(
-                "テストメールの送信に失敗しました。ログを確認してください。", "danger"
+                "テストメールの登録に失敗しました。ログを確認してください。", "danger"
             )
 
     except Exception as e:
@@ -212,6 +218,7 @@ def api_status():
             "username": (
                 email_service.username[:5] + "*****" if email_service.username else None
             ),
+            "outbox": outbox_service.get_status()["counts"],
             "check_time": datetime.now().isoformat(),
         }
 
@@ -221,6 +228,23 @@ def api_status():
         return jsonify({"error": str(e)}), 500
 
 
+@bp.route("/outbox/<int:message_id>/retry", methods=["POST"])
+@login_required
+@admin_required
+def retry_outbox_message(message_id):
+    """送信失敗のメールを再送"""
+    try:
+        if outbox_service.retry(message_id):
+            flash("メールを送信待ちに戻しました。", "success")
+        else:
+            flash("再送できるメールが見つかりません。", "warning")
+
+    except Exception as e:
+        flash(f"再送エラー: {e}", "danger")
+
+    return redirect(url_for("notifications.dashboard"))
+
+
 @bp.route("/schedule/<int:schedule_id>/send", methods=["POST"])
 @login_required
 @admin_required
@@ -254,11 +278,11 @@ def send_schedule_notification(schedule_id):
             )
 
             flash(
-                f"「{schedule.title}」の{type_names[notification_type]}を全ユーザー（{recipient_count}名）に送信しました。",
+                f"「{schedule.title}」の{type_names[notification_type]}を全ユーザー（{recipient_count}名）宛に送信待ちに登録しました。",
                 "success",
             )
         else:
-            flash("通知の送信に失敗しました。", "danger")
+            flash("通知の登録に失敗しました。", "danger")
 
     except Exception as e:
         flash(f"通知送信エラー: {e}", "danger")
@@ -390,16 +414,17 @@ def send_all_reminder():
 このメールは管理者により送信されました。
         """
 
-        success = email_service.send_email(recipients, subject, html_body, text_body)
+        # 送信待ちに登録（SMTPでの送信はバックグラウンドで行う）
+        success = email_service.queue_email(recipients, subject, html_body, text_body)
 
         if success:
             flash(
-                f"全ユーザー（{len(recipients)}名）にリマインダーを送信しました。",
+                f"全ユーザー（{len(recipients)}名）宛にリマインダーを送信待ちに登録しました。",
                 "success",
             )
         else:
             flash(
-                "リマインダーの送信に失敗しました。ログを確認してください。", "danger"
+                "リマインダーの登録に失敗しました。ログを確認してください。", "danger"
             )
 
     except Exception as e:
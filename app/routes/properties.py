@@ -7,6 +7,7 @@ from app.models.photo import Photo
 from app.models.work_time import WorkTime
 from app.models.work_detail import WorkDetail
 from app import db
+from app.services.dashboard_service import dashboard_service
 from app.routes.auth import (
     login_required,
     view_permission_required,
@@ -226,6 +227,7 @@ def create():
                     )
 
             db.session.commit()
+            dashboard_service.invalidate()
             flash("物件が正常に登録されました", "success")
             return redirect(url_for("properties.view", id=property.id))
 
@@ -374,6 +376,7 @@ def delete_property(id):
 
         # 変更をコミット
         db.session.commit()
+        dashboard_service.invalidate()
 
         flash(f"物件「{property_name}」とすべての関連データが削除されました", "success")
     except Exception as e:
@@ -10,6 +10,7 @@ from flask import (
     send_file,
     Response,
     make_response,
+    g,
 )
 from app.models.report import Report
 from app.models.property import Property
@@ -20,9 +21,12 @@ from app.models.work_item import WorkItem
 from app.models.customer import Customer
 from app.models.air_conditioner import AirConditioner
 from app.models.schedule import Schedule
+from app.models.pdf_job import PdfJob
 from app import db
 from sqlalchemy import or_
+from sqlalchemy.orm import contains_eager
 import os
+import tempfile
 from datetime import datetime, time, date
 from werkzeug.utils import secure_filename
 from app.routes.auth import (
@@ -32,19 +36,29 @@ from app.routes.auth import (
     create_permission_required,
     delete_permission_required,
 )
-from app.services.pdf_service import PDFService
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from app.services.pdf_service import PDFService, create_pdf_output
+from app.services.photo_cache_service import photo_cache_service
+from app.services.pdf_cache_service import pdf_cache_service
+from app.services.pdf_job_service import pdf_job_service
+from app.services.pdf_export_service import pdf_export_service
+from app.services.pdf_theme import pdf_theme
+from app.services.dashboard_service import dashboard_service
+from app.services.summary_service import summary_service, SUMMARY_TYPE_DISPLAY
+from app.services.analytics_service import analytics_service
+from app.services.report_query_service import (
+    report_query_service,
+    status_search_conditions,
+)
+from reportlab.lib.pagesizes import letter, A4, landscape
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
 from reportlab.lib.units import inch
-from io import BytesIO
-from sqlalchemy import func, extract, case
+from sqlalchemy import case
 
 bp = Blueprint("reports", __name__, url_prefix="/reports")
 
+# 受注明細PDFで1回の集計クエリにまとめる報告書数
+ORDER_DETAILS_PDF_BATCH_SIZE = 500
+
 
 def create_schedule_from_work_times(
     report, work_dates, start_times, end_times, property_id
@@ -233,89 +247,15 @@ def list():
     page = request.args.get("page", 1, type=int)
     per_page = 20  # 1ページあたりの表示件数
 
-    # ベースクエリの作成（WorkTimeテーブルもJOINして作業日での検索を可能にする）
-    # WorkTimeテーブルには複数の外部キーがあるため、明示的にJOIN条件を指定
-    query = (
-        Report.query.join(Property)
-        .join(Customer)
-        .outerjoin(WorkTime, Report.id == WorkTime.report_id)
-    )
-
-    # ステータスフィルタ
-    if status:
-        query = query.filter(Report.status == status)
-
-    # 検索フィルタ（顧客名、物件名、作業住所、備考、報告日、作業日、ステータス）
-    if search:
-        search_conditions = [
-            Customer.name.contains(search),
-            Property.name.contains(search),
-            Report.work_address.contains(search),
-            Report.note.contains(search),
-            # 報告日での検索（YYYY-MM-DD形式）
-            Report.date.cast(db.String).contains(search),
-            # 作業日での検索（YYYY-MM-DD形式）
-            WorkTime.work_date.cast(db.String).contains(search),
-            # ステータスでの検索（英語コード）
-            Report.status.contains(search),
-        ]
-
-        # 日本語ステータス検索
-        search_lower = search.lower()
-        if "未完了" in search_lower:
-            search_conditions.append(Report.status == "pending")
-        if "完了" in search_lower and "未完了" not in search_lower:
-            search_conditions.append(Report.status == "completed")
-        if "下書き" in search_lower:
-            search_conditions.append(Report.status == "draft")
-        if "キャンセル" in search_lower:
-            search_conditions.append(Report.status == "cancelled")
-
-        search_filter = or_(*search_conditions)
-        query = query.filter(search_filter)
-
-    # 重複を除去（WorkTimeとのJOINで重複が発生する可能性があるため）
-    query = query.distinct()
-
-    # ソート処理
-    sort_column = None
-    if sort_by == "id":
-        sort_column = Report.id
-    elif sort_by == "date":
-        sort_column = Report.date
-    elif sort_by == "work_date":
-        # 作業日でのソート（最初の作業日を基準）
-        sort_column = WorkTime.work_date
-    elif sort_by == "customer":
-        sort_column = Customer.name
-    elif sort_by == "property":
-        sort_column = Property.name
-    elif sort_by == "status":
-        sort_column = Report.status
-    elif sort_by == "updated_at":
-        sort_column = Report.updated_at
-    else:
-        sort_column = Report.created_at
-
-    if order == "asc":
-        query = query.order_by(sort_column.asc())
-    else:
-        query = query.order_by(sort_column.desc())
+    # 検索・ステータスフィルタ・ソートを適用したクエリ（物件・顧客も同時に読み込む）
+    query = report_query_service.build_list_query(status, search, sort_by, order)
 
     # ページネーション
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     reports = pagination.items
 
-    # 各報告書の作業日情報を取得
-    for report in reports:
-        # その報告書の作業日を取得（日付順）
-        work_times = (
-            WorkTime.query.filter_by(report_id=report.id)
-            .order_by(WorkTime.work_date.asc())
-            .all()
-        )
-        report.work_dates = [wt.work_date for wt in work_times]
-        report.work_times_data = work_times
+    # 作業日・作業内容数・写真数をページ単位でまとめて取得
+    report_query_service.attach_list_data(reports)
 
     return render_template(
         "reports/list.html",
@@ -479,6 +419,7 @@ def create():
             sync_schedule_status_with_report(report)
 
             db.session.commit()
+            dashboard_service.invalidate()
             flash(
                 "報告書とスケジュールが作成されました。写真を追加してください。",
                 "success",
@@ -782,6 +723,9 @@ def edit(id):
                 print("=== データベースコミット開始 ===")
                 db.session.commit()
                 print("=== データベースコミット完了 ===")
+                pdf_cache_service.invalidate(report.id)
+                # ステータスの変更で未完了件数が変わるため破棄
+                dashboard_service.invalidate()
                 flash("報告書情報が更新されました", "success")
 
                 # リダイレクト処理
@@ -914,6 +858,9 @@ def edit(id):
                     # ファイル保存
                     photo_file.save(filepath)
 
+                    # PDF用の派生画像を事前生成（失敗してもアップロードは継続）
+                    photo_cache_service.warm(filepath)
+
                     # 相対パスを保存（uploads/before または uploads/after からの相対パス）
                     relative_path = os.path.join(
                         photo_type,
@@ -943,6 +890,7 @@ def edit(id):
                     uploaded_photos.append(photo)
 
             db.session.commit()
+            pdf_cache_service.invalidate(report.id)
 
             # 写真アップロード後はすべての写真を取得して表示する
             flash("写真がアップロードされました", "success")
@@ -1221,6 +1169,7 @@ def delete_report(id):
 
                 # ファイルが存在する場合は削除
                 if os.path.exists(photo_path):
+                    photo_cache_service.discard(photo_path)
                     os.remove(photo_path)
                     print(f"ファイル削除: {photo_path}")
             except Exception as e:
@@ -1236,11 +1185,16 @@ def delete_report(id):
         # 作業内容データの削除
         WorkDetail.query.filter_by(report_id=id).delete()
 
+        # PDF生成ジョブの削除（生成済みのPDFファイルは残す）
+        PdfJob.query.filter_by(report_id=id).delete()
+
         # 報告書自体の削除
         db.session.delete(report)
 
         # 変更をコミット
         db.session.commit()
+        pdf_cache_service.invalidate(id)
+        dashboard_service.invalidate()
 
         flash(
             "報告書とすべての関連データが削除されました。関連スケジュールはキャンセル状態に変更されました。",
@@ -1305,12 +1259,14 @@ def delete_photo(report_id, photo_id):
 
         # ファイルが存在する場合は削除
         if os.path.exists(photo_path):
+            photo_cache_service.discard(photo_path)
             os.remove(photo_path)
             print(f"ファイル削除: {photo_path}")
 
         # 写真データをデータベースから削除
         db.session.delete(photo)
         db.session.commit()
+        pdf_cache_service.invalidate(report_id)
 
         flash("写真が削除されました", "success")
     except Exception as e:
@@ -1346,6 +1302,7 @@ def edit_photo(report_id, photo_id):
         photo.caption = new_caption
         photo.room_name = new_room_name
         db.session.commit()
+        pdf_cache_service.invalidate(report_id)
 
         flash("写真情報が更新されました", "success")
     except Exception as e:
@@ -1357,6 +1314,26 @@ def edit_photo(report_id, photo_id):
     return redirect(url_for("reports.edit", id=report_id, active_tab="photos"))
 
 
+def report_pdf_filename(report):
+    """報告書PDFのダウンロード用ファイル名を作成"""
+    property_name = (
+        report.property.name if report.property and report.property.name else "unknown"
+    )
+    customer_name = (
+        report.property.customer.name
+        if report.property and report.property.customer and report.property.customer.name
+        else "unknown"
+    )
+    date_str = (
+        report.date.strftime("%Y%m%d")
+        if report.date
+        else datetime.now().strftime("%Y%m%d")
+    )
+
+    filename = f"作業完了報告書_{customer_name}_{property_name}_{date_str}.pdf"
+    return secure_filename(filename)
+
+
 @bp.route("/<int:id>/pdf")
 @login_required
 @view_permission_required
@@ -1364,28 +1341,8 @@ def download_pdf(id):
     """報告書のPDFをダウンロード"""
     report = Report.query.get_or_404(id)
 
-    # 作業時間の取得
-    work_times = (
-        WorkTime.query.filter_by(report_id=id)
-        .order_by(WorkTime.work_date, WorkTime.start_time)
-        .all()
-    )
-
-    # 作業内容の取得
-    work_details = WorkDetail.query.filter_by(report_id=id).all()
-
-    # 施工前後の写真を取得
-    before_photos = Photo.query.filter_by(report_id=id, photo_type="before").all()
-    after_photos = Photo.query.filter_by(report_id=id, photo_type="after").all()
-
-    # 写真ペアの作成
-    photo_pairs = []
-    # 最大枚数に合わせてループ
-    max_photos = max(len(before_photos), len(after_photos))
-    for i in range(max_photos):
-        before_photo = before_photos[i] if i < len(before_photos) else None
-        after_photo = after_photos[i] if i < len(after_photos) else None
-        photo_pairs.append((before_photo, after_photo))
+    # 作業時間・作業内容・写真ペアの取得
+    work_times, work_details, photo_pairs = PDFService.collect_report_data(id)
 
     # PDFをディスクに保存するかどうか
     save_to_disk = request.args.get("save", "0") == "1"
@@ -1393,62 +1350,126 @@ def download_pdf(id):
     # PDFサービスを使用してPDFを生成
     if save_to_disk:
         # ファイルを保存し、保存先を取得
-        pdf_buffer, pdf_filepath = PDFService.generate_report_pdf(
+        pdf_file, pdf_filepath = PDFService.generate_report_pdf(
             report, work_times, work_details, photo_pairs, save_to_disk=True
         )
-        flash(f"PDFを保存しました: {pdf_filepath}", "success")
+        pdf_file.close()
+        if pdf_filepath:
+            flash(f"PDFを保存しました: {pdf_filepath}", "success")
+        else:
+            flash("PDFの保存中にエラーが発生しました", "danger")
         # 保存だけで、ダウンロードはしない
         return redirect(url_for("reports.view", id=report.id))
     else:
         # ダウンロードする場合
-        pdf_buffer = PDFService.generate_report_pdf(
+        # 内容が変わっていなければブラウザのキャッシュまたは生成済みのPDFを使う
+        fingerprint = pdf_cache_service.compute_fingerprint(
             report, work_times, work_details, photo_pairs
         )
+        if request.if_none_match.contains(fingerprint):
+            response = make_response("", 304)
+            response.set_etag(fingerprint)
+            return response
+
+        pdf_source = pdf_cache_service.get(report.id, fingerprint)
+        if pdf_source is None:
+            pdf_file = PDFService.generate_report_pdf(
+                report, work_times, work_details, photo_pairs
+            )
+            pdf_source = pdf_cache_service.store(report.id, fingerprint, pdf_file)
+            if pdf_source:
+                pdf_file.close()
+            else:
+                # キャッシュに保存できなかった場合は生成したファイルをそのまま送信
+                pdf_file.seek(0)
+                pdf_source = pdf_file
 
-        # ファイル名の設定
-        property_name = (
-            report.property.name
-            if report.property and report.property.name
-            else "unknown"
-        )
-        customer_name = (
-            report.property.customer.name
-            if report.property
-            and report.property.customer
-            and report.property.customer.name
-            else "unknown"
-        )
-        date_str = (
-            report.date.strftime("%Y%m%d")
-            if report.date
-            else datetime.now().strftime("%Y%m%d")
-        )
-
-        filename = f"作業完了報告書_{customer_name}_{property_name}_{date_str}.pdf"
-        filename = secure_filename(filename)
-
-        # PDFをクライアントに送信
-        return send_file(
-            pdf_buffer,
+        # PDFをクライアントに送信（ETagで再検証させる）
+        response = send_file(
+            pdf_source,
             as_attachment=True,
-            download_name=filename,
+            download_name=report_pdf_filename(report),
             mimetype="application/pdf",
+            etag=fingerprint,
+            conditional=True,
         )
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+
+def pdf_job_payload(job):
+    """PDFジョブの状態確認APIのレスポンスを作成"""
+    payload = job.to_dict()
+    payload["status_url"] = url_for("reports.pdf_job_status", token=job.token)
+    payload["download_url"] = (
+        url_for("reports.download_pdf_job", token=job.token)
+        if job.status == "completed"
+        else None
+    )
+    return payload
 
 
-@bp.route("/order-details")
+@bp.route("/<int:id>/pdf/jobs", methods=["POST"])
 @login_required
 @view_permission_required
-def order_details_list():
-    """受注明細一覧画面表示（最新作業日ベースで時系列表示、重複防止）"""
-    # パラメータの取得
-    search = request.args.get("search", "").strip()
-    start_date = request.args.get("start_date", "")
-    end_date = request.args.get("end_date", "")
-    sort_by = request.args.get("sort", "work_date")
-    order = request.args.get("order", "desc")
-    page = request.args.get("page", 1, type=int)
-    per_page = 20
+def create_pdf_job(id):
+    """報告書PDFのバックグラウンド生成を開始"""
+    report = Report.query.get_or_404(id)
+    job = pdf_job_service.submit(report.id, g.user.id if g.user else None)
+    return jsonify(pdf_job_payload(job)), 202
+
+
+@bp.route("/pdf/jobs/<token>")
+@login_required
+@view_permission_required
+def pdf_job_status(token):
+    """PDFジョブの状態を返すAPI（画面からポーリングする）"""
+    job = pdf_job_service.get_job(token)
+    if job is None:
+        return jsonify({"error": "ジョブが見つかりません"}), 404
+    return jsonify(pdf_job_payload(job))
+
+
+@bp.route("/pdf/jobs/<token>/download")
+@login_required
+@view_permission_required
+def download_pdf_job(token):
+    """バックグラウンドで生成したPDFをダウンロード"""
+    job = pdf_job_service.get_job(token)
+    file_path = pdf_job_service.get_result_path(job) if job else None
+    if file_path is None:
+        flash("PDFはまだ作成されていないか、見つかりません", "warning")
+        if job:
+            return redirect(url_for("reports.view", id=job.report_id))
+        return redirect(url_for("reports.list"))
+
+    return send_file(
+        file_path,
+        as_attachment=True,
+        download_name=report_pdf_filename(job.report),
+        mimetype="application/pdf",
+    )
+
+
+def build_order_details_query(args, sort=True):
+    """
+    受注明細の検索・期間フィルタ・ソートを適用した報告書クエリを作成
+
+    受注明細一覧・PDF出力・一括エクスポートで同じ条件を使うための共通処理
+
+    Args:
+        args: リクエストパラメータ（search, start_date, end_date, sort, order）
+        sort (bool): ソート条件を適用するかどうか
+
+    Returns:
+        Query: 報告書のクエリ（最新作業日ベース、重複除去済み）
+    """
+    search = args.get("search", "").strip()
+    start_date = args.get("start_date", "")
+    end_date = args.get("end_date", "")
+    sort_by = args.get("sort", "work_date")
+    order = args.get("order", "desc")
 
     # 各報告書の最新作業日を取得するサブクエリ
     latest_work_date_subquery = (
@@ -1460,10 +1481,10 @@ def order_details_list():
         .subquery()
     )
 
-    # ベースクエリの作成（最新作業日のWorkTimeのみをJOIN）
+    # ベースクエリの作成（最新作業日のWorkTimeのみをJOIN、物件・顧客はJOINから読み込む）
     query = (
-        Report.query.join(Property)
-        .join(Customer)
+        Report.query.join(Report.property)
+        .join(Property.customer)
         .outerjoin(WorkDetail, Report.id == WorkDetail.report_id)
         .join(
             latest_work_date_subquery,
@@ -1476,6 +1497,7 @@ def order_details_list():
                 WorkTime.work_date == latest_work_date_subquery.c.latest_work_date,
             ),
         )
+        .options(contains_eager(Report.property).contains_eager(Property.customer))
     )
 
     # 検索フィルタ
@@ -1491,15 +1513,7 @@ def order_details_list():
         ]
 
         # 日本語ステータス検索
-        search_lower = search.lower()
-        if "未完了" in search_lower:
-            search_conditions.append(Report.status == "pending")
-        if "完了" in search_lower and "未完了" not in search_lower:
-            search_conditions.append(Report.status == "completed")
-        if "下書き" in search_lower:
-            search_conditions.append(Report.status == "draft")
-        if "キャンセル" in search_lower:
-            search_conditions.append(Report.status == "cancelled")
+        search_conditions.extend(status_search_conditions(search))
 
         search_filter = or_(*search_conditions)
         query = query.filter(search_filter)
@@ -1526,6 +1540,9 @@ def order_details_list():
     # 重複除去
     query = query.distinct()
 
+    if not sort:
+        return query
+
     # ソート処理
     sort_column = None
     if sort_by == "id":
@@ -1550,155 +1567,37 @@ def order_details_list():
     else:
         query = query.order_by(sort_column.desc())
 
-    # ページネーション
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    reports = pagination.items
+    return query
 
-    # 各報告書の詳細情報を取得
-    order_details = []
-    for report in reports:
-        # 作業内容の総数（この報告書の）
-        work_detail_count = WorkDetail.query.filter_by(report_id=report.id).count()
-
-        # エアコンの数（この報告書で作業したエアコンのみ）- 台数を含めて集計
-        ac_count = (
-            db.session.query(db.func.sum(AirConditioner.quantity))
-            .join(WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id)
-            .filter(WorkDetail.report_id == report.id)
-            .scalar()
-            or 0
-        )
-
-        # 金額の合計（この報告書で作業したエアコンのみ）
-        total_amount = (
-            db.session.query(db.func.sum(AirConditioner.total_amount))
-            .join(WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id)
-            .filter(WorkDetail.report_id == report.id)
-            .scalar()
-            or 0
-        )
-
-        # 作業日情報を取得（すべての作業日を表示用に取得）
-        work_times = (
-            WorkTime.query.filter_by(report_id=report.id)
-            .order_by(WorkTime.work_date.asc())
-            .all()
-        )
-        work_dates = [wt.work_date for wt in work_times]
-
-        order_details.append(
-            {
-                "report": report,
-                "property": report.property,
-                "customer": report.property.customer,
-                "work_detail_count": work_detail_count,
-                "ac_count": ac_count,
-                "total_amount": total_amount,
-                "work_dates": work_dates,
-            }
-        )
-
-    # 全体の総合計を計算（フィルタ条件適用、ページネーション無し）
-    # 同じクエリを再構築して全データを取得
-    total_query = (
-        Report.query.join(Property)
-        .join(Customer)
-        .outerjoin(WorkDetail, Report.id == WorkDetail.report_id)
-        .join(
-            latest_work_date_subquery,
-            Report.id == latest_work_date_subquery.c.report_id,
-        )
-        .outerjoin(
-            WorkTime,
-            db.and_(
-                Report.id == WorkTime.report_id,
-                WorkTime.work_date == latest_work_date_subquery.c.latest_work_date,
-            ),
-        )
-    )
-
-    # 同じフィルタ条件を適用
-    if search:
-        search_conditions = [
-            Customer.name.contains(search),
-            Property.name.contains(search),
-            Property.reception_type.contains(search),
-            Property.reception_detail.contains(search),
-            WorkDetail.description.contains(search),
-            Report.status.contains(search),
-        ]
-
-        search_lower = search.lower()
-        if "未完了" in search_lower:
-            search_conditions.append(Report.status == "pending")
-        if "完了" in search_lower and "未完了" not in search_lower:
-            search_conditions.append(Report.status == "completed")
-        if "下書き" in search_lower:
-            search_conditions.append(Report.status == "draft")
-        if "キャンセル" in search_lower:
-            search_conditions.append(Report.status == "cancelled")
-
-        search_filter = or_(*search_conditions)
-        total_query = total_query.filter(search_filter)
-
-    if start_date:
-        try:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            total_query = total_query.filter(
-                latest_work_date_subquery.c.latest_work_date >= start_date_obj
-            )
-        except ValueError:
-            pass
-
-    if end_date:
-        try:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-            total_query = total_query.filter(
-                latest_work_date_subquery.c.latest_work_date <= end_date_obj
-            )
-        except ValueError:
-            pass
-
-    total_query = total_query.distinct()
-    all_reports = total_query.all()
-
-    # 全体の総合計を計算
-    grand_totals = {
-        "total_reports": len(all_reports),
-        "total_ac_count": 0,
-        "total_work_details": 0,
-        "total_amount": 0,
-        "unique_properties": set(),
-    }
 
-    for report in all_reports:
-        # エアコンの数（台数を含めて集計）
-        ac_count = (
-            db.session.query(db.func.sum(AirConditioner.quantity))
-            .join(WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id)
-            .filter(WorkDetail.report_id == report.id)
-            .scalar()
-            or 0
-        )
+@bp.route("/order-details")
+@login_required
+@view_permission_required
+def order_details_list():
+    """受注明細一覧画面表示（最新作業日ベースで時系列表示、重複防止）"""
+    # パラメータの取得
+    search = request.args.get("search", "").strip()
+    start_date = request.args.get("start_date", "")
+    end_date = request.args.get("end_date", "")
+    sort_by = request.args.get("sort", "work_date")
+    order = request.args.get("order", "desc")
+    page = request.args.get("page", 1, type=int)
+    per_page = 20
 
-        # 作業内容の総数
-        work_detail_count = WorkDetail.query.filter_by(report_id=report.id).count()
+    # 検索・期間フィルタ・ソートを適用したクエリ
+    query = build_order_details_query(request.args)
 
-        # 金額の合計
-        total_amount = (
-            db.session.query(db.func.sum(AirConditioner.total_amount))
-            .join(WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id)
-            .filter(WorkDetail.report_id == report.id)
-            .scalar()
-            or 0
-        )
+    # ページネーション
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    reports = pagination.items
 
-        grand_totals["total_ac_count"] += ac_count
-        grand_totals["total_work_details"] += work_detail_count
-        grand_totals["total_amount"] += total_amount
-        grand_totals["unique_properties"].add(report.property.id)
+    # 各行の作業内容数・エアコン数・金額・作業日をページ単位でまとめて集計
+    order_details = report_query_service.load_order_details(reports)
 
-    grand_totals["unique_properties"] = len(grand_totals["unique_properties"])
+    # 全体の総合計をデータベースで集計（フィルタ条件適用、ページネーション無し）
+    grand_totals = report_query_service.compute_order_totals(
+        build_order_details_query(request.args, sort=False)
+    )
 
     return render_template(
         "reports/order_details_list.html",
@@ -1718,227 +1617,180 @@ def order_details_list():
 @view_permission_required
 def order_details_pdf():
     """受注明細一覧PDF出力（最新作業日ベース、重複防止）"""
-    # パラメータの取得（一覧画面と同じフィルタを適用）
     search = request.args.get("search", "").strip()
     start_date = request.args.get("start_date", "")
     end_date = request.args.get("end_date", "")
-    sort_by = request.args.get("sort", "work_date")
-    order = request.args.get("order", "desc")
 
-    # 各報告書の最新作業日を取得するサブクエリ
-    latest_work_date_subquery = (
-        db.session.query(
-            WorkTime.report_id,
-            db.func.max(WorkTime.work_date).label("latest_work_date"),
-        )
-        .group_by(WorkTime.report_id)
-        .subquery()
-    )
+    # データ取得（一覧画面と同じフィルタ・ソート、ページネーションなし）
+    reports = build_order_details_query(request.args).all()
 
-    # データ取得（ページネーションなし、最新作業日のWorkTimeのみをJOIN）
-    query = (
-        Report.query.join(Property)
-        .join(Customer)
-        .outerjoin(WorkDetail, Report.id == WorkDetail.report_id)
-        .join(
-            latest_work_date_subquery,
-            Report.id == latest_work_date_subquery.c.report_id,
-        )
-        .outerjoin(
-            WorkTime,
-            db.and_(
-                Report.id == WorkTime.report_id,
-                WorkTime.work_date == latest_work_date_subquery.c.latest_work_date,
-            ),
+    # 各行の集計はまとめて取得（IN句が大きくなりすぎないよう一定件数ごとに分割）
+    order_details = []
+    for i in range(0, len(reports), ORDER_DETAILS_PDF_BATCH_SIZE):
+        order_details.extend(
+            report_query_service.load_order_details(
+                reports[i : i + ORDER_DETAILS_PDF_BATCH_SIZE]
+            )
         )
+    grand_totals = report_query_service.compute_order_totals(
+        build_order_details_query(request.args, sort=False)
     )
 
-    # 同じフィルタ条件を適用
-    if search:
-        search_conditions = [
-            Customer.name.contains(search),
-            Property.name.contains(search),
-            Property.reception_type.contains(search),
-            Property.reception_detail.contains(search),
-            WorkDetail.description.contains(search),
-            # ステータスでの検索（英語コード）
-            Report.status.contains(search),
-        ]
-
-        # 日本語ステータス検索
-        search_lower = search.lower()
-        if "未完了" in search_lower:
-            search_conditions.append(Report.status == "pending")
-        if "完了" in search_lower and "未完了" not in search_lower:
-            search_conditions.append(Report.status == "completed")
-        if "下書き" in search_lower:
-            search_conditions.append(Report.status == "draft")
-        if "キャンセル" in search_lower:
-            search_conditions.append(Report.status == "cancelled")
-
-        search_filter = or_(*search_conditions)
-        query = query.filter(search_filter)
-
-    if start_date:
-        try:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            query = query.filter(
-                latest_work_date_subquery.c.latest_work_date >= start_date_obj
-            )
-        except ValueError:
-            pass
-
-    if end_date:
-        try:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-            query = query.filter(
-                latest_work_date_subquery.c.latest_work_date <= end_date_obj
-            )
-        except ValueError:
-            pass
-
-    # 重複除去とソート
-    query = query.distinct()
-
-    sort_column = None
-    if sort_by == "id":
-        sort_column = Report.id
-    elif sort_by == "customer":
-        sort_column = Customer.name
-    elif sort_by == "property":
-        sort_column = Property.name
-    elif sort_by == "reception_type":
-        sort_column = Property.reception_type
-    elif sort_by == "work_date":
-        sort_column = latest_work_date_subquery.c.latest_work_date
-    elif sort_by == "date":
-        sort_column = Report.date
-    elif sort_by == "created_at":
-        sort_column = Report.created_at
-    else:
-        sort_column = latest_work_date_subquery.c.latest_work_date
-
-    if order == "asc":
-        query = query.order_by(sort_column.asc())
-    else:
-        query = query.order_by(sort_column.desc())
-
-    reports = query.all()
-
-    # PDF作成
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=30, bottomMargin=30)
-
-    # 日本語フォントの登録
-    try:
-        pdfmetrics.registerFont(TTFont("Japanese", "C:/Windows/Fonts/msgothic.ttc"))
-        japanese_font = "Japanese"
-    except:
-        try:
-            pdfmetrics.registerFont(
-                TTFont("Japanese", "C:/Windows/Fonts/NotoSansCJK-Regular.ttc")
-            )
-            japanese_font = "Japanese"
-        except:
-            japanese_font = "Helvetica"
-
-    # スタイル設定
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "CustomTitle", fontSize=16, alignment=1, spaceAfter=20, fontName=japanese_font
+    # PDF作成（一定サイズを超えた分は一時ファイルに書き出す）
+    pdf_file = create_pdf_output()
+    doc = SimpleDocTemplate(
+        pdf_file, pagesize=landscape(A4), topMargin=30, bottomMargin=30
     )
 
+    # フォント・スタイルはプロセス内で共有するテーマから取得
+    title_style = pdf_theme.styles["SummaryTitle"]
+
     # PDFコンテンツ
     story = []
 
-    # タイトル
-    type_display = {"count": "件数", "quantity": "台数", "amount": "金額"}
-    title = f"{year}年度 受注月間表（{type_display.get(summary_type, '件数')}ベース）"
-    story.append(Paragraph(title, title_style))
+    # タイトル（検索・期間条件があれば併記）
+    story.append(Paragraph("受注明細一覧", title_style))
+    conditions = []
+    if start_date or end_date:
+        conditions.append(f"期間：{start_date or '指定なし'} ～ {end_date or '指定なし'}")
+    if search:
+        conditions.append(f"検索：{search}")
+    if conditions:
+        story.append(Paragraph("　".join(conditions), pdf_theme.styles["SummaryCondition"]))
     story.append(Spacer(1, 12))
 
     # テーブルデータの準備
-    table_data = []
+    table_data = [
+        [
+            "報告書ID",
+            "顧客名",
+            "物件名",
+            "受付種別",
+            "エアコン数",
+            "作業項目数",
+            "金額",
+            "作業日",
+            "報告日",
+        ]
+    ]
+    for detail in order_details:
+        report = detail["report"]
+        work_dates = detail["work_dates"]
+        work_date_text = work_dates[0].strftime("%Y/%m/%d") if work_dates else "-"
+        if len(work_dates) > 1:
+            work_date_text += f" 他{len(work_dates) - 1}日"
+        table_data.append(
+            [
+                str(report.id),
+                detail["customer"].name,
+                detail["property"].name,
+                detail["property"].reception_type or "-",
+                str(detail["ac_count"]),
+                str(detail["work_detail_count"]),
+                f"¥{detail['total_amount']:,}",
+                work_date_text,
+                report.date.strftime("%Y/%m/%d") if report.date else "-",
+            ]
+        )
 
-    # ヘッダー行1（受付種別のグループ）
-    header1 = ["月"]
-    for reception_type in reception_types:
-        header1.extend([reception_type, "", ""])  # 完了、未完了、合計用の3列
-    header1.extend(["合計", "", ""])
-    table_data.append(header1)
+    # 合計行
+    table_data.append(
+        [
+            "合計",
+            f"{grand_totals['total_reports']}件",
+            f"{grand_totals['unique_properties']}物件",
+            "",
+            str(grand_totals["total_ac_count"]),
+            str(grand_totals["total_work_details"]),
+            f"¥{grand_totals['total_amount']:,}",
+            "",
+            "",
+        ]
+    )
 
-    # ヘッダー行2（完了・未完了・合計）
-    header2 = [""]
-    for _ in reception_types:
-        header2.extend(["完了", "未完了", "合計"])
-    header2.extend(["完了", "未完了", "合計"])
-    table_data.append(header2)
+    # テーブル作成（見出し行は各ページに繰り返す）
+    table = Table(table_data, repeatRows=1)
+    table.setStyle(pdf_theme.order_details_table_style)
 
-    # データ行
-    for month_data in monthly_data:
-        row = [month_data["month_name"]]
-        for reception_type in reception_types:
-            data = month_data["reception_types"][reception_type]
-            row.extend(
-                [str(data["completed"]), str(data["pending"]), str(data["total"])]
-            )
+    story.append(table)
 
-        totals = month_data["totals"]
-        row.extend(
-            [str(totals["completed"]), str(totals["pending"]), str(totals["total"])]
-        )
-        table_data.append(row)
+    # PDF生成
+    doc.build(story)
+    pdf_file.seek(0)
+
+    # レスポンス作成（ファイルから順次送信し、送信後に閉じる）
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return send_file(
+        pdf_file,
+        as_attachment=True,
+        download_name=f"order_details_{timestamp}.pdf",
+        mimetype="application/pdf",
+    )
 
-    # 合計行
-    total_row = ["合計"]
-    for reception_type in reception_types:
-        completed_total = sum(
-            month["reception_types"][reception_type]["completed"]
-            for month in monthly_data
-        )
-        pending_total = sum(
-            month["reception_types"][reception_type]["pending"]
-            for month in monthly_data
-        )
-        total_total = completed_total + pending_total
-        total_row.extend([str(completed_total), str(pending_total), str(total_total)])
 
-    grand_completed = sum(month["totals"]["completed"] for month in monthly_data)
-    grand_pending = sum(month["totals"]["pending"] for month in monthly_data)
-    grand_total = grand_completed + grand_pending
-    total_row.extend([str(grand_completed), str(grand_pending), str(grand_total)])
-    table_data.append(total_row)
+@bp.route("/order-details/export")
+@login_required
+@view_permission_required
+def export_report_pdfs():
+    """受注明細の条件に一致する報告書PDFの一括エクスポート（ZIPまたは結合PDF）"""
+    export_format = request.args.get("format", "zip")
+
+    # 報告書IDの指定がなければ、受注明細一覧と同じ条件で対象を決める
+    report_ids = request.args.getlist("report_ids", type=int)
+    if not report_ids:
+        report_ids = [report.id for report in build_order_details_query(request.args)]
+
+    filter_args = {
+        key: request.args.get(key, "")
+        for key in ("search", "start_date", "end_date", "sort", "order")
+    }
+    if not report_ids:
+        flash("エクスポートする報告書がありません", "warning")
+        return redirect(url_for("reports.order_details_list", **filter_args))
 
-    # テーブル作成
-    table = Table(table_data)
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 1), colors.grey),
-                ("TEXTCOLOR", (0, 0), (-1, 1), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, -1), japanese_font),
-                ("FONTSIZE", (0, 0), (-1, -1), 8),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
-                ("BACKGROUND", (0, -1), (-1, -1), colors.lightgrey),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-            ]
+    max_reports = current_app.config.get("PDF_EXPORT_MAX_REPORTS", 200)
+    if len(report_ids) > max_reports:
+        flash(
+            f"一度にエクスポートできる報告書は{max_reports}件までです（{len(report_ids)}件）。"
+            "期間や検索条件で絞り込んでください",
+            "warning",
         )
-    )
+        return redirect(url_for("reports.order_details_list", **filter_args))
 
-    story.append(table)
+    app = current_app._get_current_object()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    # PDF生成
-    doc.build(story)
-    buffer.seek(0)
+    if export_format == "pdf":
+        # PDFは末尾に索引があるため、結合を終えてから一時ファイルを送信する
+        fd, combined_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        try:
+            errors = pdf_export_service.build_combined_pdf(
+                app, report_ids, combined_path
+            )
+        except Exception as e:
+            os.remove(combined_path)
+            print(f"一括エクスポートエラー: {e}")
+            flash(f"PDFの一括エクスポート中にエラーが発生しました: {e}", "danger")
+            return redirect(url_for("reports.order_details_list", **filter_args))
+
+        response = send_file(
+            combined_path,
+            as_attachment=True,
+            download_name=f"reports_{timestamp}.pdf",
+            mimetype="application/pdf",
+        )
+        response.headers["X-Export-Errors"] = str(len(errors))
+        response.call_on_close(lambda: os.remove(combined_path))
+        return response
 
-    # レスポンス作成
-    response = make_response(buffer.read())
-    response.headers["Content-Type"] = "application/pdf"
+    # ZIPはPDFが準備できた順に送信する
+    response = Response(
+        pdf_export_service.stream_zip(app, report_ids), mimetype="application/zip"
+    )
     response.headers["Content-Disposition"] = (
-        f"attachment; filename=monthly_summary_{year}.pdf"
+        f"attachment; filename=reports_{timestamp}.zip"
     )
-
     return response
 
 
@@ -1947,391 +1799,78 @@ def order_details_pdf():
 @view_permission_required
 def monthly_summary():
     """受注月間表の表示"""
-    from sqlalchemy import func, extract, case
-
     # パラメータの取得
     year = request.args.get("year", datetime.now().year, type=int)
     summary_type = request.args.get(
         "type", "count"
     )  # count(件数), quantity(台数), amount(金額)
 
-    # 受付種別の一覧を取得
-    reception_types = (
-        db.session.query(Property.reception_type)
-        .filter(Property.reception_type.isnot(None), Property.reception_type != "")
-        .distinct()
-        .order_by(Property.reception_type)
-        .all()
-    )
-    reception_types = [rt[0] for rt in reception_types]
-
-    # 月別・受付種別・完了状況の集計データを取得
-    # WorkTimeを使って実際の作業月で集計
-    monthly_data = []
-
-    for month in range(1, 13):
-        month_data = {"month": month, "month_name": f"{month}月", "reception_types": {}}
-
-        for reception_type in reception_types:
-            if summary_type == "count":
-                # 件数ベースの集計（従来通り）
-                completed_count = (
-                    db.session.query(func.count(Report.id))
-                    .join(Property)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status == "completed",
-                    )
-                    .scalar()
-                    or 0
-                )
-
-                pending_count = (
-                    db.session.query(func.count(Report.id))
-                    .join(Property)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status.in_(["pending", "draft"]),
-                    )
-                    .scalar()
-                    or 0
-                )
-
-            elif summary_type == "quantity":
-                # 台数ベースの集計
-                completed_count = (
-                    db.session.query(func.sum(AirConditioner.quantity))
-                    .join(
-                        WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id
-                    )
-                    .join(Report, WorkDetail.report_id == Report.id)
-                    .join(Property, Report.property_id == Property.id)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status == "completed",
-                    )
-                    .scalar()
-                    or 0
-                )
-
-                pending_count = (
-                    db.session.query(func.sum(AirConditioner.quantity))
-                    .join(
-                        WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id
-                    )
-                    .join(Report, WorkDetail.report_id == Report.id)
-                    .join(Property, Report.property_id == Property.id)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status.in_(["pending", "draft"]),
-                    )
-                    .scalar()
-                    or 0
-                )
-
-            elif summary_type == "amount":
-                # 金額ベースの集計
-                completed_count = (
-                    db.session.query(func.sum(AirConditioner.total_amount))
-                    .join(
-                        WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id
-                    )
-                    .join(Report, WorkDetail.report_id == Report.id)
-                    .join(Property, Report.property_id == Property.id)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status == "completed",
-                        AirConditioner.total_amount.isnot(None),
-                    )
-                    .scalar()
-                    or 0
-                )
-
-                pending_count = (
-                    db.session.query(func.sum(AirConditioner.total_amount))
-                    .join(
-                        WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id
-                    )
-                    .join(Report, WorkDetail.report_id == Report.id)
-                    .join(Property, Report.property_id == Property.id)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status.in_(["pending", "draft"]),
-                        AirConditioner.total_amount.isnot(None),
-                    )
-                    .scalar()
-                    or 0
-                )
-
-            total_count = completed_count + pending_count
-
-            month_data["reception_types"][reception_type] = {
-                "completed": completed_count,
-                "pending": pending_count,
-                "total": total_count,
-            }
-
-        # 月合計を計算
-        month_completed_total = sum(
-            data["completed"] for data in month_data["reception_types"].values()
-        )
-        month_pending_total = sum(
-            data["pending"] for data in month_data["reception_types"].values()
-        )
-        month_total = month_completed_total + month_pending_total
-
-        month_data["totals"] = {
-            "completed": month_completed_total,
-            "pending": month_pending_total,
-            "total": month_total,
-        }
-
-        monthly_data.append(month_data)
-
-    # 受付種別別の年間合計を計算
-    reception_type_totals = {}
-    for reception_type in reception_types:
-        completed_total = sum(
-            month["reception_types"][reception_type]["completed"]
-            for month in monthly_data
-        )
-        pending_total = sum(
-            month["reception_types"][reception_type]["pending"]
-            for month in monthly_data
-        )
-        reception_type_totals[reception_type] = {
-            "completed": completed_total,
-            "pending": pending_total,
-            "total": completed_total + pending_total,
-        }
-
-    # 全体の年間合計
-    grand_totals = {
-        "completed": sum(month["totals"]["completed"] for month in monthly_data),
-        "pending": sum(month["totals"]["pending"] for month in monthly_data),
-        "total": sum(month["totals"]["total"] for month in monthly_data),
-    }
+    # 月別・受付種別・完了状況の集計（集計種別ごとに1回のGROUP BYクエリ）
+    summary = summary_service.build_monthly_summary(year, summary_type)
 
     return render_template(
         "reports/monthly_summary.html",
-        monthly_data=monthly_data,
-        reception_types=reception_types,
-        reception_type_totals=reception_type_totals,
-        grand_totals=grand_totals,
+        monthly_data=summary["monthly_data"],
+        reception_types=summary["reception_types"],
+        reception_type_totals=summary["reception_type_totals"],
+        grand_totals=summary["grand_totals"],
         current_year=year,
         current_type=summary_type,
         available_years=range(2020, datetime.now().year + 5),
     )
 
 
+@bp.route("/monthly-summary/analytics")
+@login_required
+@view_permission_required
+def monthly_summary_analytics():
+    """受注の複数年推移・前年比較データ（JSON、グラフ表示用）"""
+    current_year = datetime.now().year
+    end_year = request.args.get("end_year", current_year, type=int)
+    start_year = request.args.get("start_year", end_year - 2, type=int)
+    status = request.args.get("status", "all")
+
+    try:
+        data = analytics_service.get_trends(start_year, end_year, status)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify(data)
+    response.headers["Cache-Control"] = "private, max-age=60"
+    return response
+
+
 @bp.route("/monthly-summary/pdf")
 @login_required
 @view_permission_required
 def monthly_summary_pdf():
     """受注月間表のPDF出力"""
-    from sqlalchemy import func, extract
-
     # パラメータの取得
     year = request.args.get("year", datetime.now().year, type=int)
     summary_type = request.args.get(
         "type", "count"
     )  # count(件数), quantity(台数), amount(金額)
 
-    # 受付種別の一覧を取得
-    reception_types = (
-        db.session.query(Property.reception_type)
-        .filter(Property.reception_type.isnot(None), Property.reception_type != "")
-        .distinct()
-        .order_by(Property.reception_type)
-        .all()
-    )
-    reception_types = [rt[0] for rt in reception_types]
+    # 月別・受付種別・完了状況の集計（HTML版と同じ集計サービスを使用）
+    summary = summary_service.build_monthly_summary(year, summary_type)
+    reception_types = summary["reception_types"]
+    monthly_data = summary["monthly_data"]
 
-    # 月別・受付種別・完了状況の集計データを取得（HTML版と同じロジック）
-    monthly_data = []
+    # PDF作成（一定サイズを超えた分は一時ファイルに書き出す）
+    pdf_file = create_pdf_output()
+    doc = SimpleDocTemplate(pdf_file, pagesize=A4, topMargin=30, bottomMargin=30)
 
-    for month in range(1, 13):
-        month_data = {"month": month, "month_name": f"{month}月", "reception_types": {}}
-
-        for reception_type in reception_types:
-            if summary_type == "count":
-                # 件数ベースの集計
-                completed_count = (
-                    db.session.query(func.count(Report.id))
-                    .join(Property)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status == "completed",
-                    )
-                    .scalar()
-                    or 0
-                )
-
-                pending_count = (
-                    db.session.query(func.count(Report.id))
-                    .join(Property)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status.in_(["pending", "draft"]),
-                    )
-                    .scalar()
-                    or 0
-                )
-
-            elif summary_type == "quantity":
-                # 台数ベースの集計
-                completed_count = (
-                    db.session.query(func.sum(AirConditioner.quantity))
-                    .join(
-                        WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id
-                    )
-                    .join(Report, WorkDetail.report_id == Report.id)
-                    .join(Property, Report.property_id == Property.id)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status == "completed",
-                    )
-                    .scalar()
-                    or 0
-                )
-
-                pending_count = (
-                    db.session.query(func.sum(AirConditioner.quantity))
-                    .join(
-                        WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id
-                    )
-                    .join(Report, WorkDetail.report_id == Report.id)
-                    .join(Property, Report.property_id == Property.id)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status.in_(["pending", "draft"]),
-                    )
-                    .scalar()
-                    or 0
-                )
-
-            elif summary_type == "amount":
-                # 金額ベースの集計
-                completed_count = (
-                    db.session.query(func.sum(AirConditioner.total_amount))
-                    .join(
-                        WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id
-                    )
-                    .join(Report, WorkDetail.report_id == Report.id)
-                    .join(Property, Report.property_id == Property.id)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status == "completed",
-                        AirConditioner.total_amount.isnot(None),
-                    )
-                    .scalar()
-                    or 0
-                )
-
-                pending_count = (
-                    db.session.query(func.sum(AirConditioner.total_amount))
-                    .join(
-                        WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id
-                    )
-                    .join(Report, WorkDetail.report_id == Report.id)
-                    .join(Property, Report.property_id == Property.id)
-                    .join(WorkTime, Report.id == WorkTime.report_id)
-                    .filter(
-                        extract("year", WorkTime.work_date) == year,
-                        extract("month", WorkTime.work_date) == month,
-                        Property.reception_type == reception_type,
-                        Report.status.in_(["pending", "draft"]),
-                        AirConditioner.total_amount.isnot(None),
-                    )
-                    .scalar()
-                    or 0
-                )
-
-            total_count = completed_count + pending_count
-
-            month_data["reception_types"][reception_type] = {
-                "completed": completed_count,
-                "pending": pending_count,
-                "total": total_count,
-            }
-
-        month_completed_total = sum(
-            data["completed"] for data in month_data["reception_types"].values()
-        )
-        month_pending_total = sum(
-            data["pending"] for data in month_data["reception_types"].values()
-        )
-        month_total = month_completed_total + month_pending_total
-
-        month_data["totals"] = {
-            "completed": month_completed_total,
-            "pending": month_pending_total,
-            "total": month_total,
-        }
-
-        monthly_data.append(month_data)
-
-    # PDF作成
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=30, bottomMargin=30)
-
-    # 日本語フォントの登録
-    try:
-        pdfmetrics.registerFont(TTFont("Japanese", "C:/Windows/Fonts/msgothic.ttc"))
-        japanese_font = "Japanese"
-    except:
-        try:
-            pdfmetrics.registerFont(
-                TTFont("Japanese", "C:/Windows/Fonts/NotoSansCJK-Regular.ttc")
-            )
-            japanese_font = "Japanese"
-        except:
-            japanese_font = "Helvetica"
-
-    # スタイル設定
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "CustomTitle", fontSize=16, alignment=1, spaceAfter=20, fontName=japanese_font
-    )
+    # フォント・スタイルはプロセス内で共有するテーマから取得
+    title_style = pdf_theme.styles["SummaryTitle"]
 
     # PDFコンテンツ
     story = []
 
     # タイトル
-    title = f"{year}年度 受注月間表"
+    title = (
+        f"{year}年度 受注月間表"
+        f"（{SUMMARY_TYPE_DISPLAY.get(summary_type, '件数')}ベース）"
+    )
     story.append(Paragraph(title, title_style))
     story.append(Spacer(1, 12))
 
@@ -2370,55 +1909,39 @@ def monthly_summary_pdf():
     # 合計行
     total_row = ["合計"]
     for reception_type in reception_types:
-        completed_total = sum(
-            month["reception_types"][reception_type]["completed"]
-            for month in monthly_data
-        )
-        pending_total = sum(
-            month["reception_types"][reception_type]["pending"]
-            for month in monthly_data
+        data = summary["reception_type_totals"][reception_type]
+        total_row.extend(
+            [str(data["completed"]), str(data["pending"]), str(data["total"])]
         )
-        total_total = completed_total + pending_total
-        total_row.extend([str(completed_total), str(pending_total), str(total_total)])
 
-    grand_completed = sum(month["totals"]["completed"] for month in monthly_data)
-    grand_pending = sum(month["totals"]["pending"] for month in monthly_data)
-    grand_total = grand_completed + grand_pending
-    total_row.extend([str(grand_completed), str(grand_pending), str(grand_total)])
+    grand_totals = summary["grand_totals"]
+    total_row.extend(
+        [
+            str(grand_totals["completed"]),
+            str(grand_totals["pending"]),
+            str(grand_totals["total"]),
+        ]
+    )
     table_data.append(total_row)
 
     # テーブル作成
     table = Table(table_data)
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 1), colors.grey),
-                ("TEXTCOLOR", (0, 0), (-1, 1), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, -1), japanese_font),
-                ("FONTSIZE", (0, 0), (-1, -1), 8),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
-                ("BACKGROUND", (0, -1), (-1, -1), colors.lightgrey),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-            ]
-        )
-    )
+    table.setStyle(pdf_theme.summary_table_style)
 
     story.append(table)
 
     # PDF生成
     doc.build(story)
-    buffer.seek(0)
-
-    # レスポンス作成
-    response = make_response(buffer.read())
-    response.headers["Content-Type"] = "application/pdf"
-    response.headers["Content-Disposition"] = (
-        f"attachment; filename=monthly_summary_{year}.pdf"
+    pdf_file.seek(0)
+
+    # レスポンス作成（ファイルから順次送信し、送信後に閉じる）
+    return send_file(
+        pdf_file,
+        as_attachment=True,
+        download_name=f"monthly_summary_{year}.pdf",
+        mimetype="application/pdf",
     )
 
-    return response
-
 
 @bp.route("/work-items-list")
 @login_required
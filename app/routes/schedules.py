@@ -1,9 +1,21 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
-from app.models.schedule import Schedule
+from flask import (
+    Blueprint,
+    render_template,
+    redirect,
+    url_for,
+    flash,
+    request,
+    jsonify,
+    current_app,
+    g,
+)
+from app.models.schedule import Schedule, RECURRENCE_TYPES
 from app.models.customer import Customer
 from app.models.property import Property
 from app.models.report import Report
 from app import db
+from app.services.schedule_event_service import schedule_event_service
+from app.services.recurrence_service import recurrence_service
 from app.routes.auth import (
     login_required,
     view_permission_required,
@@ -11,12 +23,16 @@ from app.routes.auth import (
     create_permission_required,
     delete_permission_required,
 )
-from sqlalchemy import or_, and_
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 from datetime import datetime, date, timedelta
 import calendar
 
 bp = Blueprint("schedules", __name__, url_prefix="/schedules")
 
+# イベントAPIで一度に取得できる日数の既定値（月表示の6週間分を含む）
+DEFAULT_EVENTS_MAX_DAYS = 62
+
 
 @bp.route("/")
 @login_required
@@ -58,22 +74,18 @@ def list():
         _, last_day = calendar.monthrange(year, month)
         end_date = date(year, month, last_day)
 
-    # クエリ構築
-    query = Schedule.query.filter(
-        and_(
-            Schedule.start_datetime
-            >= datetime.combine(start_date, datetime.min.time()),
-            Schedule.start_datetime <= datetime.combine(end_date, datetime.max.time()),
-        )
+    # 期間内のスケジュール（繰り返しスケジュールは期間内の回を展開して含める）
+    schedules = recurrence_service.schedules_in_range(
+        datetime.combine(start_date, datetime.min.time()),
+        datetime.combine(end_date + timedelta(days=1), datetime.min.time()),
+        status_filter,
+        options=(
+            joinedload(Schedule.customer),
+            joinedload(Schedule.schedule_property),
+            joinedload(Schedule.report),
+        ),
     )
 
-    # ステータスフィルタ
-    if status_filter != "all":
-        query = query.filter(Schedule.status == status_filter)
-
-    # 並び替え
-    schedules = query.order_by(Schedule.start_datetime.asc()).all()
-
     # 週表示用のデータ構造を作成
     week_data = {}
     if view_type == "week":
@@ -124,6 +136,29 @@ def list():
     return render_template("schedules/list.html", **template_data)
 
 
+def parse_recurrence(form, start_datetime):
+    """
+    フォームの繰り返し設定を解析
+
+    Returns:
+        tuple: (繰り返しの種類（繰り返さない場合はNone）, 繰り返し終了日)
+
+    Raises:
+        ValueError: 終了日の形式が正しくない・開始日より前の場合
+    """
+    recurrence_type = form.get("recurrence_type") or None
+    if recurrence_type not in RECURRENCE_TYPES:
+        return None, None
+
+    recurrence_end = form.get("recurrence_end")
+    if not recurrence_end:
+        return recurrence_type, None
+    recurrence_end = datetime.strptime(recurrence_end, "%Y-%m-%d").date()
+    if recurrence_end < start_datetime.date():
+        raise ValueError("繰り返し終了日は開始日以降の日付を指定してください")
+    return recurrence_type, recurrence_end
+
+
 @bp.route("/create", methods=("GET", "POST"))
 @login_required
 @create_permission_required
@@ -186,6 +221,10 @@ def create():
                         f"{end_date} {end_time}", "%Y-%m-%d %H:%M"
                     )
 
+                recurrence_type, recurrence_end = parse_recurrence(
+                    request.form, start_datetime
+                )
+
                 # スケジュール作成
                 schedule = Schedule(
                     title=title,
@@ -200,6 +239,8 @@ def create():
                     status="pending",
                     notification_enabled=notification_enabled,
                     notification_minutes=notification_minutes,
+                    recurrence_type=recurrence_type,
+                    recurrence_end=recurrence_end,
                     created_by=g.user.id,
                 )
 
@@ -225,9 +266,21 @@ def create():
 @login_required
 @view_permission_required
 def view(id):
-    """スケジュール詳細表示"""
+    """スケジュール詳細表示（繰り返しスケジュールはoccurrenceで回を指定できる）"""
     schedule = Schedule.query.get_or_404(id)
-    return render_template("schedules/view.html", schedule=schedule)
+
+    occurrence = None
+    occurrence_date = parse_occurrence_date(request.args.get("occurrence"))
+    if occurrence_date and schedule.is_recurring:
+        occurrence = recurrence_service.get_occurrence(schedule, occurrence_date)
+        if occurrence is None:
+            flash("指定した回の予定はありません", "warning")
+
+    return render_template(
+        "schedules/view.html",
+        schedule=occurrence or schedule,
+        master=schedule,
+    )
 
 
 @bp.route("/<int:id>/edit", methods=("GET", "POST"))
@@ -294,6 +347,10 @@ def edit(id):
                         f"{end_date} {end_time}", "%Y-%m-%d %H:%M"
                     )
 
+                recurrence_type, recurrence_end = parse_recurrence(
+                    request.form, start_datetime
+                )
+
                 # スケジュール更新
                 schedule.title = title
                 schedule.description = description
@@ -307,6 +364,8 @@ def edit(id):
                 schedule.report_id = int(report_id) if report_id else None
                 schedule.notification_enabled = notification_enabled
                 schedule.notification_minutes = notification_minutes
+                schedule.recurrence_type = recurrence_type
+                schedule.recurrence_end = recurrence_end
 
                 db.session.commit()
                 flash("スケジュールが更新されました", "success")
@@ -348,19 +407,65 @@ def delete(id):
 @login_required
 @edit_permission_required
 def complete(id):
-    """スケジュール完了"""
+    """スケジュール完了（繰り返しスケジュールはoccurrence_dateで指定した回のみ）"""
     schedule = Schedule.query.get_or_404(id)
+    occurrence_date = parse_occurrence_date(request.form.get("occurrence_date"))
 
     try:
-        schedule.status = "completed"
-        db.session.commit()
-        flash(f"スケジュール「{schedule.title}」を完了しました", "success")
+        if occurrence_date and schedule.is_recurring:
+            recurrence_service.set_exception(
+                schedule, occurrence_date, status="completed"
+            )
+            db.session.commit()
+            flash(
+                f"スケジュール「{schedule.title}」（{occurrence_date.strftime('%Y/%m/%d')}）を完了しました",
+                "success",
+            )
+        else:
+            schedule.status = "completed"
+            db.session.commit()
+            flash(f"スケジュール「{schedule.title}」を完了しました", "success")
     except Exception as e:
+        db.session.rollback()
         flash(f"ステータス更新中にエラーが発生しました: {e}", "danger")
 
     return redirect(url_for("schedules.list"))
 
 
+@bp.route("/<int:id>/occurrences/<occurrence>/cancel", methods=["POST"])
+@login_required
+@edit_permission_required
+def cancel_occurrence(id, occurrence):
+    """繰り返しスケジュールの指定した回のみ取り消し"""
+    schedule = Schedule.query.get_or_404(id)
+    occurrence_date = parse_occurrence_date(occurrence)
+
+    try:
+        if occurrence_date is None:
+            raise ValueError("日付の形式が正しくありません")
+        recurrence_service.set_exception(schedule, occurrence_date, cancelled=True)
+        db.session.commit()
+        flash(
+            f"スケジュール「{schedule.title}」の{occurrence_date.strftime('%Y/%m/%d')}の予定を取り消しました",
+            "success",
+        )
+    except Exception as e:
+        db.session.rollback()
+        flash(f"予定の取り消し中にエラーが発生しました: {e}", "danger")
+
+    return redirect(url_for("schedules.list"))
+
+
+def parse_occurrence_date(value):
+    """繰り返しの回の指定（YYYY-MM-DD）を解析（指定がない・不正な場合はNone）"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
 @bp.route("/api/move", methods=["POST"])
 @login_required
 @edit_permission_required
@@ -384,6 +489,11 @@ def move_schedule():
         except ValueError:
             return jsonify({"error": "日付の形式が正しくありません"}), 400
 
+        # 繰り返しスケジュールの回を移動した場合は、その回のみ日付を変更
+        occurrence_date = parse_occurrence_date(data.get("occurrence_date"))
+        if occurrence_date and schedule.is_recurring:
+            return move_occurrence(schedule, occurrence_date, new_date_obj)
+
         # 日付が変更されない場合は何もしない
         if original_date == new_date_obj:
             return jsonify({"message": "日付に変更がありません"}), 200
@@ -452,89 +562,131 @@ def move_schedule():
         )
 
 
-@bp.route("/api/events")
-@login_required
-@view_permission_required
-def api_events():
-    """カレンダー表示用のイベントデータを返すAPI"""
-    start_date = request.args.get("start")
-    end_date = request.args.get("end")
-    status_filter = request.args.get("status", "all")  # ステータスフィルタを追加
+def move_occurrence(schedule, occurrence_date, new_date_obj):
+    """繰り返しスケジュールの指定した回の日付を変更（時刻・所要時間は変更しない）"""
+    occurrence = recurrence_service.get_occurrence(schedule, occurrence_date)
+    if occurrence is None:
+        return jsonify({"error": "指定した回の予定はありません"}), 404
 
-    if start_date and end_date:
-        try:
-            # 日付パースの改善（無効な日付を修正）
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+    if occurrence.start_datetime.date() == new_date_obj:
+        return jsonify({"message": "日付に変更がありません"}), 200
 
-            # 月末日の場合は適切な日付に修正
-            end_year, end_month, end_day = map(int, end_date.split("-"))
-            max_day = calendar.monthrange(end_year, end_month)[1]
-            if end_day > max_day:
-                end_day = max_day
-            end_dt = datetime(end_year, end_month, end_day, 23, 59, 59)
+    new_start_datetime = datetime.combine(
+        new_date_obj, occurrence.start_datetime.time()
+    )
+    new_end_datetime = new_start_datetime + (
+        occurrence.end_datetime - occurrence.start_datetime
+    )
+    recurrence_service.set_exception(
+        schedule,
+        occurrence_date,
+        start_datetime=new_start_datetime,
+        end_datetime=new_end_datetime,
+    )
+    db.session.commit()
 
-        except ValueError:
-            # フォールバック：現在月のデータを取得
-            now = datetime.now()
-            start_dt = datetime(now.year, now.month, 1)
-            end_dt = datetime(
-                now.year,
-                now.month,
-                calendar.monthrange(now.year, now.month)[1],
-                23,
-                59,
-                59,
-            )
+    return (
+        jsonify(
+            {
+                "message": "スケジュールを移動しました（この回のみ）",
+                "schedule": {
+                    "id": schedule.id,
+                    "title": schedule.title,
+                    "start_datetime": new_start_datetime.isoformat(),
+                    "end_datetime": new_end_datetime.isoformat(),
+                    "occurrence_date": occurrence_date.isoformat(),
+                    "new_date": new_date_obj.isoformat(),
+                },
+            }
+        ),
+        200,
+    )
 
-        # 基本的な日付フィルタ
-        query = Schedule.query.filter(
-            and_(Schedule.start_datetime >= start_dt, Schedule.start_datetime <= end_dt)
-        )
 
-        # ステータスフィルタを追加
-        if status_filter != "all":
-            query = query.filter(Schedule.status == status_filter)
+def parse_event_date(value: str, is_end: bool = False) -> datetime:
+    """
+    イベント取得期間の日付・日時を解析
+
+    日付のみ（YYYY-MM-DD）の終了日はその日を含むよう翌日0時に変換する。
+    存在しない日付（2月31日など）はその月の末日として扱う
 
-        schedules = query.all()
+    Raises:
+        ValueError: 日付として解析できない場合
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        # 月末日を超える日付は適切な日付に修正
+        year, month, day = map(int, value.split("-"))
+        day = min(day, calendar.monthrange(year, month)[1])
+        parsed = datetime(year, month, day)
+
+    # タイムゾーン付き（カレンダーライブラリ形式）の場合もローカル日時として扱う
+    parsed = parsed.replace(tzinfo=None)
+    if is_end and len(value) <= len("YYYY-MM-DD"):
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def parse_event_range(args):
+    """
+    イベント取得期間を解析し、上限日数を超える場合は開始日から上限日数までに制限
+
+    Returns:
+        tuple: (開始日時, 終了日時（この日時を含まない）, 期間を制限したかどうか)
+
+    Raises:
+        ValueError: 期間の指定がない・不正な場合
+    """
+    start_param = args.get("start")
+    end_param = args.get("end")
+    if not start_param or not end_param:
+        raise ValueError("取得期間（start・end）を指定してください")
+
+    try:
+        start_dt = parse_event_date(start_param)
+        end_dt = parse_event_date(end_param, is_end=True)
+    except ValueError:
+        raise ValueError("取得期間の日付が正しくありません")
+
+    if end_dt <= start_dt:
+        raise ValueError("終了日は開始日より後の日付を指定してください")
+
+    max_days = current_app.config.get(
+        "SCHEDULE_EVENTS_MAX_DAYS", DEFAULT_EVENTS_MAX_DAYS
+    )
+    window_end = start_dt + timedelta(days=max_days)
+    if end_dt > window_end:
+        return start_dt, window_end, True
+    return start_dt, end_dt, False
+
+
+@bp.route("/api/events")
+@login_required
+@view_permission_required
+def api_events():
+    """カレンダー表示用のイベントデータを返すAPI（取得期間の指定が必須）"""
+    status_filter = request.args.get("status", "all")  # ステータスフィルタを追加
+
+    try:
+        start_dt, end_dt, truncated = parse_event_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # 変更がなければイベントを読み込まずに304を返す
+    etag = schedule_event_service.compute_etag(start_dt, end_dt, status_filter)
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
     else:
-        query = Schedule.query
-        # ステータスフィルタを追加
-        if status_filter != "all":
-            query = query.filter(Schedule.status == status_filter)
-        schedules = query.all()
-
-    events = []
-    for schedule in schedules:
-        # ステータスに応じた色設定
-        color_map = {
-            "pending": "#ffc107",  # 黄色（警告）
-            "completed": "#28a745",  # 緑色（成功）
-            "cancelled": "#6c757d",  # 灰色（無効）
-        }
-
-        events.append(
-            {
-                "id": schedule.id,
-                "title": schedule.title,
-                "start": schedule.start_datetime.isoformat(),
-                "end": schedule.end_datetime.isoformat(),
-                "allDay": schedule.all_day,
-                "backgroundColor": color_map.get(schedule.status, "#007bff"),
-                "borderColor": color_map.get(schedule.status, "#007bff"),
-                "extendedProps": {
-                    "status": schedule.status,
-                    "priority": schedule.priority,
-                    "description": schedule.description,
-                    "customer_name": (
-                        schedule.customer.name if schedule.customer else None
-                    ),
-                    "property_name": (
-                        schedule.schedule_property.name
-                        if schedule.schedule_property
-                        else None
-                    ),
-                },
-            }
+        events = schedule_event_service.load_events(start_dt, end_dt, status_filter)
+        response = current_app.response_class(
+            schedule_event_service.serialize(events), mimetype="application/json"
         )
 
-    return jsonify(events)
+    response.set_etag(etag)
+    # ブラウザに保存させ、再取得時は必ずETagで確認させる
+    response.headers["Cache-Control"] = "private, no-cache"
+    if truncated:
+        # 取得期間を制限した場合は、実際に返した期間の終了日時を通知
+        response.headers["X-Events-Range-End"] = end_dt.isoformat()
+    return response
@@ -0,0 +1,202 @@
+"""
+受注の複数年推移・前年比較の集計サービス
+
+受注月間表の集計済みテーブル（monthly_rollups）から対象期間の行を1回のクエリで取得し、
+集計種別×受付種別ごとの「年×月」の配列にまとめてから、年合計・前年差・前年比を
+配列単位で計算する。結果は集計済みデータが更新されるまで短時間キャッシュする
+"""
+
+import time
+import logging
+import threading
+
+from flask import current_app
+
+from app.models.monthly_rollup import MonthlyRollup
+from app.services.summary_service import ROLLUP_FIELDS, PENDING_STATUSES
+from app.services.monthly_rollup_service import monthly_rollup_service
+
+
+# 集計結果のキャッシュ有効期間（秒）の既定値
+DEFAULT_ANALYTICS_CACHE_TTL = 300
+
+# 一度に取得できる年数の上限
+MAX_ANALYTICS_YEARS = 10
+
+# キャッシュに保持する結果数の上限
+MAX_CACHE_ENTRIES = 64
+
+# ステータスの絞り込み（all: 完了＋未完了）
+STATUS_FILTERS = {
+    "all": ("completed",) + PENDING_STATUSES,
+    "completed": ("completed",),
+    "pending": PENDING_STATUSES,
+}
+
+# 全受付種別の合計を表すキー
+TOTAL_KEY = "合計"
+
+
+def _add(a, b):
+    return [x + y for x, y in zip(a, b)]
+
+
+def _year_over_year(current, previous):
+    """前年差と前年比（%、前年が0の場合はNone）を月ごとに計算"""
+    deltas = [x - y for x, y in zip(current, previous)]
+    rates = [
+        round((x - y) * 100 / y, 1) if y else None for x, y in zip(current, previous)
+    ]
+    return deltas, rates
+
+
+class AnalyticsService:
+    """受注の複数年推移・前年比較の集計サービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def get_trends(self, start_year: int, end_year: int, status: str = "all"):
+        """
+        複数年の推移データを取得（キャッシュがあればそれを返す）
+
+        Args:
+            start_year (int): 開始年
+            end_year (int): 終了年（この年を含む）
+            status (str): ステータスの絞り込み（all/completed/pending）
+
+        Returns:
+            dict: 推移データ（JSONに変換可能な形式）
+        """
+        if status not in STATUS_FILTERS:
+            raise ValueError(f"不正なステータスです: {status}")
+        if start_year > end_year:
+            raise ValueError("開始年は終了年以前を指定してください")
+        if end_year - start_year + 1 > MAX_ANALYTICS_YEARS:
+            raise ValueError(f"一度に取得できるのは{MAX_ANALYTICS_YEARS}年分までです")
+
+        ttl = current_app.config.get("ANALYTICS_CACHE_TTL", DEFAULT_ANALYTICS_CACHE_TTL)
+        key = (start_year, end_year, status)
+        generation = monthly_rollup_service.generation
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > now and cached[1] == generation:
+                return cached[2]
+
+        data = self.build_trends(start_year, end_year, status)
+
+        with self._lock:
+            if len(self._cache) >= MAX_CACHE_ENTRIES:
+                # 期限切れ・古い世代のものを削除し、それでも多ければすべて削除
+                self._cache = {
+                    cache_key: entry
+                    for cache_key, entry in self._cache.items()
+                    if entry[0] > now and entry[1] == generation
+                }
+                if len(self._cache) >= MAX_CACHE_ENTRIES:
+                    self._cache.clear()
+            self._cache[key] = (now + ttl, generation, data)
+        return data
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def build_trends(self, start_year: int, end_year: int, status: str = "all"):
+        """
+        集計済みテーブルから複数年の推移データを作成
+
+        Returns:
+            dict: years, reception_types, metrics（集計種別 -> 受付種別 -> 年ごとの系列）
+        """
+        years = list(range(start_year, end_year + 1))
+        # 開始年の前年比較のため、前年分も合わせて取得する
+        grid_years = [start_year - 1] + years
+        year_index = {year: i for i, year in enumerate(grid_years)}
+
+        # 集計済みデータを1回のクエリで取得
+        rows = (
+            MonthlyRollup.query.with_entities(
+                MonthlyRollup.year,
+                MonthlyRollup.month,
+                MonthlyRollup.reception_type,
+                MonthlyRollup.report_count,
+                MonthlyRollup.ac_quantity,
+                MonthlyRollup.amount,
+            )
+            .filter(
+                MonthlyRollup.year.between(start_year - 1, end_year),
+                MonthlyRollup.status.in_(STATUS_FILTERS[status]),
+                MonthlyRollup.reception_type != "",
+            )
+            .all()
+        )
+
+        # 受付種別ごとに「年×月」の平坦な配列（年数×12）へ値を積み上げる
+        fields = list(ROLLUP_FIELDS)
+        size = len(grid_years) * 12
+        grids = {}
+        for year, month, reception_type, *values in rows:
+            grid = grids.get(reception_type)
+            if grid is None:
+                grid = grids[reception_type] = [[0] * size for _ in fields]
+            position = year_index[year] * 12 + month - 1
+            for field_grid, value in zip(grid, values):
+                field_grid[position] += value or 0
+
+        reception_types = sorted(grids)
+        total_grid = [[0] * size for _ in fields]
+        for grid in grids.values():
+            total_grid = [_add(a, b) for a, b in zip(total_grid, grid)]
+        grids[TOTAL_KEY] = total_grid
+
+        metrics = {}
+        for field_index, summary_type in enumerate(fields):
+            metrics[summary_type] = {
+                reception_type: self._build_series(grid_years, grid[field_index])
+                for reception_type, grid in grids.items()
+            }
+
+        return {
+            "years": years,
+            "status": status,
+            "reception_types": reception_types,
+            "total_key": TOTAL_KEY,
+            "metrics": metrics,
+        }
+
+    def _build_series(self, grid_years, values):
+        """
+        平坦な配列を年ごとの月次系列・年合計・前年比較に分割
+
+        配列の先頭の年は前年比較の基準としてのみ使い、結果には含めない
+        """
+        series = {}
+        previous_monthly = values[:12]
+        previous_total = sum(previous_monthly)
+        for i, year in enumerate(grid_years[1:], start=1):
+            monthly = values[i * 12 : (i + 1) * 12]
+            total = sum(monthly)
+            deltas, rates = _year_over_year(monthly, previous_monthly)
+            series[str(year)] = {
+                "monthly": monthly,
+                "total": total,
+                "yoy_delta": deltas,
+                "yoy_rate": rates,
+                "yoy_total_delta": total - previous_total,
+                "yoy_total_rate": (
+                    round((total - previous_total) * 100 / previous_total, 1)
+                    if previous_total
+                    else None
+                ),
+            }
+            previous_monthly, previous_total = monthly, total
+        return series
+
+
+# サービスインスタンス
+analytics_service = AnalyticsService()
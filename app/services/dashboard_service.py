@@ -0,0 +1,145 @@
+"""
+ダッシュボード（トップページ）の統計情報キャッシュサービス
+
+件数と最近の登録データを短時間メモリに保持し、顧客・物件・報告書の
+登録・削除時に明示的に破棄する。キャッシュにはORMオブジェクトではなく
+表示に必要な値だけを保持する（リクエストをまたいでセッションに依存しないため）
+"""
+
+import time
+import logging
+import threading
+
+from flask import current_app
+
+from app import db
+from app.models.customer import Customer
+from app.models.property import Property
+from app.models.report import Report
+
+
+# キャッシュの有効期間（秒）の既定値
+DEFAULT_DASHBOARD_CACHE_TTL = 30
+
+# 最近の登録データの表示件数
+RECENT_LIMIT = 5
+
+
+class DashboardService:
+    """ダッシュボードの統計情報キャッシュサービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._expires_at = 0.0
+        self._version = 0
+
+    def get_snapshot(self) -> dict:
+        """
+        ダッシュボードの表示データを取得（有効なキャッシュがあればそれを返す）
+
+        同時に複数のリクエストが来た場合も、集計は1つのスレッドだけが行う
+
+        Returns:
+            dict: stats, recent_reports, recent_customers, recent_properties
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._expires_at:
+            return snapshot
+
+        with self._lock:
+            # 待っている間に他のスレッドが作成した場合はそれを使う
+            if self._snapshot is not None and time.monotonic() < self._expires_at:
+                return self._snapshot
+
+            version = self._version
+            snapshot = self.build_snapshot()
+            # 集計中に破棄された場合は、古い可能性があるため保存しない
+            if version == self._version:
+                ttl = current_app.config.get(
+                    "DASHBOARD_CACHE_TTL", DEFAULT_DASHBOARD_CACHE_TTL
+                )
+                self._snapshot = snapshot
+                self._expires_at = time.monotonic() + ttl
+            return snapshot
+
+    def invalidate(self):
+        """キャッシュを破棄（顧客・物件・報告書の登録・削除時に呼び出す）"""
+        self._version += 1
+        self._snapshot = None
+        self._expires_at = 0.0
+
+    def build_snapshot(self) -> dict:
+        """データベースから表示データを作成"""
+        # 件数は1回のクエリでまとめて取得
+        counts = db.session.execute(
+            db.select(
+                db.select(db.func.count(Customer.id)).scalar_subquery(),
+                db.select(db.func.count(Property.id)).scalar_subquery(),
+                db.select(db.func.count(Report.id)).scalar_subquery(),
+                db.select(db.func.count(Report.id))
+                .where(Report.status == "pending")
+                .scalar_subquery(),
+            )
+        ).one()
+        stats = {
+            "customer_count": counts[0],
+            "property_count": counts[1],
+            "report_count": counts[2],
+            "pending_count": counts[3],
+        }
+
+        # 最近の報告書（物件名を含む）
+        recent_reports = [
+            {
+                "id": report_id,
+                "date": report_date,
+                "status": status,
+                "property_name": property_name,
+            }
+            for report_id, report_date, status, property_name in db.session.execute(
+                db.select(Report.id, Report.date, Report.status, Property.name)
+                .join(Property, Report.property_id == Property.id)
+                .order_by(Report.created_at.desc())
+                .limit(RECENT_LIMIT)
+            )
+        ]
+
+        # 最近のお客様（物件数を含む）
+        property_counts = (
+            db.select(db.func.count(Property.id))
+            .where(Property.customer_id == Customer.id)
+            .correlate(Customer)
+            .scalar_subquery()
+        )
+        recent_customers = [
+            {"id": customer_id, "name": name, "property_count": property_count}
+            for customer_id, name, property_count in db.session.execute(
+                db.select(Customer.id, Customer.name, property_counts)
+                .order_by(Customer.created_at.desc())
+                .limit(RECENT_LIMIT)
+            )
+        ]
+
+        # 最近の物件（顧客名を含む）
+        recent_properties = [
+            {"id": property_id, "name": name, "customer_name": customer_name}
+            for property_id, name, customer_name in db.session.execute(
+                db.select(Property.id, Property.name, Customer.name)
+                .join(Customer, Property.customer_id == Customer.id)
+                .order_by(Property.created_at.desc())
+                .limit(RECENT_LIMIT)
+            )
+        ]
+
+        return {
+            "stats": stats,
+            "recent_reports": recent_reports,
+            "recent_customers": recent_customers,
+            "recent_properties": recent_properties,
+        }
+
+
+# サービスインスタンス
+dashboard_service = DashboardService()
@@ -0,0 +1,205 @@
+"""
+スケジュール通知のまとめ送信（ダイジェスト）サービス
+
+まとめて通知を受け取るユーザーには、スケジュールごとのリマインダー・開始通知の代わりに
+期間内のスケジュールを1通にまとめたメールを送る
+（1日1回: その日の予定、1時間ごと: 次の1時間の予定）。
+通知チェックごとにまだ送っていないユーザーがいる期間だけを対象にし、
+対象期間のスケジュールはまとめて1回の検索で取得してユーザーごとに振り分ける
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models.user import User
+from app.models.schedule import Schedule
+from app.models.notification_digest import NotificationDigest
+from app.services.recurrence_service import recurrence_service
+
+
+# 1日1回のまとめを送信する時刻（時）の既定値
+DEFAULT_DAILY_DIGEST_HOUR = 7
+
+# まとめて通知の種類と期間
+HOURLY_WINDOW = timedelta(hours=1)
+DAILY_WINDOW = timedelta(days=1)
+
+
+class DigestService:
+    """スケジュール通知のまとめ送信（ダイジェスト）サービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.daily_digest_hour = int(
+            os.getenv("NOTIFICATION_DIGEST_HOUR", DEFAULT_DAILY_DIGEST_HOUR)
+        )
+
+    def current_windows(self, now: datetime):
+        """
+        現在送信するまとめの期間
+
+        Returns:
+            list: (まとめの種類, 期間の開始日時, 期間の終了日時) のリスト
+        """
+        windows = []
+
+        # 1時間ごと: 次の1時間（10時台のチェックで11時台の予定）
+        next_hour = now.replace(minute=0, second=0, microsecond=0) + HOURLY_WINDOW
+        windows.append(
+            (User.NOTIFICATION_MODE_HOURLY, next_hour, next_hour + HOURLY_WINDOW)
+        )
+
+        # 1日1回: 送信時刻以降の最初のチェックでその日の予定
+        if now.hour >= self.daily_digest_hour:
+            day_start = datetime.combine(now.date(), datetime.min.time())
+            windows.append(
+                (User.NOTIFICATION_MODE_DAILY, day_start, day_start + DAILY_WINDOW)
+            )
+        return windows
+
+    def _pending_users(self, digest_type: str, window_start: datetime):
+        """期間のまとめをまだ送っていないユーザー"""
+        sent_user_ids = db.session.query(NotificationDigest.user_id).filter(
+            NotificationDigest.digest_type == digest_type,
+            NotificationDigest.window_start == window_start,
+        )
+        return (
+            User.query.filter(
+                User.notification_mode == digest_type,
+                User.active == True,
+                User.email.like("%@%"),
+                User.id.notin_(sent_user_ids),
+            )
+            .order_by(User.id)
+            .all()
+        )
+
+    def load_schedules(self, start_dt: datetime, end_dt: datetime, user_ids):
+        """
+        期間内の通知対象のスケジュール（繰り返しの回を含む）を作成者ごとに取得
+
+        Returns:
+            dict: ユーザーID -> スケジュールとScheduleOccurrenceのリスト（開始日時順）
+        """
+        options = (
+            joinedload(Schedule.customer),
+            joinedload(Schedule.schedule_property),
+        )
+        schedules = (
+            Schedule.query.options(*options)
+            .filter(
+                Schedule.start_datetime >= start_dt,
+                Schedule.start_datetime < end_dt,
+                Schedule.status == "pending",
+                Schedule.notification_enabled == True,
+                Schedule.created_by.in_(user_ids),
+                recurrence_service.single_filter(),
+            )
+            .all()
+        )
+        schedules.extend(
+            occurrence
+            for occurrence in recurrence_service.occurrences_in_range(
+                start_dt, end_dt, "pending", options
+            )
+            if occurrence.notification_enabled and occurrence.created_by in user_ids
+        )
+        schedules.sort(key=lambda schedule: (schedule.start_datetime, schedule.id))
+
+        by_user = {}
+        for schedule in schedules:
+            by_user.setdefault(schedule.created_by, []).append(schedule)
+        return by_user
+
+    def _claim(self, user_id, digest_type, window_start, schedule_count):
+        """
+        まとめの送信記録を先に登録して送信する権利を得る
+
+        Returns:
+            NotificationDigest: 登録した送信記録（他の処理が登録済みの場合はNone）
+        """
+        digest = NotificationDigest(
+            user_id=user_id,
+            digest_type=digest_type,
+            window_start=window_start,
+            status="sending" if schedule_count else "empty",
+            schedule_count=schedule_count,
+        )
+        db.session.add(digest)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None
+        return digest
+
+    def process(self, send, now: datetime = None) -> int:
+        """
+        送信時刻になったまとめて通知を送信
+
+        Args:
+            send (callable): send(ユーザー, まとめの種類, 期間の開始日時, スケジュールのリスト)
+                -> bool
+            now (datetime): 現在日時（省略時は現在）
+
+        Returns:
+            int: 送信したまとめの数
+        """
+        now = now or datetime.now()
+
+        # まだ送っていないユーザーがいる期間だけを対象にする
+        pending = []
+        for digest_type, start_dt, end_dt in self.current_windows(now):
+            users = self._pending_users(digest_type, start_dt)
+            if users:
+                pending.append((digest_type, start_dt, end_dt, users))
+        if not pending:
+            return 0
+
+        # 対象期間全体のスケジュールを1回で取得し、期間・ユーザーごとに振り分ける
+        user_ids = {user.id for *_, users in pending for user in users}
+        schedules_by_user = self.load_schedules(
+            min(start_dt for _, start_dt, _, _ in pending),
+            max(end_dt for _, _, end_dt, _ in pending),
+            user_ids,
+        )
+
+        sent_count = 0
+        for digest_type, start_dt, end_dt, users in pending:
+            for user in users:
+                schedules = [
+                    schedule
+                    for schedule in schedules_by_user.get(user.id, [])
+                    if start_dt <= schedule.start_datetime < end_dt
+                ]
+                digest = self._claim(user.id, digest_type, start_dt, len(schedules))
+                if digest is None or not schedules:
+                    continue
+
+                try:
+                    success = send(user, digest_type, start_dt, schedules)
+                except Exception as e:
+                    self.logger.error(f"まとめて通知の送信エラー: {user.id}: {e}")
+                    success = False
+
+                if success:
+                    digest.status = "sent"
+                    digest.sent_at = datetime.utcnow()
+                    sent_count += 1
+                else:
+                    # 送信できなかった場合は記録を削除し、次のチェックで再送する
+                    db.session.delete(digest)
+                db.session.commit()
+
+        if sent_count:
+            self.logger.info(f"まとめて通知を送信しました: {sent_count}件")
+        return sent_count
+
+
+# サービスインスタンス
+digest_service = DigestService()
@@ -5,7 +5,6 @@ Gmailを使用してスケジュール通知メールを送信するサービス
 """
 
 import os
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
@@ -17,6 +16,23 @@ import logging
 from app import db
 from app.models.schedule import Schedule
 from app.models.user import User
+from app.services.notification_queue_service import notification_queue_service
+from app.services.outbox_service import outbox_service
+from app.services.digest_service import digest_service
+from app.services.email_templates import render_email, format_datetime
+from app.services.smtp_connection_service import (
+    SMTPConnectionManager,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_MAX_MESSAGES_PER_CONNECTION,
+)
+
+
+# 通知タイプの表示名
+NOTIFICATION_TYPE_DISPLAY = {
+    "reminder": "リマインダー",
+    "start": "開始通知",
+    "complete": "完了通知",
+}
 
 
 class EmailService:
@@ -30,10 +46,52 @@ class EmailService:
         self.password = os.getenv("MAIL_PASSWORD")
         self.default_sender = os.getenv("MAIL_DEFAULT_SENDER")
         self.enabled = os.getenv("NOTIFICATION_ENABLED", "True").lower() == "true"
+        # 同じ通知チェックで送信する送信先が同じ通知を1通にまとめる
+        # （既定は無効で、これまでどおり通知ごとにメールを送信する）
+        self.digest_enabled = (
+            os.getenv("NOTIFICATION_DIGEST", "False").lower() == "true"
+        )
+
+        # SMTP接続の使い回しの設定
+        self.idle_timeout = float(os.getenv("MAIL_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+        self.max_messages_per_connection = int(
+            os.getenv(
+                "MAIL_MAX_MESSAGES_PER_CONNECTION", DEFAULT_MAX_MESSAGES_PER_CONNECTION
+            )
+        )
+        self._connection_manager = None
 
         # ログ設定
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def connection(self) -> SMTPConnectionManager:
+        """SMTP接続の管理（メール設定が変更された場合は作り直す）"""
+        manager = self._connection_manager
+        settings = (
+            self.smtp_server,
+            self.smtp_port,
+            self.use_tls,
+            self.username,
+            self.password,
+        )
+        if manager is None or manager.settings != settings:
+            if manager is not None:
+                manager.close()
+            manager = SMTPConnectionManager(
+                *settings,
+                idle_timeout=self.idle_timeout,
+                max_messages_per_connection=self.max_messages_per_connection,
+            )
+            self._connection_manager = manager
+        return manager
+
+    def close_idle_connection(self) -> bool:
+        """アイドル時間を過ぎたSMTP接続を閉じる"""
+        if self._connection_manager is None:
+            return False
+        return self._connection_manager.close_idle()
+
     def is_configured(self) -> bool:
         """メール設定が正しく行われているかチェック"""
         return all([self.username, self.password, self.default_sender, self.enabled])
@@ -66,27 +124,10 @@ class EmailService:
             return False
 
         try:
-            # メッセージ作成
-            message = MIMEMultipart("alternative")
-            message["From"] = self.default_sender
-            message["To"] = ", ".join(to_addresses)
-            message["Subject"] = subject
-
-            # テキスト部分
-            if text_body:
-                text_part = MIMEText(text_body, "plain", "utf-8")
-                message.attach(text_part)
-
-            # HTML部分
-            html_part = MIMEText(html_body, "html", "utf-8")
-            message.attach(html_part)
-
-            # SMTP接続とメール送信
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                if self.use_tls:
-                    server.starttls()
-                server.login(self.username, self.password)
-                server.send_message(message)
+            message = self._build_message(to_addresses, subject, html_body, text_body)
+
+            # 保持している認証済みの接続で送信（必要な場合のみ接続・ログイン）
+            self.connection.send(message)
 
             self.logger.info(f"メール送信成功: {', '.join(to_addresses)}")
             return True
@@ -95,6 +136,99 @@ class EmailService:
             self.logger.error(f"メール送信エラー: {e}")
             return False
 
+    def _build_message(
+        self,
+        to_addresses: List[str],
+        subject: str,
+        html_body: str,
+        text_body: Optional[str] = None,
+    ) -> MIMEMultipart:
+        """送信するメールを作成"""
+        message = MIMEMultipart("alternative")
+        message["From"] = self.default_sender
+        message["To"] = ", ".join(to_addresses)
+        message["Subject"] = subject
+
+        # テキスト部分
+        if text_body:
+            text_part = MIMEText(text_body, "plain", "utf-8")
+            message.attach(text_part)
+
+        # HTML部分
+        html_part = MIMEText(html_body, "html", "utf-8")
+        message.attach(html_part)
+        return message
+
+    def queue_email(
+        self,
+        to_addresses: List[str],
+        subject: str,
+        html_body: str,
+        text_body: Optional[str] = None,
+    ) -> bool:
+        """
+        メールを送信待ちに登録（送信はスケジューラーの送信処理で行う）
+
+        画面からの送信でSMTPの応答を待たないために使用する
+
+        Args:
+            to_addresses: 送信先メールアドレスリスト
+            subject: 件名
+            html_body: HTML本文
+            text_body: テキスト本文（オプション）
+
+        Returns:
+            bool: 登録成功の場合True
+        """
+        if not self.is_configured():
+            self.logger.error("メール設定が不完全です")
+            return False
+
+        if not to_addresses:
+            self.logger.warning("送信先アドレスが指定されていません")
+            return False
+
+        try:
+            outbox_service.enqueue(to_addresses, subject, html_body, text_body)
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"メール登録エラー: {e}")
+            return False
+
+    def _send_outbox_message(self, outbox_message):
+        """送信待ちのメールを送信（失敗した場合は例外を送出して再送させる）"""
+        message = self._build_message(
+            outbox_message.recipients,
+            outbox_message.subject,
+            outbox_message.html_body,
+            outbox_message.text_body,
+        )
+        refused = self.connection.send(message)
+        if refused:
+            self.logger.warning(f"受け付けられなかった送信先: {', '.join(refused)}")
+
+    def send_outbox(self) -> dict:
+        """
+        送信日時になった送信待ちのメールを送信
+
+        Returns:
+            dict: 送信数・再送待ち数・送信失敗数
+        """
+        if not self.is_configured():
+            self.logger.warning(
+                "メール設定が不完全のため送信待ちのメールを送信しません"
+            )
+            return {"sent": 0, "retry": 0, "failed": 0}
+
+        with self.connection.batch():
+            result = outbox_service.process(self._send_outbox_message)
+
+        if result["sent"] > 0:
+            self.logger.info(f"送信待ちのメールを送信しました: {result['sent']} 件")
+        return result
+
     def send_schedule_notification(
         self, schedule: Schedule, notification_type: str = "reminder"
     ) -> bool:
@@ -112,6 +246,9 @@ class EmailService:
             # 送信先メールアドレスを取得
             to_addresses = self._get_notification_recipients(schedule)
             if not to_addresses:
+                if self._notified_by_digest(schedule):
+                    # 作成者にはまとめて通知で送るため、ここでは送信しない
+                    return True
                 self.logger.warning(
                     f"スケジュール {schedule.id} の送信先が見つかりません"
                 )
@@ -142,8 +279,12 @@ class EmailService:
         recipients = []
 
         try:
-            # スケジュール作成者
-            if schedule.creator and schedule.creator.email:
+            # スケジュール作成者（まとめて通知を受け取るユーザーを除く）
+            if (
+                schedule.creator
+                and schedule.creator.email
+                and schedule.creator.receives_immediate_notifications()
+            ):
                 recipients.append(schedule.creator.email)
 
             # 関連する顧客のメールアドレス
@@ -162,6 +303,39 @@ class EmailService:
             self.logger.error(f"受信者取得エラー: {e}")
             return []
 
+    def _notification_message(self, schedule, notification_type: str) -> tuple:
+        """通知タイプ別の件名・見出し・メッセージ"""
+        title = schedule.title
+        start_time = format_datetime(schedule.start_datetime)
+        if notification_type == "reminder":
+            return (
+                f"【リマインダー】{title} - {start_time}",
+                "スケジュールリマインダー",
+                f"以下のスケジュールが {schedule.notification_minutes} 分後に開始予定です。",
+            )
+        if notification_type == "start":
+            return (
+                f"【開始通知】{title} - {start_time}",
+                "スケジュール開始通知",
+                "以下のスケジュールが開始時刻になりました。",
+            )
+        if notification_type == "complete":
+            return (
+                f"【完了通知】{title} - 完了",
+                "スケジュール完了通知",
+                "以下のスケジュールが完了しました。",
+            )
+        return f"【通知】{title}", "スケジュール通知", "スケジュールの通知です。"
+
+    def _notified_by_digest(self, schedule: Schedule) -> bool:
+        """作成者がまとめて通知でスケジュールの通知を受け取るかどうか"""
+        creator = schedule.creator
+        return bool(
+            creator
+            and creator.email
+            and not creator.receives_immediate_notifications()
+        )
+
     def _generate_notification_content(
         self, schedule: Schedule, notification_type: str
     ) -> tuple:
@@ -175,102 +349,151 @@ class EmailService:
         Returns:
             tuple: (件名, HTML本文, テキスト本文)
         """
-        # 基本情報
-        title = schedule.title
-        start_time = schedule.start_datetime.strftime("%Y年%m月%d日 %H:%M")
-        end_time = schedule.end_datetime.strftime("%Y年%m月%d日 %H:%M")
+        subject, message_title, message_body = self._notification_message(
+            schedule, notification_type
+        )
+        html_body, text_body = render_email(
+            "schedule_notification",
+            schedule=schedule,
+            message_title=message_title,
+            message_body=message_body,
+        )
+        return subject, html_body, text_body
 
-        # 顧客・物件情報
-        customer_info = ""
-        if schedule.customer:
-            customer_info = f"お客様: {schedule.customer.name}"
-            if schedule.schedule_property:
-                customer_info += f"\n物件: {schedule.schedule_property.name}"
+    def _generate_digest_content(self, notifications) -> tuple:
+        """
+        複数の通知をまとめたメール内容生成（ダイジェスト）
 
-        # 通知タイプ別の件名とメッセージ
-        if notification_type == "reminder":
-            subject = f"【リマインダー】{title} - {start_time}"
-            message_title = "スケジュールリマインダー"
-            message_body = f"以下のスケジュールが {schedule.notification_minutes} 分後に開始予定です。"
-        elif notification_type == "start":
-            subject = f"【開始通知】{title} - {start_time}"
-            message_title = "スケジュール開始通知"
-            message_body = "以下のスケジュールが開始時刻になりました。"
-        elif notification_type == "complete":
-            subject = f"【完了通知】{title} - 完了"
-            message_title = "スケジュール完了通知"
-            message_body = "以下のスケジュールが完了しました。"
-        else:
-            subject = f"【通知】{title}"
-            message_title = "スケジュール通知"
-            message_body = "スケジュールの通知です。"
-
-        # HTML本文
-        description_html = (
-            f"<p><strong>説明:</strong> {schedule.description}</p>"
-            if schedule.description
-            else ""
+        Args:
+            notifications: (スケジュール, 通知タイプ) のリスト
+
+        Returns:
+            tuple: (件名, HTML本文, テキスト本文)
+        """
+        notifications = sorted(
+            notifications, key=lambda notification: notification[0].start_datetime
         )
-        customer_html = f"<p>{customer_info}</p>" if customer_info else ""
-
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{ font-family: 'Segoe UI', Arial, sans-serif; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: #007bff; color: white; padding: 20px; text-align: center; }}
-                .content {{ background: #f8f9fa; padding: 20px; }}
-                .schedule-info {{ background: white; padding: 15px; border-left: 4px solid #007bff; margin: 10px 0; }}
-                .footer {{ text-align: center; padding: 20px; color: #6c757d; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>{message_title}</h1>
-                </div>
-                <div class="content">
-                    <p>{message_body}</p>
-                    <div class="schedule-info">
-                        <h3>{title}</h3>
-                        <p><strong>開始:</strong> {start_time}</p>
-                        <p><strong>終了:</strong> {end_time}</p>
-                        {description_html}
-                        {customer_html}
-                    </div>
-                </div>
-                <div class="footer">
-                    <p>エアコンクリーニング完了報告書システム</p>
-                    <p>このメールは自動送信されています。</p>
-                </div>
-            </div>
-        </body>
-        </html>
+        first_start = format_datetime(notifications[0][0].start_datetime)
+        subject = f"【通知まとめ】スケジュール {len(notifications)} 件 - {first_start}〜"
+        html_body, text_body = render_email(
+            "schedule_digest",
+            notifications=[
+                (
+                    schedule,
+                    NOTIFICATION_TYPE_DISPLAY.get(notification_type, "通知"),
+                )
+                for schedule, notification_type in notifications
+            ],
+            message_title="スケジュール通知まとめ",
+            message_body=(
+                f"以下の {len(notifications)} 件のスケジュールの通知をまとめてお送りします。"
+            ),
+        )
+        return subject, html_body, text_body
+
+    def send_schedule_notifications(self, notifications) -> List[bool]:
         """
+        複数のスケジュール通知を送信先ごとに1通にまとめて送信（ダイジェスト）
 
-        # テキスト本文
-        text_body = f"""
-{message_title}
+        送信先が同じ通知が1件だけの場合は通常の通知メールを送信する
 
-{message_body}
+        Args:
+            notifications: (スケジュール, 通知タイプ) のリスト
 
-スケジュール詳細:
-- タイトル: {title}
-- 開始: {start_time}
-- 終了: {end_time}
-{f"- 説明: {schedule.description}" if schedule.description else ""}
-{f"- {customer_info}" if customer_info else ""}
+        Returns:
+            List[bool]: 通知ごとの送信結果
+        """
+        groups = {}
+        for index, (schedule, _) in enumerate(notifications):
+            recipients = tuple(sorted(self._get_notification_recipients(schedule)))
+            groups.setdefault(recipients, []).append(index)
+
+        results = [False] * len(notifications)
+        for recipients, indexes in groups.items():
+            if not recipients:
+                for index in indexes:
+                    schedule = notifications[index][0]
+                    # 作成者にはまとめて通知で送るため、ここでは送信しない
+                    results[index] = self._notified_by_digest(schedule)
+                    if not results[index]:
+                        self.logger.warning(
+                            f"スケジュール {schedule.id} の送信先が見つかりません"
+                        )
+                continue
+            try:
+                if len(indexes) == 1:
+                    subject, html_body, text_body = (
+                        self._generate_notification_content(
+                            *notifications[indexes[0]]
+                        )
+                    )
+                else:
+                    subject, html_body, text_body = self._generate_digest_content(
+                        [notifications[index] for index in indexes]
+                    )
+            except Exception as e:
+                self.logger.error(f"スケジュール通知エラー: {e}")
+                continue
 
----
-エアコンクリーニング完了報告書システム
-このメールは自動送信されています。
+            success = self.send_email(list(recipients), subject, html_body, text_body)
+            for index in indexes:
+                results[index] = success
+        return results
+
+    def _generate_user_digest_content(
+        self, digest_type: str, window_start: datetime, schedules
+    ) -> tuple:
         """
+        ユーザーごとのまとめて通知のメール内容生成
+
+        Args:
+            digest_type: まとめの種類（hourly, daily）
+            window_start: 期間の開始日時
+            schedules: 期間内のスケジュールのリスト
 
+        Returns:
+            tuple: (件名, HTML本文, テキスト本文)
+        """
+        if digest_type == User.NOTIFICATION_MODE_DAILY:
+            period = window_start.strftime("%Y年%m月%d日")
+            subject = f"【本日の予定】{period} のスケジュール {len(schedules)} 件"
+            message_title = "本日のスケジュール"
+        else:
+            period = (
+                f"{format_datetime(window_start)}〜"
+                f"{(window_start + timedelta(hours=1)).strftime('%H:%M')}"
+            )
+            subject = f"【次の1時間の予定】{period} のスケジュール {len(schedules)} 件"
+            message_title = "次の1時間のスケジュール"
+
+        html_body, text_body = render_email(
+            "schedule_digest",
+            notifications=[(schedule, None) for schedule in schedules],
+            message_title=message_title,
+            message_body=f"{period} のスケジュールは以下の {len(schedules)} 件です。",
+        )
         return subject, html_body, text_body
 
+    def send_user_digest(
+        self, user: User, digest_type: str, window_start: datetime, schedules
+    ) -> bool:
+        """
+        ユーザーにまとめて通知を送信
+
+        Args:
+            user: 送信先ユーザー
+            digest_type: まとめの種類（hourly, daily）
+            window_start: 期間の開始日時
+            schedules: 期間内のスケジュールのリスト
+
+        Returns:
+            bool: 送信成功の場合True
+        """
+        subject, html_body, text_body = self._generate_user_digest_content(
+            digest_type, window_start, schedules
+        )
+        return self.send_email([user.email], subject, html_body, text_body)
+
     def check_and_send_notifications(self) -> int:
         """
         通知が必要なスケジュールをチェックして通知送信
@@ -282,48 +505,20 @@ class EmailService:
             self.logger.warning("メール設定が不完全のため通知をスキップ")
             return 0
 
-        sent_count = 0
-        now = datetime.now()
-
         try:
-            # 通知が有効なスケジュールを取得
-            schedules = Schedule.query.filter(
-                Schedule.notification_enabled == True, Schedule.status == "pending"
-            ).all()
-
-            for schedule in schedules:
-                try:
-                    # 通知タイミングの計算
-                    notification_time = schedule.start_datetime - timedelta(
-                        minutes=schedule.notification_minutes
-                    )
-
-                    # 通知時刻到来チェック（1分の誤差を許容）
-                    time_diff = abs((now - notification_time).total_seconds())
-
-                    if time_diff <= 60:  # 1分以内
-                        if self.send_schedule_notification(schedule, "reminder"):
-                            sent_count += 1
-                            self.logger.info(
-                                f"通知送信完了: スケジュール {schedule.id}"
-                            )
-
-                    # 開始時刻通知（開始時刻から5分以内）
-                    start_time_diff = abs(
-                        (now - schedule.start_datetime).total_seconds()
-                    )
-                    if start_time_diff <= 300:  # 5分以内
-                        if self.send_schedule_notification(schedule, "start"):
-                            sent_count += 1
-                            self.logger.info(
-                                f"開始通知送信完了: スケジュール {schedule.id}"
-                            )
-
-                except Exception as e:
-                    self.logger.error(
-                        f"スケジュール {schedule.id} の通知処理エラー: {e}"
-                    )
-                    continue
+            # 送信日時になったスケジュールだけを取得して送信（送信記録で二重送信を防ぐ）
+            # 1回のチェックの通知は同じSMTP接続でまとめて送信する
+            with self.connection.batch():
+                sent_count = notification_queue_service.process_due(
+                    self.send_schedule_notification,
+                    send_many=(
+                        self.send_schedule_notifications
+                        if self.digest_enabled
+                        else None
+                    ),
+                )
+                # まとめて通知を受け取るユーザーへのまとめ（1日1回・1時間ごと）
+                sent_count += digest_service.process(self.send_user_digest)
 
             if sent_count > 0:
                 self.logger.info(f"通知送信完了: {sent_count} 件")
@@ -338,14 +533,14 @@ class EmailService:
         self, schedule: Schedule, notification_type: str = "reminder"
     ) -> bool:
         """
-        スケジュール通知メールを全ユーザーに送信
+        スケジュール通知メールを全ユーザー宛に送信待ちに登録
 
         Args:
             schedule: スケジュールオブジェクト
             notification_type: 通知タイプ（reminder, start, complete）
 
         Returns:
-            bool: 送信成功の場合True
+            bool: 登録成功の場合True
         """
         try:
             # 全ユーザーのメールアドレスを取得
@@ -365,12 +560,12 @@ class EmailService:
                 )
             )
 
-            # メール送信
-            success = self.send_email(to_addresses, subject, html_body, text_body)
+            # 送信待ちに登録（送信はスケジューラーの送信処理で行う）
+            success = self.queue_email(to_addresses, subject, html_body, text_body)
 
             if success:
                 self.logger.info(
-                    f"スケジュール {schedule.id} の{notification_type}通知を全ユーザー（{len(to_addresses)}名）に送信完了"
+                    f"スケジュール {schedule.id} の{notification_type}通知を全ユーザー（{len(to_addresses)}名）宛に送信待ちに登録"
                 )
 
             return success
@@ -393,11 +588,7 @@ class EmailService:
         Returns:
             tuple: (件名, HTML本文, テキスト本文)
         """
-        # 基本情報
         title = schedule.title
-        start_time = schedule.start_datetime.strftime("%Y年%m月%d日 %H:%M")
-        end_time = schedule.end_datetime.strftime("%Y年%m月%d日 %H:%M")
-        current_time = datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")
 
         # 詳細情報の組み立て
         schedule_details = []
@@ -449,173 +640,17 @@ class EmailService:
             message_body = "重要なスケジュール情報をお知らせします。"
             icon = "📢"
 
-        # HTML本文
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{ 
-                    font-family: 'Segoe UI', 'Hiragino Sans', 'Yu Gothic UI', Arial, sans-serif; 
-                    line-height: 1.6;
-                    margin: 0;
-                    padding: 0;
-                }}
-                .container {{ 
-                    max-width: 650px; 
-                    margin: 0 auto; 
-                    padding: 20px; 
-                }}
-                .header {{ 
-                    background: linear-gradient(135deg, #007bff 0%, #0056b3 100%);
-                    color: white; 
-                    padding: 25px; 
-                    text-align: center; 
-                    border-radius: 8px 8px 0 0;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                .content {{ 
-                    background: #f8f9fa; 
-                    padding: 25px; 
-                    border: 1px solid #dee2e6;
-                }}
-                .schedule-card {{ 
-                    background: white; 
-                    padding: 20px; 
-                    border-left: 5px solid #007bff; 
-                    margin: 15px 0; 
-                    border-radius: 0 8px 8px 0;
-                    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                }}
-                .priority-high {{ border-left-color: #dc3545; }}
-                .priority-urgent {{ border-left-color: #dc3545; background: #fff5f5; }}
-                .info-row {{ 
-                    display: flex; 
-                    padding: 8px 0; 
-                    border-bottom: 1px solid #eee;
-                }}
-                .info-row:last-child {{ border-bottom: none; }}
-                .info-label {{ 
-                    font-weight: bold; 
-                    min-width: 100px; 
-                    color: #495057;
-                }}
-                .info-value {{ 
-                    flex: 1; 
-                    color: #212529;
-                }}
-                .footer {{ 
-                    text-align: center; 
-                    padding: 20px; 
-                    color: #6c757d; 
-                    font-size: 14px; 
-                    border-radius: 0 0 8px 8px; 
-                    background: #e9ecef;
-                }}
-                .alert {{ 
-                    padding: 15px; 
-                    margin: 15px 0; 
-                    border-radius: 6px; 
-                    background: #d1ecf1; 
-                    border: 1px solid #bee5eb; 
-                    color: #0c5460;
-                }}
-                .priority-badge {{
-                    display: inline-block;
-                    padding: 4px 8px;
-                    border-radius: 4px;
-                    font-size: 12px;
-                    font-weight: bold;
-                    text-transform: uppercase;
-                }}
-                .priority-low {{ background: #d4edda; color: #155724; }}
-                .priority-normal {{ background: #cce7ff; color: #004085; }}
-                .priority-high {{ background: #fff3cd; color: #856404; }}
-                .priority-urgent {{ background: #f8d7da; color: #721c24; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>{icon} {message_title}</h1>
-                    <p style="margin: 0; opacity: 0.9;">エアコンクリーニング完了報告書システム</p>
-                </div>
-                <div class="content">
-                    <p style="font-size: 16px; margin-bottom: 20px;">{message_body}</p>
-                    
-                    <div class="schedule-card {'priority-' + schedule.priority if schedule.priority in ['high', 'urgent'] else ''}">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 15px;">
-                            <h2 style="margin: 0; color: #007bff;">{title}</h2>
-                            <span class="priority-badge priority-{schedule.priority}">優先度: {priority_display}</span>
-                        </div>
-                        
-                        <div class="info-row">
-                            <div class="info-label">📅 開始日時:</div>
-                            <div class="info-value">{start_time}</div>
-                        </div>
-                        <div class="info-row">
-                            <div class="info-label">🕐 終了日時:</div>
-                            <div class="info-value">{end_time}</div>
-                        </div>
-                        
-                        {chr(10).join([f'<div class="info-row"><div class="info-label">📋</div><div class="info-value">{detail}</div></div>' for detail in schedule_details]) if schedule_details else ''}
-                        
-                        <div class="info-row">
-                            <div class="info-label">⏰ 通知設定:</div>
-                            <div class="info-value">{schedule.notification_minutes}分前に通知</div>
-                        </div>
-                    </div>
-                    
-                    <div class="alert">
-                        <p><strong>💡 お知らせ:</strong></p>
-                        <p>この通知は全登録ユーザー（{recipient_count}名）に送信されています。</p>
-                        <p>スケジュールの詳細確認や変更は、システムの通知管理画面からご利用ください。</p>
-                    </div>
-                    
-                    <p style="font-size: 14px; color: #6c757d; margin-top: 20px;">
-                        <strong>送信日時:</strong> {current_time}<br>
-                        <strong>送信先:</strong> 全登録ユーザー（{recipient_count}名）
-                    </p>
-                </div>
-                <div class="footer">
-                    <p><strong>エアコンクリーニング完了報告書システム</strong></p>
-                    <p>このメールは管理者により全社に送信されました。</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # テキスト本文
-        text_body = f"""
-{icon} {message_title}
-
-{message_body}
-
-📋 スケジュール詳細:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-タイトル: {title}
-優先度: {priority_display}
-開始日時: {start_time}
-終了日時: {end_time}
-通知設定: {schedule.notification_minutes}分前に通知
-
-{chr(10).join([f"- {detail}" for detail in schedule_details]) if schedule_details else ""}
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-💡 お知らせ:
-この通知は全登録ユーザー（{recipient_count}名）に送信されています。
-スケジュールの詳細確認や変更は、システムの通知管理画面からご利用ください。
-
-送信日時: {current_time}
-送信先: 全登録ユーザー（{recipient_count}名）
-
----
-エアコンクリーニング完了報告書システム
-このメールは管理者により全社に送信されました。
-        """
-
+        html_body, text_body = render_email(
+            "all_user_notification",
+            schedule=schedule,
+            schedule_details=schedule_details,
+            priority_display=priority_display,
+            message_title=message_title,
+            message_body=message_body,
+            icon=icon,
+            recipient_count=recipient_count,
+            current_time=datetime.now().strftime("%Y年%m月%d日 %H:%M:%S"),
+        )
         return subject, html_body, text_body
 
 
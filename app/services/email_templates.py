@@ -0,0 +1,63 @@
+"""
+通知メールのテンプレート
+
+app/templates/emails のJinjaテンプレートをプロセスごとに1回だけ読み込んでコンパイルし、
+通知ごとには描画だけを行う。スタイルなどの固定部分はコンパイル時に文字列になるため、
+通知ごとに組み立て直さない（アプリケーションコンテキストがなくても使用可能）
+"""
+
+import os
+import threading
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+
+# メールテンプレートのフォルダ
+EMAIL_TEMPLATE_FOLDER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "emails"
+)
+
+_environment = None
+_lock = threading.Lock()
+
+
+def format_datetime(value, format: str = "%Y年%m月%d日 %H:%M") -> str:
+    """日時の表示（テンプレートのdatetime_jpフィルタ）"""
+    return value.strftime(format) if value else ""
+
+
+def get_environment() -> Environment:
+    """メールテンプレートの環境を取得（初回に作成）"""
+    global _environment
+    if _environment is None:
+        with _lock:
+            if _environment is None:
+                environment = Environment(
+                    loader=FileSystemLoader(EMAIL_TEMPLATE_FOLDER),
+                    # HTMLのみエスケープする（テキスト本文はそのまま）
+                    autoescape=select_autoescape(["html"]),
+                    # 読み込んだテンプレートのファイルの更新を確認しない
+                    auto_reload=False,
+                    trim_blocks=True,
+                    lstrip_blocks=True,
+                )
+                environment.filters["datetime_jp"] = format_datetime
+                _environment = environment
+    return _environment
+
+
+def render_email(name: str, **context) -> tuple:
+    """
+    HTML本文とテキスト本文を描画
+
+    Args:
+        name (str): テンプレート名（拡張子なし、name.htmlとname.txtを使用）
+        **context: テンプレートに渡す値
+
+    Returns:
+        tuple: (HTML本文, テキスト本文)
+    """
+    environment = get_environment()
+    html_body = environment.get_template(f"{name}.html").render(**context)
+    text_body = environment.get_template(f"{name}.txt").render(**context)
+    return html_body, text_body
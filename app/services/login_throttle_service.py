@@ -0,0 +1,137 @@
+"""
+ログインの試行制限サービス
+
+パスワードの検証（scrypt・pbkdf2）はCPUを多く使うため、始業時などにログインが
+集中しても報告書の編集などの処理が遅くならないよう、同時に検証する数を制限する。
+また、ユーザー名・IPアドレスごとに一定時間内の失敗回数を記録し（プロセス内）、
+上限を超えた場合はパスワードを検証せずにログインを拒否する
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+
+# ユーザー名ごとの失敗回数の上限の既定値
+DEFAULT_MAX_FAILURES_PER_USERNAME = 5
+
+# IPアドレスごとの失敗回数の上限の既定値（同じ事業所から複数人がログインする場合を考慮）
+DEFAULT_MAX_FAILURES_PER_IP = 20
+
+# 失敗回数を数える期間（秒）の既定値
+DEFAULT_FAILURE_WINDOW = 300
+
+# 同時にパスワードを検証する数の既定値
+DEFAULT_MAX_CONCURRENT_VERIFICATIONS = 2
+
+# 検証の順番を待つ秒数の既定値（超えた場合は混雑としてログインを断る）
+DEFAULT_VERIFICATION_WAIT = 5
+
+
+class LoginThrottleService:
+    """ログインの試行制限サービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.max_failures_per_username = int(
+            os.getenv("LOGIN_MAX_FAILURES", DEFAULT_MAX_FAILURES_PER_USERNAME)
+        )
+        self.max_failures_per_ip = int(
+            os.getenv("LOGIN_MAX_FAILURES_PER_IP", DEFAULT_MAX_FAILURES_PER_IP)
+        )
+        self.failure_window = float(
+            os.getenv("LOGIN_FAILURE_WINDOW", DEFAULT_FAILURE_WINDOW)
+        )
+        self.verification_wait = float(
+            os.getenv("LOGIN_VERIFICATION_WAIT", DEFAULT_VERIFICATION_WAIT)
+        )
+        self.max_concurrent_verifications = int(
+            os.getenv(
+                "LOGIN_MAX_CONCURRENT_VERIFICATIONS",
+                DEFAULT_MAX_CONCURRENT_VERIFICATIONS,
+            )
+        )
+        self._verification_slots = threading.BoundedSemaphore(
+            self.max_concurrent_verifications
+        )
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def _keys(self, username: str, ip_address: str):
+        """失敗回数を記録するキーと上限"""
+        return [
+            (("username", username.lower()), self.max_failures_per_username),
+            (("ip", ip_address or ""), self.max_failures_per_ip),
+        ]
+
+    def _recent_failures(self, key, now: float) -> deque:
+        """期間内の失敗日時（期間外のものは削除する、ロックを取得して呼ぶ）"""
+        failures = self._failures.get(key)
+        if failures is None:
+            return deque()
+        while failures and failures[0] <= now - self.failure_window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+        return failures
+
+    def retry_after(self, username: str, ip_address: str) -> int:
+        """
+        失敗回数が上限に達している場合に、次にログインできるまでの秒数
+
+        Returns:
+            int: 待つ秒数（ログインできる場合は0）
+        """
+        now = time.monotonic()
+        wait = 0
+        with self._lock:
+            for key, limit in self._keys(username, ip_address):
+                failures = self._recent_failures(key, now)
+                if len(failures) >= limit:
+                    oldest = failures[len(failures) - limit]
+                    wait = max(wait, int(oldest + self.failure_window - now) + 1)
+        return wait
+
+    def record_failure(self, username: str, ip_address: str):
+        """ログインの失敗を記録"""
+        now = time.monotonic()
+        with self._lock:
+            for key, _ in self._keys(username, ip_address):
+                self._recent_failures(key, now)
+                self._failures.setdefault(key, deque()).append(now)
+
+    def record_success(self, username: str):
+        """ログインに成功したユーザー名の失敗の記録を削除"""
+        with self._lock:
+            self._failures.pop(("username", username.lower()), None)
+
+    def clear(self):
+        """すべての失敗の記録を削除"""
+        with self._lock:
+            self._failures.clear()
+
+    def verify_password(self, user, password: str):
+        """
+        同時に検証する数を制限してパスワードを検証
+        （ハッシュの方式が現在の設定と異なる場合は、検証できたパスワードでハッシュを作り直す）
+
+        Returns:
+            bool: パスワードが正しいか（混雑して検証できなかった場合はNone）
+        """
+        if not self._verification_slots.acquire(timeout=self.verification_wait):
+            self.logger.warning("ログインが混雑しているため、パスワードを検証しませんでした")
+            return None
+        try:
+            if not user.check_password(password):
+                return False
+            if user.password_needs_rehash():
+                user.set_password(password)
+            return True
+        finally:
+            self._verification_slots.release()
+
+
+# サービスインスタンス
+login_throttle_service = LoginThrottleService()
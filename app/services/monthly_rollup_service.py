@@ -0,0 +1,288 @@
+"""
+受注月間表の集計済みテーブル（monthly_rollups）の管理サービス
+
+報告書・作業時間・作業内容・物件・エアコンの変更をセッションのフラッシュ時に記録し、
+コミット直前に影響を受けた作業月の集計だけを同じトランザクション内で再計算する
+"""
+
+import logging
+from datetime import date, datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models.report import Report
+from app.models.property import Property
+from app.models.work_time import WorkTime
+from app.models.work_detail import WorkDetail
+from app.models.air_conditioner import AirConditioner
+from app.models.monthly_rollup import MonthlyRollup
+from app.services.summary_service import summary_service
+
+
+# 変更を記録するセッション情報のキー
+PENDING_KEY = "monthly_rollup_pending"
+REFRESHED_KEY = "monthly_rollup_refreshed"
+
+# 変更があった場合に集計へ影響する属性
+REPORT_ATTRIBUTES = ("status", "property_id")
+PROPERTY_ATTRIBUTES = ("reception_type",)
+AIR_CONDITIONER_ATTRIBUTES = ("quantity", "total_amount")
+
+
+def _month_start(year: int, month: int) -> date:
+    return date(year, month, 1)
+
+
+def _next_month_start(year: int, month: int) -> date:
+    return date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+
+
+def _empty_pending():
+    return {"months": set(), "report_ids": set(), "property_ids": set(), "ac_ids": set()}
+
+
+def _collect_targets(objects, targets):
+    """
+    集計に影響する変更のあったオブジェクトから、報告書・物件・エアコンのIDを記録
+
+    Args:
+        objects (iterable): (オブジェクト, 追加・削除かどうか) のリスト
+        targets (dict): 記録先
+    """
+    for obj, is_added_or_deleted in objects:
+        state = inspect(obj)
+        if isinstance(obj, (WorkTime, WorkDetail)):
+            if is_added_or_deleted or state.modified:
+                # 付け替えられた場合は変更前の報告書も対象にする
+                report_ids = set(state.attrs.report_id.history.sum())
+                report_ids.add(obj.report_id)
+                report_ids.discard(None)
+                targets["report_ids"].update(report_ids)
+        elif isinstance(obj, Report):
+            if is_added_or_deleted or _has_changes(state, REPORT_ATTRIBUTES):
+                targets["report_ids"].add(obj.id)
+        elif isinstance(obj, Property):
+            if is_added_or_deleted or _has_changes(state, PROPERTY_ATTRIBUTES):
+                targets["property_ids"].add(obj.id)
+        elif isinstance(obj, AirConditioner):
+            if is_added_or_deleted or _has_changes(state, AIR_CONDITIONER_ATTRIBUTES):
+                targets["ac_ids"].add(obj.id)
+
+
+def _has_changes(state, names) -> bool:
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+class MonthlyRollupService:
+    """受注月間表の集計済みテーブルの管理サービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        # 集計済みデータの更新がコミットされるたびに増える番号（集計結果のキャッシュの判定に使う）
+        self.generation = 0
+
+    def register(self):
+        """セッションのイベントを登録（create_appから呼び出す、複数回呼び出しても1回のみ登録）"""
+        for name, handler in (
+            ("before_flush", self._before_flush),
+            ("after_flush", self._after_flush),
+            ("before_commit", self._before_commit),
+            ("after_commit", self._after_commit),
+            ("after_soft_rollback", self._after_soft_rollback),
+            ("do_orm_execute", self._do_orm_execute),
+        ):
+            if not event.contains(Session, name, handler):
+                event.listen(Session, name, handler)
+
+    def _pending(self, session):
+        return session.info.setdefault(PENDING_KEY, _empty_pending())
+
+    def _before_flush(self, session, flush_context, instances):
+        """
+        変更・削除されるデータの変更前の作業月を記録
+
+        作業日の変更や報告書の削除で集計から外れる月は、フラッシュ後には
+        データベースから求められないため、書き込み前の状態から取得する
+        """
+        targets = _empty_pending()
+        _collect_targets(
+            [(obj, False) for obj in session.dirty]
+            + [(obj, True) for obj in session.deleted],
+            targets,
+        )
+        if not any(targets.values()):
+            return
+        with session.no_autoflush:
+            months = self._resolve_months(session, targets)
+        self._pending(session)["months"].update(months)
+
+    def _after_flush(self, session, flush_context):
+        """追加・変更されたデータを記録（変更後の作業月はコミット直前に求める）"""
+        targets = _empty_pending()
+        _collect_targets(
+            [(obj, True) for obj in session.new]
+            + [(obj, False) for obj in session.dirty],
+            targets,
+        )
+        if not any(targets.values()):
+            return
+        pending = self._pending(session)
+        for key in ("report_ids", "property_ids", "ac_ids"):
+            pending[key].update(targets[key])
+
+    def _do_orm_execute(self, orm_execute_state):
+        """
+        一括更新・一括削除（query.update/delete）の対象を記録
+
+        フラッシュを経由しないため、実行前に同じ条件で対象の報告書などを取得する
+        """
+        if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None:
+            return
+
+        model = mapper.class_
+        if model in (WorkTime, WorkDetail):
+            key, column = "report_ids", model.report_id
+        elif model is Report:
+            key, column = "report_ids", Report.id
+        elif model is Property:
+            key, column = "property_ids", Property.id
+        elif model is AirConditioner:
+            key, column = "ac_ids", AirConditioner.id
+        else:
+            return
+
+        session = orm_execute_state.session
+        query = db.select(column).distinct()
+        whereclause = orm_execute_state.statement.whereclause
+        if whereclause is not None:
+            query = query.where(whereclause)
+
+        targets = _empty_pending()
+        with session.no_autoflush:
+            targets[key].update(
+                value for (value,) in session.execute(query) if value is not None
+            )
+            if not targets[key]:
+                return
+            months = self._resolve_months(session, targets)
+
+        pending = self._pending(session)
+        pending["months"].update(months)
+        pending[key].update(targets[key])
+
+    def _before_commit(self, session):
+        """コミット直前に、変更の影響を受けた作業月の集計を再計算"""
+        # 未フラッシュの変更も記録されるよう先にフラッシュする
+        session.flush()
+        pending = session.info.pop(PENDING_KEY, None)
+        if not pending:
+            return
+        months = self._resolve_months(session, pending)
+        if months:
+            self.refresh_months(months, session=session)
+            session.info[REFRESHED_KEY] = True
+
+    def _after_commit(self, session):
+        if session.info.pop(REFRESHED_KEY, False):
+            self.generation += 1
+
+    def _after_soft_rollback(self, session, previous_transaction):
+        session.info.pop(PENDING_KEY, None)
+        session.info.pop(REFRESHED_KEY, None)
+
+    def _resolve_months(self, session, pending):
+        """変更された報告書・物件・エアコンに関係する作業月を取得"""
+        months = set(pending["months"])
+        queries = []
+        if pending["report_ids"]:
+            queries.append(
+                db.select(WorkTime.work_date).where(
+                    WorkTime.report_id.in_(pending["report_ids"])
+                )
+            )
+        if pending["property_ids"]:
+            queries.append(
+                db.select(WorkTime.work_date)
+                .join(Report, Report.id == WorkTime.report_id)
+                .where(Report.property_id.in_(pending["property_ids"]))
+            )
+        if pending["ac_ids"]:
+            queries.append(
+                db.select(WorkTime.work_date)
+                .join(WorkDetail, WorkDetail.report_id == WorkTime.report_id)
+                .where(WorkDetail.air_conditioner_id.in_(pending["ac_ids"]))
+            )
+        for query in queries:
+            for (work_date,) in session.execute(query.distinct()):
+                months.add((work_date.year, work_date.month))
+        return months
+
+    def refresh_months(self, months, session=None):
+        """
+        指定した作業月の集計済みデータを再計算
+
+        Args:
+            months (iterable): (年, 月) のリスト
+            session: 使用するセッション（省略時はdb.session）
+        """
+        session = session or db.session
+        table = MonthlyRollup.__table__
+        for year, month in sorted(months):
+            rows = summary_service.aggregate_rows(
+                _month_start(year, month), _next_month_start(year, month)
+            )
+            session.execute(
+                table.delete().where(table.c.year == year, table.c.month == month)
+            )
+            self._insert_rows(session, rows)
+
+    def rebuild(self, year: int = None):
+        """
+        集計済みデータを作り直す（初回作成・データの一括変更後に使用）
+
+        Args:
+            year (int): 対象年（省略時はすべての年）
+
+        Returns:
+            int: 作成した集計行数
+        """
+        table = MonthlyRollup.__table__
+        if year is None:
+            rows = summary_service.aggregate_rows()
+            db.session.execute(table.delete())
+        else:
+            rows = summary_service.aggregate_rows(date(year, 1, 1), date(year + 1, 1, 1))
+            db.session.execute(table.delete().where(table.c.year == year))
+        self._insert_rows(db.session, rows)
+        db.session.info[REFRESHED_KEY] = True
+        db.session.commit()
+        self.logger.info(f"受注月間表の集計を作り直しました: {len(rows)}行")
+        return len(rows)
+
+    def _insert_rows(self, session, rows):
+        if not rows:
+            return
+        now = datetime.utcnow()
+        session.execute(
+            MonthlyRollup.__table__.insert(),
+            [
+                {
+                    "year": year,
+                    "month": month,
+                    "reception_type": reception_type,
+                    "status": status,
+                    "updated_at": now,
+                    **values,
+                }
+                for (year, month, reception_type, status), values in rows.items()
+            ],
+        )
+
+
+# サービスインスタンス
+monthly_rollup_service = MonthlyRollupService()
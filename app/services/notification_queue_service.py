@@ -0,0 +1,367 @@
+"""
+スケジュール通知の送信待ちキューサービス
+
+各スケジュールに「次に通知を確認する日時」（next_notification_at、インデックスあり）を
+保存しておき、通知チェックではその日時を過ぎたスケジュールだけを取得する。
+送信する通知は送信記録（notification_logs）に先に登録してから送るため、
+チェックが重複して実行されても同じ通知を二重に送信しない
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models.schedule import Schedule
+from app.models.schedule_exception import ScheduleException
+from app.models.notification_log import NotificationLog
+from app.services.recurrence_service import recurrence_service
+
+
+# 開始時刻通知を送る期間（開始時刻からこの時間を過ぎたら送らない）
+START_NOTICE_WINDOW = timedelta(minutes=5)
+
+# 繰り返しスケジュールの次の回を探す期間（この期間に回がない場合は期間の終わりに再確認）
+RECURRING_LOOKAHEAD = timedelta(days=62)
+
+# 1回の通知チェックで処理するスケジュール数の上限
+NOTIFICATION_BATCH_SIZE = 200
+
+# 変更された場合に次の通知日時を求め直す属性
+NOTIFICATION_ATTRIBUTES = (
+    "start_datetime",
+    "end_datetime",
+    "status",
+    "notification_enabled",
+    "notification_minutes",
+    "recurrence_type",
+    "recurrence_end",
+)
+
+
+def _notification_windows(start: datetime, minutes: int):
+    """
+    1回分の通知の種類・送信日時・期限を返す
+
+    リマインダーは通知時刻から開始時刻まで（チェックが遅れた場合も開始前なら送る）、
+    開始時刻通知は開始時刻から一定時間だけ送信の対象にする
+    """
+    return (
+        ("reminder", start - timedelta(minutes=minutes), start),
+        ("start", start, start + START_NOTICE_WINDOW),
+    )
+
+
+class NotificationQueueService:
+    """スケジュール通知の送信待ちキューサービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def register(self):
+        """セッションのイベントを登録（create_appから呼び出す、複数回呼び出しても1回のみ登録）"""
+        if not event.contains(Session, "before_flush", self._before_flush):
+            event.listen(Session, "before_flush", self._before_flush)
+
+    def _before_flush(self, session, flush_context, instances):
+        """スケジュール・繰り返しの例外の保存時に次の通知日時を更新"""
+        with session.no_autoflush:
+            self._update_next_notifications(session, datetime.now())
+
+    def _update_next_notifications(self, session, now: datetime):
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, Schedule):
+                state = inspect(obj)
+                if state.pending or any(
+                    state.attrs[name].history.has_changes()
+                    for name in NOTIFICATION_ATTRIBUTES
+                ):
+                    obj.next_notification_at = self._estimate_next(obj, now)
+
+        # 例外の変更で回の日時が変わるため、元のスケジュールを次のチェックで確認し直す
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, ScheduleException):
+                schedule = obj.schedule
+                if schedule is None and obj.schedule_id is not None:
+                    schedule = session.get(Schedule, obj.schedule_id)
+                if schedule is not None and schedule.notification_enabled:
+                    schedule.next_notification_at = now
+
+    def _estimate_next(self, schedule, now: datetime):
+        """
+        保存時の次の通知日時（送信記録・例外を読み込まずに求める）
+
+        繰り返しスケジュールは例外で回の日時が変わる可能性があるため、
+        次のチェックで正確に求め直す
+        """
+        if not schedule.notification_enabled:
+            return None
+        if schedule.is_recurring:
+            return now
+        return self.compute_next(schedule, now)
+
+    def compute_next(self, schedule, now: datetime, exceptions=None, sent=frozenset()):
+        """
+        次に通知を確認する日時を求める
+
+        Args:
+            schedule (Schedule): スケジュール
+            now (datetime): 現在日時
+            exceptions (dict): 繰り返しの例外（本来の開始日 -> ScheduleException）
+            sent (set): 送信済みの (開始日, 通知の種類)
+
+        Returns:
+            datetime: 次に通知を確認する日時（送る通知がない場合はNone）
+        """
+        if not schedule.notification_enabled or schedule.start_datetime is None:
+            return None
+        minutes = schedule.notification_minutes or 0
+
+        fallback = None
+        if schedule.is_recurring:
+            lookahead_end = now + timedelta(minutes=minutes) + RECURRING_LOOKAHEAD
+            occurrences = [
+                (occurrence.occurrence_date, occurrence.start_datetime)
+                for occurrence in recurrence_service.expand(
+                    schedule, now - START_NOTICE_WINDOW, lookahead_end, exceptions
+                )
+                if occurrence.status == "pending"
+            ]
+            # 探した期間より後にも回がある場合は、期間の終わりに確認し直す
+            if (
+                schedule.recurrence_end is None
+                or schedule.recurrence_end >= lookahead_end.date()
+            ):
+                fallback = lookahead_end - timedelta(minutes=minutes)
+        elif schedule.status == "pending":
+            occurrences = [(schedule.start_datetime.date(), schedule.start_datetime)]
+        else:
+            return None
+
+        candidates = [
+            due
+            for occurrence_date, start in occurrences
+            for notification_type, due, expires in _notification_windows(
+                start, minutes
+            )
+            if now < expires and (occurrence_date, notification_type) not in sent
+        ]
+        return min(candidates) if candidates else fallback
+
+    def due_notifications(
+        self, schedule, now: datetime, exceptions=None, sent=frozenset()
+    ):
+        """
+        現在送信する通知の一覧
+
+        Returns:
+            list: (スケジュールまたはScheduleOccurrence, 開始日, 通知の種類) のリスト
+        """
+        if not schedule.notification_enabled:
+            return []
+        minutes = schedule.notification_minutes or 0
+
+        if schedule.is_recurring:
+            targets = [
+                occurrence
+                for occurrence in recurrence_service.expand(
+                    schedule,
+                    now - START_NOTICE_WINDOW,
+                    now + timedelta(minutes=minutes, seconds=1),
+                    exceptions,
+                )
+                if occurrence.status == "pending"
+            ]
+        elif schedule.status == "pending":
+            targets = [schedule]
+        else:
+            return []
+
+        due = []
+        for target in targets:
+            occurrence_date = target.occurrence_date or target.start_datetime.date()
+            for notification_type, due_at, expires in _notification_windows(
+                target.start_datetime, minutes
+            ):
+                if due_at <= now < expires and (
+                    occurrence_date,
+                    notification_type,
+                ) not in sent:
+                    due.append((target, occurrence_date, notification_type))
+        return due
+
+    def _load_sent(self, schedule_ids, now: datetime):
+        """
+        最近の回の送信記録を取得（schedule_idsがNoneの場合はすべてのスケジュール）
+
+        Returns:
+            dict: スケジュールID -> {(開始日, 通知の種類)}
+        """
+        sent = defaultdict(set)
+        query = db.session.query(
+            NotificationLog.schedule_id,
+            NotificationLog.occurrence_date,
+            NotificationLog.notification_type,
+        ).filter(NotificationLog.occurrence_date >= (now - RECURRING_LOOKAHEAD).date())
+        if schedule_ids is not None:
+            query = query.filter(NotificationLog.schedule_id.in_(schedule_ids))
+        for schedule_id, occurrence_date, notification_type in query:
+            sent[schedule_id].add((occurrence_date, notification_type))
+        return sent
+
+    def _claim(self, schedule_id, occurrence_date, notification_type):
+        """
+        送信記録を先に登録して送信する権利を得る
+
+        Returns:
+            NotificationLog: 登録した送信記録（他の処理が登録済みの場合はNone）
+        """
+        log = NotificationLog(
+            schedule_id=schedule_id,
+            occurrence_date=occurrence_date,
+            notification_type=notification_type,
+            status="sending",
+        )
+        db.session.add(log)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None
+        return log
+
+    def process_due(self, send, now: datetime = None, send_many=None) -> int:
+        """
+        送信日時になった通知を送信
+
+        送信する通知の送信記録を先に登録し、まとめて送信した後に送信記録・
+        次の通知日時を更新する
+
+        Args:
+            send (callable): send(スケジュールまたは回, 通知の種類) -> bool
+            now (datetime): 現在日時（省略時は現在）
+            send_many (callable): send_many([(スケジュールまたは回, 通知の種類), ...])
+                -> 通知ごとの送信結果（bool）のリスト。指定した場合、
+                複数の通知をまとめて送信する（ダイジェスト）
+
+        Returns:
+            int: 送信した通知数
+        """
+        now = now or datetime.now()
+        schedules = (
+            Schedule.query.filter(Schedule.next_notification_at <= now)
+            .order_by(Schedule.next_notification_at)
+            .limit(NOTIFICATION_BATCH_SIZE)
+            .all()
+        )
+
+        # 送信する通知の送信記録を登録
+        claimed = []  # (送信記録, スケジュールまたは回, 通知の種類)
+        contexts = {}  # スケジュールID -> (スケジュール, 例外, 送信済みの通知)
+        for schedule in schedules:
+            schedule_id = schedule.id
+            try:
+                exceptions = None
+                if schedule.is_recurring:
+                    exceptions = recurrence_service.load_exceptions([schedule_id]).get(
+                        schedule_id
+                    )
+                sent = self._load_sent([schedule_id], now)[schedule_id]
+                contexts[schedule_id] = (schedule, exceptions, sent)
+
+                due = self.due_notifications(schedule, now, exceptions, sent)
+                for target, occurrence_date, notification_type in due:
+                    log = self._claim(schedule_id, occurrence_date, notification_type)
+                    # 他の通知チェックが送信済み・送信中の場合も送信済みとして扱う
+                    sent.add((occurrence_date, notification_type))
+                    if log is not None:
+                        claimed.append((log, target, notification_type))
+
+            except Exception as e:
+                db.session.rollback()
+                self.logger.error(f"スケジュール {schedule_id} の通知処理エラー: {e}")
+
+        # 通知を送信
+        results = self._send(send, send_many, claimed)
+
+        sent_count = 0
+        for (log, _, _), success in zip(claimed, results):
+            key = (log.schedule_id, log.occurrence_date, log.notification_type)
+            if success:
+                log.status = "sent"
+                log.sent_at = datetime.utcnow()
+                sent_count += 1
+                self.logger.info(
+                    f"通知送信完了: スケジュール {key[0]} ({key[1]} {key[2]})"
+                )
+            else:
+                # 送信できなかった場合は記録を削除し、次のチェックで再送する
+                db.session.delete(log)
+                contexts[key[0]][2].discard(key[1:])
+        db.session.commit()
+
+        # 次の通知日時を更新
+        for schedule, exceptions, sent in contexts.values():
+            try:
+                schedule.next_notification_at = self.compute_next(
+                    schedule, now, exceptions, sent
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self.logger.error(f"スケジュール {schedule.id} の通知処理エラー: {e}")
+
+        return sent_count
+
+    def _send(self, send, send_many, claimed):
+        """通知を送信して通知ごとの送信結果を返す（例外は送信失敗として扱う）"""
+        notifications = [
+            (target, notification_type) for _, target, notification_type in claimed
+        ]
+        if send_many is not None and len(notifications) > 1:
+            try:
+                return [bool(result) for result in send_many(notifications)]
+            except Exception as e:
+                self.logger.error(f"通知のまとめて送信エラー: {e}")
+                return [False] * len(notifications)
+
+        results = []
+        for target, notification_type in notifications:
+            try:
+                results.append(bool(send(target, notification_type)))
+            except Exception as e:
+                self.logger.error(f"スケジュール {target.id} の通知送信エラー: {e}")
+                results.append(False)
+        return results
+
+    def rebuild(self, now: datetime = None) -> int:
+        """
+        すべてのスケジュールの次の通知日時を求め直す（初回作成・データの一括変更後に使用）
+
+        Returns:
+            int: 通知予定のあるスケジュール数
+        """
+        now = now or datetime.now()
+        schedules = Schedule.query.all()
+        exceptions = recurrence_service.load_exceptions(
+            [schedule.id for schedule in schedules if schedule.is_recurring]
+        )
+        sent = self._load_sent(None, now)
+        count = 0
+        for schedule in schedules:
+            schedule.next_notification_at = self.compute_next(
+                schedule, now, exceptions.get(schedule.id), sent[schedule.id]
+            )
+            if schedule.next_notification_at is not None:
+                count += 1
+        db.session.commit()
+        self.logger.info(f"通知予定を作り直しました: {count}件")
+        return count
+
+
+# サービスインスタンス
+notification_queue_service = NotificationQueueService()
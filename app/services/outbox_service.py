@@ -0,0 +1,230 @@
+"""
+送信待ちメール（アウトボックス）サービス
+
+画面からのメール送信はoutbox_messagesテーブルに登録するだけにして、SMTPでの送信は
+スケジューラーのスレッドで行う。送信に失敗したメールは間隔を倍にしながら再送し、
+1分あたりの送信数はメールサーバーの制限に合わせて抑える
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+
+from flask import g
+
+from app import db
+from app.models.outbox_message import OutboxMessage
+
+
+# 再送するまでの間隔（1回目の失敗後、以降は失敗ごとに倍にする）と上限
+RETRY_BASE_DELAY = timedelta(minutes=1)
+RETRY_MAX_DELAY = timedelta(hours=1)
+
+# 送信を試みる回数の上限（超えた場合は送信失敗にする）
+DEFAULT_MAX_ATTEMPTS = 6
+
+# 1分あたりの送信数の上限の既定値（Gmailの送信制限に合わせる）
+DEFAULT_RATE_LIMIT_PER_MINUTE = 20
+
+# 送信中のまま残ったメールを送信待ちに戻すまでの時間（送信処理の異常終了への備え）
+STALE_SENDING_TIMEOUT = timedelta(minutes=10)
+
+# 状況の表示で一覧に表示する件数
+RECENT_MESSAGES_LIMIT = 20
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """失敗した回数に応じた再送までの間隔（指数的に増やし、上限で止める）"""
+    return min(RETRY_BASE_DELAY * (2 ** (attempts - 1)), RETRY_MAX_DELAY)
+
+
+class OutboxService:
+    """送信待ちメール（アウトボックス）サービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.rate_limit_per_minute = int(
+            os.getenv("MAIL_RATE_LIMIT_PER_MINUTE", DEFAULT_RATE_LIMIT_PER_MINUTE)
+        )
+        self.max_attempts = int(os.getenv("MAIL_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+        # 登録時に送信処理をすぐに実行させる処理（スケジューラーの開始時に設定）
+        self._wakeup = None
+
+    def set_wakeup(self, wakeup):
+        """メールの登録時に呼び出す処理を設定（送信処理をすぐに実行させるため）"""
+        self._wakeup = wakeup
+
+    def enqueue(
+        self, to_addresses, subject: str, html_body: str, text_body: str = None
+    ) -> OutboxMessage:
+        """
+        メールを送信待ちに登録
+
+        Args:
+            to_addresses (list): 送信先メールアドレスリスト
+            subject (str): 件名
+            html_body (str): HTML本文
+            text_body (str): テキスト本文（オプション）
+
+        Returns:
+            OutboxMessage: 登録したメール
+        """
+        user = g.get("user")
+        message = OutboxMessage(
+            to_addresses=",".join(to_addresses),
+            subject=subject,
+            html_body=html_body,
+            text_body=text_body,
+            next_attempt_at=datetime.utcnow(),
+            created_by=user.id if user else None,
+        )
+        db.session.add(message)
+        db.session.commit()
+        self.logger.info(f"メールを送信待ちに登録しました: {message.id}")
+
+        self._wake()
+        return message
+
+    def _wake(self):
+        if self._wakeup is None:
+            return
+        try:
+            self._wakeup()
+        except Exception as e:
+            # 次の定期実行で送信されるため、登録は成功として扱う
+            self.logger.warning(f"送信処理の開始エラー: {e}")
+
+    def _requeue_stale(self, now: datetime):
+        """送信中のまま残ったメールを送信待ちに戻す"""
+        count = OutboxMessage.query.filter(
+            OutboxMessage.status == "sending",
+            OutboxMessage.started_at < now - STALE_SENDING_TIMEOUT,
+        ).update({"status": "queued"}, synchronize_session=False)
+        if count:
+            db.session.commit()
+            self.logger.warning(
+                f"送信中のまま残ったメールを送信待ちに戻しました: {count}件"
+            )
+
+    def sent_in_last_minute(self, now: datetime) -> int:
+        """直近1分間に送信したメール数"""
+        return OutboxMessage.query.filter(
+            OutboxMessage.sent_at > now - timedelta(minutes=1)
+        ).count()
+
+    def _claim(self, message_id: int, now: datetime) -> bool:
+        """送信待ちのメールを送信中に変更（他の送信処理が先に取得した場合はFalse）"""
+        claimed = (
+            OutboxMessage.query.filter_by(id=message_id, status="queued").update(
+                {"status": "sending", "started_at": now},
+                synchronize_session=False,
+            )
+            == 1
+        )
+        db.session.commit()
+        return claimed
+
+    def process(self, send, now: datetime = None) -> dict:
+        """
+        送信日時になった送信待ちのメールを送信
+
+        Args:
+            send (callable): send(OutboxMessage)、送信に失敗した場合は例外を送出する
+            now (datetime): 現在日時（UTC、省略時は現在）
+
+        Returns:
+            dict: 送信数・再送待ち数・送信失敗数
+        """
+        now = now or datetime.utcnow()
+        result = {"sent": 0, "retry": 0, "failed": 0}
+
+        self._requeue_stale(now)
+
+        remaining = self.rate_limit_per_minute - self.sent_in_last_minute(now)
+        if remaining <= 0:
+            self.logger.debug("1分あたりの送信数の上限のため送信を待ちます")
+            return result
+
+        message_ids = [
+            message_id
+            for (message_id,) in db.session.query(OutboxMessage.id)
+            .filter(
+                OutboxMessage.status == "queued",
+                OutboxMessage.next_attempt_at <= now,
+            )
+            .order_by(OutboxMessage.next_attempt_at, OutboxMessage.id)
+            .limit(remaining)
+        ]
+
+        for message_id in message_ids:
+            if not self._claim(message_id, now):
+                continue
+            message = db.session.get(OutboxMessage, message_id)
+            message.attempts += 1
+            try:
+                send(message)
+            except Exception as e:
+                message.last_error = str(e)
+                if message.attempts >= self.max_attempts:
+                    message.status = "failed"
+                    result["failed"] += 1
+                    self.logger.error(f"メール送信失敗（再送終了）: {message_id}: {e}")
+                else:
+                    message.status = "queued"
+                    message.next_attempt_at = now + retry_delay(message.attempts)
+                    result["retry"] += 1
+                    self.logger.warning(
+                        f"メール送信エラー（{message.next_attempt_at}に再送）: "
+                        f"{message_id}: {e}"
+                    )
+            else:
+                message.status = "sent"
+                message.sent_at = datetime.utcnow()
+                message.last_error = None
+                result["sent"] += 1
+            db.session.commit()
+
+        return result
+
+    def retry(self, message_id: int) -> bool:
+        """
+        送信失敗のメールを送信待ちに戻す
+
+        Returns:
+            bool: 送信待ちに戻した場合True
+        """
+        message = db.session.get(OutboxMessage, message_id)
+        if message is None or message.status != "failed":
+            return False
+        message.status = "queued"
+        message.attempts = 0
+        message.next_attempt_at = datetime.utcnow()
+        db.session.commit()
+        self._wake()
+        return True
+
+    def get_status(self) -> dict:
+        """
+        送信待ちメールの状況（通知ダッシュボード用）
+
+        Returns:
+            dict: ステータスごとの件数・直近1分間の送信数・最近のメール一覧
+        """
+        counts = {"queued": 0, "sending": 0, "sent": 0, "failed": 0}
+        for status, count in db.session.query(
+            OutboxMessage.status, db.func.count(OutboxMessage.id)
+        ).group_by(OutboxMessage.status):
+            counts[status] = count
+
+        return {
+            "counts": counts,
+            "sent_last_minute": self.sent_in_last_minute(datetime.utcnow()),
+            "rate_limit_per_minute": self.rate_limit_per_minute,
+            "recent_messages": OutboxMessage.query.order_by(OutboxMessage.id.desc())
+            .limit(RECENT_MESSAGES_LIMIT)
+            .all(),
+        }
+
+
+# サービスインスタンス
+outbox_service = OutboxService()
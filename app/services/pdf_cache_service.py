@@ -0,0 +1,203 @@
+"""
+報告書PDFキャッシュサービス
+
+報告書とその関連データ・写真ファイルのフィンガープリントをキーとして
+生成済みのPDFをディスクに保存し、同じ内容のPDFの再生成を避ける
+"""
+
+import os
+import glob
+import shutil
+import hashlib
+import logging
+import threading
+
+from flask import current_app
+
+
+# PDFのレイアウトを変更した場合はこの値を上げて既存のキャッシュを無効化する
+PDF_LAYOUT_VERSION = 1
+
+# キャッシュ全体の最大サイズ（バイト）
+DEFAULT_MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+
+def _row_values(obj):
+    """モデルの全カラムの値を取得（フィンガープリント用）"""
+    if obj is None:
+        return None
+    return [(column.name, getattr(obj, column.name)) for column in obj.__table__.columns]
+
+
+class PDFCacheService:
+    """報告書PDFキャッシュサービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def get_cache_folder(self) -> str:
+        """キャッシュフォルダのパスを取得（アプリケーションコンテキストが必要）"""
+        cache_folder = current_app.config.get("PDF_CACHE_FOLDER")
+        if not cache_folder:
+            cache_folder = os.path.join(
+                current_app.config["UPLOAD_FOLDER"], "cache", "reports"
+            )
+        return cache_folder
+
+    def compute_fingerprint(self, report, work_times, work_details, photo_pairs) -> str:
+        """
+        PDFの内容を決めるデータからフィンガープリントを計算
+
+        Args:
+            report (Report): 報告書オブジェクト
+            work_times (list): 作業時間のリスト
+            work_details (list): 作業内容のリスト
+            photo_pairs (list): 写真ペアのリスト
+
+        Returns:
+            str: フィンガープリント（16進文字列）
+        """
+        property_obj = report.property
+        customer = property_obj.customer if property_obj else None
+        upload_folder = current_app.config["UPLOAD_FOLDER"]
+
+        parts = [
+            PDF_LAYOUT_VERSION,
+            _row_values(report),
+            _row_values(property_obj),
+            _row_values(customer),
+            [_row_values(work_time) for work_time in work_times],
+        ]
+
+        # 作業内容はPDFに表示されるエアコン・作業項目も含める
+        for detail in work_details:
+            parts.append(
+                [
+                    _row_values(detail),
+                    _row_values(detail.air_conditioner),
+                    _row_values(detail.work_item),
+                ]
+            )
+
+        # 写真は行の内容に加えてファイルの更新日時を含める
+        for before_photo, after_photo in photo_pairs:
+            for photo in (before_photo, after_photo):
+                if photo is None:
+                    parts.append(None)
+                    continue
+                mtime_ns = None
+                if photo.filepath:
+                    try:
+                        mtime_ns = os.stat(
+                            os.path.join(upload_folder, photo.filepath)
+                        ).st_mtime_ns
+                    except OSError:
+                        pass
+                parts.append(
+                    [
+                        _row_values(photo),
+                        _row_values(photo.air_conditioner),
+                        _row_values(photo.work_item),
+                        mtime_ns,
+                    ]
+                )
+
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def _cache_path(self, report_id: int, fingerprint: str) -> str:
+        return os.path.join(self.get_cache_folder(), f"{report_id}_{fingerprint}.pdf")
+
+    def get(self, report_id: int, fingerprint: str):
+        """
+        キャッシュ済みPDFのパスを取得
+
+        Returns:
+            str: キャッシュファイルのパス（存在しない場合はNone）
+        """
+        cache_path = self._cache_path(report_id, fingerprint)
+        try:
+            # LRU判定のため最終利用日時として更新日時を更新
+            os.utime(cache_path)
+        except OSError:
+            return None
+        return cache_path
+
+    def store(self, report_id: int, fingerprint: str, pdf_file):
+        """
+        生成したPDFをキャッシュに保存
+
+        Args:
+            report_id (int): 報告書ID
+            fingerprint (str): フィンガープリント
+            pdf_file: PDFを書き込んだファイルオブジェクト
+
+        Returns:
+            str: キャッシュファイルのパス（保存に失敗した場合はNone）
+        """
+        cache_path = self._cache_path(report_id, fingerprint)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+            # 書き込み途中のファイルを読まれないよう、別名で保存してから置き換える
+            partial_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.part"
+            pdf_file.seek(0)
+            with open(partial_path, "wb") as f:
+                shutil.copyfileobj(pdf_file, f)
+            os.replace(partial_path, cache_path)
+
+            # 同じ報告書の古い内容のキャッシュは不要になるため削除
+            self._remove_files(report_id, keep=cache_path)
+            self._evict()
+            return cache_path
+        except Exception as e:
+            self.logger.warning(f"PDFキャッシュの保存エラー: 報告書ID {report_id}: {e}")
+            return None
+
+    def invalidate(self, report_id: int):
+        """報告書のキャッシュをすべて削除（報告書の編集・削除時に呼び出す）"""
+        try:
+            self._remove_files(report_id)
+        except Exception as e:
+            self.logger.warning(f"PDFキャッシュの削除エラー: 報告書ID {report_id}: {e}")
+
+    def _remove_files(self, report_id: int, keep: str = None):
+        pattern = os.path.join(self.get_cache_folder(), f"{report_id}_*.pdf")
+        for path in glob.glob(pattern):
+            if path != keep:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _evict(self):
+        """キャッシュ全体が上限サイズを超えた場合、最終利用日時の古いものから削除"""
+        max_bytes = current_app.config.get(
+            "PDF_CACHE_MAX_BYTES", DEFAULT_MAX_CACHE_BYTES
+        )
+        with self._lock:
+            entries = []
+            total_size = 0
+            for path in glob.glob(os.path.join(self.get_cache_folder(), "*.pdf")):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total_size += stat.st_size
+
+            if total_size <= max_bytes:
+                return
+
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+                if total_size <= max_bytes:
+                    break
+
+
+# サービスインスタンス
+pdf_cache_service = PDFCacheService()
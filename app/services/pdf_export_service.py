@@ -0,0 +1,257 @@
+"""
+報告書PDFの一括エクスポートサービス
+
+複数の報告書のPDFをワーカースレッドで並列に生成し（生成済みのものはPDFキャッシュを使う）、
+ZIPファイルとして順次送信するか、1つのPDFに結合する
+"""
+
+import os
+import logging
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from app import db
+from app.models.report import Report
+from app.services.pdf_service import PDFService, sanitize_filename
+from app.services.pdf_cache_service import pdf_cache_service
+
+
+# 同時に生成するPDF数の上限
+EXPORT_MAX_WORKERS = 4
+
+# ZIPへ書き込む際の読み込み単位
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class _ZipStream:
+    """ZipFileが書き込んだデータを順次取り出すための書き込み専用ストリーム"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        """書き込まれたデータを取り出して空にする"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _close_result(future):
+    """受け取られなかったPDF生成の結果のファイルを閉じる"""
+    if not future.cancelled() and future.exception() is None:
+        future.result()[1].close()
+
+
+class PDFExportService:
+    """報告書PDFの一括エクスポートサービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def build_entry_name(report) -> str:
+        """ZIP内のファイル名を作成（報告書IDを先頭に付けて重複を避ける）"""
+        customer_name = (
+            report.property.customer.name
+            if report.property and report.property.customer
+            else "unknown"
+        )
+        property_name = report.property.name if report.property else "unknown"
+        date_str = report.date.strftime("%Y%m%d") if report.date else "nodate"
+        return sanitize_filename(
+            f"{report.id}_作業完了報告書_{customer_name}_{property_name}_{date_str}.pdf"
+        )
+
+    @staticmethod
+    def _open_cached(cache_path):
+        """
+        キャッシュのPDFを開く
+
+        同じエクスポートの後の保存でキャッシュの上限を超えると古いPDFが削除されるため、
+        パスではなく開いたファイルを渡す（開いた後に削除されても読み込める）
+
+        Returns:
+            ファイルオブジェクト（削除済みの場合はNone）
+        """
+        if not cache_path:
+            return None
+        try:
+            return open(cache_path, "rb")
+        except FileNotFoundError:
+            return None
+
+    def render_report_pdf(self, report_id: int):
+        """
+        報告書のPDFを取得（PDFキャッシュにあればそれを使い、なければ生成して保存）
+
+        Args:
+            report_id: 報告書ID
+
+        Returns:
+            tuple: (ZIP内のファイル名, PDFのファイルオブジェクト（呼び出し側で閉じる）)
+        """
+        report = db.session.get(Report, report_id)
+        if report is None:
+            raise ValueError(f"報告書ID {report_id} が見つかりません")
+
+        work_times, work_details, photo_pairs = PDFService.collect_report_data(
+            report_id
+        )
+        fingerprint = pdf_cache_service.compute_fingerprint(
+            report, work_times, work_details, photo_pairs
+        )
+        pdf_file = self._open_cached(pdf_cache_service.get(report_id, fingerprint))
+        if pdf_file is None:
+            generated = PDFService.generate_report_pdf(
+                report, work_times, work_details, photo_pairs
+            )
+            pdf_file = self._open_cached(
+                pdf_cache_service.store(report_id, fingerprint, generated)
+            )
+            if pdf_file is None:
+                # キャッシュに保存できなかった場合は生成したファイルをそのまま使う
+                generated.seek(0)
+                pdf_file = generated
+            else:
+                generated.close()
+        return self.build_entry_name(report), pdf_file
+
+    def _render_in_context(self, app, report_id: int):
+        """ワーカースレッド用：アプリケーションコンテキスト内でPDFを取得"""
+        with app.app_context():
+            try:
+                return self.render_report_pdf(report_id)
+            finally:
+                db.session.remove()
+
+    def iter_report_pdfs(self, app, report_ids):
+        """
+        報告書のPDFを並列に生成し、指定した順序で返す
+
+        生成済みで受け取られていないPDFが溜まらないよう、同時に処理するPDFは
+        ワーカー数までとし、1件受け取られるごとに次のPDFの生成を始める
+
+        Args:
+            app: Flaskアプリケーション
+            report_ids (list): 報告書IDのリスト
+
+        Yields:
+            tuple: (報告書ID, ZIP内のファイル名, PDFのファイルオブジェクト, エラーメッセージ)
+        """
+        max_workers = app.config.get("PDF_EXPORT_WORKERS") or min(
+            EXPORT_MAX_WORKERS, os.cpu_count() or 1
+        )
+        remaining = iter(report_ids)
+        pending = deque()
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pdf-export"
+        ) as executor:
+            try:
+                while True:
+                    while len(pending) < max_workers:
+                        report_id = next(remaining, None)
+                        if report_id is None:
+                            break
+                        future = executor.submit(
+                            self._render_in_context, app, report_id
+                        )
+                        pending.append((report_id, future))
+                    if not pending:
+                        break
+
+                    report_id, future = pending.popleft()
+                    try:
+                        entry_name, pdf_file = future.result()
+                    except Exception as e:
+                        self.logger.error(
+                            f"一括エクスポートのPDF生成エラー: 報告書ID {report_id}: {e}"
+                        )
+                        yield report_id, None, None, str(e)
+                        continue
+                    yield report_id, entry_name, pdf_file, None
+            finally:
+                # ダウンロードが中断された場合は、未着手のPDF生成を取り消し、
+                # 生成済みで受け取られなかったPDFを閉じる
+                for _, future in pending:
+                    if not future.cancel():
+                        future.add_done_callback(_close_result)
+
+    def stream_zip(self, app, report_ids):
+        """
+        報告書PDFをまとめたZIPを、PDFが準備できた順にチャンクで返す
+
+        Args:
+            app: Flaskアプリケーション
+            report_ids (list): 報告書IDのリスト
+
+        Yields:
+            bytes: ZIPデータのチャンク
+        """
+        stream = _ZipStream()
+        errors = []
+        # PDFは圧縮済みのため、ZIPでは無圧縮で格納する
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED) as zip_file:
+            for report_id, entry_name, pdf_file, error in self.iter_report_pdfs(
+                app, report_ids
+            ):
+                if error:
+                    errors.append(f"報告書ID {report_id}: {error}")
+                    continue
+
+                with pdf_file, zip_file.open(entry_name, "w") as entry:
+                    while True:
+                        chunk = pdf_file.read(COPY_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        entry.write(chunk)
+                        yield stream.pop()
+                yield stream.pop()
+
+            if errors:
+                zip_file.writestr(
+                    "エラー一覧.txt",
+                    "以下の報告書はPDFを作成できませんでした\n" + "\n".join(errors),
+                )
+        yield stream.pop()
+
+    def build_combined_pdf(self, app, report_ids, output_path: str):
+        """
+        報告書PDFを1つのPDFに結合して保存
+
+        Args:
+            app: Flaskアプリケーション
+            report_ids (list): 報告書IDのリスト
+            output_path (str): 出力先のパス
+
+        Returns:
+            list: PDFを作成できなかった報告書のエラーメッセージのリスト
+        """
+        pdf_files = []
+        errors = []
+        try:
+            for report_id, _, pdf_file, error in self.iter_report_pdfs(app, report_ids):
+                if error:
+                    errors.append(f"報告書ID {report_id}: {error}")
+                else:
+                    pdf_files.append(pdf_file)
+
+            if not pdf_files:
+                raise ValueError("PDFを作成できる報告書がありません")
+
+            PDFService.combine_pdfs(pdf_files, output_path)
+        finally:
+            for pdf_file in pdf_files:
+                pdf_file.close()
+        return errors
+
+
+# サービスインスタンス
+pdf_export_service = PDFExportService()
@@ -0,0 +1,220 @@
+"""
+報告書PDFのバックグラウンド生成サービス
+
+PDFの生成をリクエスト処理から切り離し、プロセス内のワーカースレッドで実行する。
+ジョブの状態はpdf_jobsテーブルに保存し、画面からポーリングで確認する
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from sqlalchemy import or_
+
+from app import db
+from app.models.pdf_job import PdfJob
+from app.models.report import Report
+from app.services.pdf_service import PDFService
+
+
+# 同時に実行するPDF生成ジョブ数の既定値
+DEFAULT_PDF_JOB_WORKERS = 2
+
+# 作成中のまま残ったジョブを待機中に戻すまでの時間（再起動・異常終了時の対策）
+STALE_RUNNING_TIMEOUT = timedelta(minutes=30)
+
+
+class PDFJobService:
+    """報告書PDFのバックグラウンド生成サービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """ワーカープールを取得（初回に作成）"""
+        with self._lock:
+            if self._executor is None:
+                max_workers = current_app.config.get(
+                    "PDF_JOB_WORKERS", DEFAULT_PDF_JOB_WORKERS
+                )
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="pdf-job"
+                )
+            return self._executor
+
+    def submit(self, report_id: int, user_id: int = None) -> PdfJob:
+        """
+        PDF生成ジョブを登録してワーカーに渡す
+
+        同じ報告書の待機中・作成中のジョブがある場合は、そのジョブを返す
+        （作成中のまま一定時間を過ぎたジョブは待機中に戻して渡し直す）
+
+        Args:
+            report_id: 報告書ID
+            user_id: 依頼したユーザーID
+
+        Returns:
+            PdfJob: 登録したジョブ
+        """
+        for job_id in self._requeue_stale(datetime.utcnow() - STALE_RUNNING_TIMEOUT):
+            self._dispatch(job_id)
+
+        job = (
+            PdfJob.query.filter(
+                PdfJob.report_id == report_id,
+                PdfJob.status.in_(["queued", "running"]),
+            )
+            .order_by(PdfJob.id.desc())
+            .first()
+        )
+        if job:
+            return job
+
+        job = PdfJob(report_id=report_id, requested_by=user_id)
+        db.session.add(job)
+        db.session.commit()
+
+        self._dispatch(job.id)
+        return job
+
+    def _dispatch(self, job_id: int):
+        app = current_app._get_current_object()
+        self._get_executor().submit(self._run, app, job_id)
+
+    def _requeue_stale(self, started_before: datetime) -> list:
+        """
+        作成中のまま残ったジョブを待機中に戻す
+
+        Args:
+            started_before: この日時より前に作成を開始したジョブを戻す
+
+        Returns:
+            list: 待機中に戻したジョブID
+        """
+        job_ids = [
+            job_id
+            for (job_id,) in db.session.query(PdfJob.id).filter(
+                PdfJob.status == "running",
+                or_(PdfJob.started_at == None, PdfJob.started_at < started_before),
+            )
+        ]
+        if job_ids:
+            PdfJob.query.filter(
+                PdfJob.id.in_(job_ids), PdfJob.status == "running"
+            ).update(
+                {"status": "queued", "progress": 0, "started_at": None},
+                synchronize_session=False,
+            )
+            db.session.commit()
+            self.logger.warning(
+                f"作成中のまま残ったジョブを待機中に戻しました: {len(job_ids)}件"
+            )
+        return job_ids
+
+    def requeue_pending(self, running_timeout: timedelta = timedelta(0)):
+        """
+        待機中のまま残っているジョブをワーカーに渡し直す（起動時に呼び出す）
+
+        起動時はこのプロセスで作成中のジョブはないため、既定では作成中のまま
+        残ったジョブもすべて待機中に戻して渡し直す
+
+        Args:
+            running_timeout: 作成を開始してからこの時間を過ぎたジョブを待機中に戻す
+
+        Returns:
+            int: 渡し直したジョブ数
+        """
+        self._requeue_stale(datetime.utcnow() - running_timeout)
+        job_ids = [
+            job_id
+            for (job_id,) in db.session.query(PdfJob.id).filter(
+                PdfJob.status == "queued"
+            )
+        ]
+        for job_id in job_ids:
+            self._dispatch(job_id)
+        return len(job_ids)
+
+    def _claim(self, job_id: int) -> bool:
+        """待機中のジョブを作成中に変更（他のワーカーが先に取得した場合はFalse）"""
+        claimed = (
+            PdfJob.query.filter_by(id=job_id, status="queued").update(
+                {"status": "running", "progress": 10, "started_at": datetime.utcnow()},
+                synchronize_session=False,
+            )
+            == 1
+        )
+        db.session.commit()
+        return claimed
+
+    def _run(self, app, job_id: int):
+        """ワーカースレッドでPDFを生成"""
+        with app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return
+
+                job = db.session.get(PdfJob, job_id)
+                report = db.session.get(Report, job.report_id)
+                if report is None:
+                    raise ValueError(f"報告書ID {job.report_id} が見つかりません")
+
+                work_times, work_details, photo_pairs = PDFService.collect_report_data(
+                    report.id
+                )
+                job.progress = 30
+                db.session.commit()
+
+                # 既存の保存処理を使ってディスクに書き出す
+                pdf_file, file_path = PDFService.generate_report_pdf(
+                    report, work_times, work_details, photo_pairs, save_to_disk=True
+                )
+                pdf_file.close()
+                if not file_path:
+                    raise RuntimeError("PDFファイルの保存に失敗しました")
+
+                job.file_path = file_path
+                job.status = "completed"
+                job.progress = 100
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                self.logger.info(f"PDFジョブ完了: {job.token} -> {file_path}")
+            except Exception as e:
+                db.session.rollback()
+                self.logger.error(f"PDFジョブエラー: ジョブID {job_id}: {e}")
+                job = db.session.get(PdfJob, job_id)
+                if job:
+                    job.status = "failed"
+                    job.error_message = str(e)
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+            finally:
+                db.session.remove()
+
+    def get_job(self, token: str) -> PdfJob:
+        """トークンからジョブを取得"""
+        return PdfJob.query.filter_by(token=token).first()
+
+    def get_result_path(self, job: PdfJob):
+        """完了したジョブのPDFファイルのパスを取得（存在しない場合はNone）"""
+        if job.status != "completed" or not job.file_path:
+            return None
+        if not os.path.exists(job.file_path):
+            return None
+        return job.file_path
+
+    def shutdown(self):
+        """ワーカープールを停止し、実行中のジョブの終了を待つ（テスト・終了処理用）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# サービスインスタンス
+pdf_job_service = PDFJobService()
@@ -1,8 +1,8 @@
 import os
-import tempfile
 import re
+import tempfile
 from io import BytesIO
-from flask import render_template, current_app
+from flask import render_template, current_app, has_app_context
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
@@ -11,20 +11,46 @@ from reportlab.platypus import (
     Paragraph,
     Spacer,
     Table,
-    TableStyle,
     Image,
     PageBreak,
     KeepTogether,
 )
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab import rl_config
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
-from PyPDF2 import PdfWriter, PdfReader
+from PyPDF2 import PdfWriter
 from PIL import Image as PILImage
+from app.services.photo_cache_service import photo_cache_service
+from app.services.pdf_theme import pdf_theme
+
+
+# 写真の前処理に使うスレッド数の上限
+PHOTO_DECODE_MAX_WORKERS = 8
+
+# ストリームをASCII85で符号化しない
+# （C拡張がない環境では純Pythonで符号化され、写真の多いPDFで大半の時間を占めるため。
+#   バイナリのまま書き出すとファイルサイズも約2割小さくなる）
+rl_config.useA85 = 0
+
+# PDFをメモリ上に保持する上限（超えると一時ファイルに書き出す）
+PDF_SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+
+def create_pdf_output():
+    """
+    PDFの書き出し先を作成する
+
+    一定サイズまではメモリ上に保持し、超えた分は一時ファイルに書き出すため、
+    写真の枚数が多くてもリクエストごとのメモリ使用量が増え続けない
+
+    Returns:
+        SpooledTemporaryFile: 書き込み・読み込み可能なファイルオブジェクト
+    """
+    max_size = PDF_SPOOL_MAX_SIZE
+    if has_app_context():
+        max_size = current_app.config.get("PDF_SPOOL_MAX_SIZE", PDF_SPOOL_MAX_SIZE)
+    return tempfile.SpooledTemporaryFile(max_size=max_size, mode="w+b")
 
 
 def sanitize_filename(filename):
@@ -34,12 +60,13 @@ def sanitize_filename(filename):
     return re.sub(invalid_chars, "", filename)
 
 
-def fix_image_orientation(image_path):
+def fix_image_orientation(image_path, draft_size=None):
     """
     画像のEXIF情報を読み取り、正しい向きに回転させる
 
     Args:
         image_path (str): 画像ファイルのパス
+        draft_size (tuple): 指定した場合、JPEGをこのサイズ以上の縮小状態でデコードする
 
     Returns:
         PIL.Image: 正しい向きに回転された画像オブジェクト
@@ -48,6 +75,10 @@ def fix_image_orientation(image_path):
         # PILで画像を開く
         image = PILImage.open(image_path)
 
+        # 縮小デコード（JPEG以外では何もしない）
+        if draft_size:
+            image.draft("RGB", draft_size)
+
         # EXIF情報を取得
         exif = image._getexif()
 
@@ -108,127 +139,32 @@ class PDFService:
             save_to_disk (bool): ディスクに保存するかどうか
 
         Returns:
-            BytesIO: PDF形式のバイトデータ
+            file: PDFを書き込んだファイルオブジェクト（先頭に位置付け済み、呼び出し側で閉じる）
             str: 保存されたPDFのパス（save_to_diskがTrueの場合）
         """
-        # PDF用のバッファを作成
-        buffer = BytesIO()
+        # 出力先を決める（ディスクに保存する場合は保存先のファイルに直接書き出す）
+        file_path = None
+        output = None
+        if save_to_disk:
+            try:
+                file_path = PDFService.build_save_path(report)
+                output = open(file_path, "w+b")
+            except Exception as e:
+                print(f"PDF保存エラー: {e}")
+                file_path = None
+        if output is None:
+            output = create_pdf_output()
 
         # PDFドキュメントを作成
         doc = SimpleDocTemplate(
-            buffer,
+            output,
             pagesize=A4,
             title=f"作業完了書_{report.id}",
             author="エアコンクリーニング完了報告書システム",
         )
 
-        # 日本語フォントの登録（UnicodeCIDFont）
-        pdfmetrics.registerFont(UnicodeCIDFont("HeiseiKakuGo-W5"))
-
-        # スタイルを設定
-        styles = getSampleStyleSheet()
-        # 日本語スタイルを追加
-        styles.add(
-            ParagraphStyle(
-                name="JapaneseNormal",
-                fontName="HeiseiKakuGo-W5",
-                fontSize=10,
-                leading=12,
-                firstLineIndent=0,
-                alignment=4,  # 4=左揃え
-            )
-        )
-
-        styles.add(
-            ParagraphStyle(
-                name="JapaneseHeading1",
-                parent=styles["Heading1"],
-                fontName="HeiseiKakuGo-W5",
-                fontSize=16,
-                leading=18,
-            )
-        )
-
-        styles.add(
-            ParagraphStyle(
-                name="JapaneseHeading2",
-                parent=styles["Heading2"],
-                fontName="HeiseiKakuGo-W5",
-                fontSize=14,
-                leading=16,
-            )
-        )
-
-        styles.add(
-            ParagraphStyle(
-                name="JapaneseHeading3",
-                parent=styles["Heading3"],
-                fontName="HeiseiKakuGo-W5",
-                fontSize=12,
-                leading=14,
-            )
-        )
-
-        # 写真セット間の区切り線スタイルを追加
-        styles.add(
-            ParagraphStyle(
-                name="JapaneseDivider",
-                fontName="HeiseiKakuGo-W5",
-                fontSize=1,
-                leading=1,
-                spaceBefore=3,
-                spaceAfter=3,
-                alignment=1,  # 中央揃え
-            )
-        )
-
-        # エアコン情報用のスタイル（余白を減らす）
-        styles.add(
-            ParagraphStyle(
-                name="JapaneseAcInfo",
-                parent=styles["JapaneseNormal"],
-                fontName="HeiseiKakuGo-W5",
-                fontSize=8,  # フォントサイズをさらに小さく
-                leading=9,  # リーディングを縮小
-                spaceAfter=0,  # 余白をなくす
-            )
-        )
-
-        # タイトル部分のスタイルを変更
-        styles.add(
-            ParagraphStyle(
-                name="JapaneseTitle",
-                fontName="HeiseiKakuGo-W5",
-                fontSize=14,  # タイトルのフォントサイズを小さくする
-                leading=16,
-                alignment=0,  # 左揃え
-            )
-        )
-
-        styles.add(
-            ParagraphStyle(
-                name="JapaneseIdText",
-                fontName="HeiseiKakuGo-W5",
-                fontSize=11,  # IDテキストのフォントサイズをさらに小さく
-                leading=13,
-                alignment=2,  # 右揃え
-                underline=True,  # 下線を追加
-            )
-        )
-
-        # 写真セット用のスタイル
-        styles.add(
-            ParagraphStyle(
-                name="JapanesePhotoCaption",
-                parent=styles["JapaneseHeading3"],
-                fontName="HeiseiKakuGo-W5",
-                fontSize=12,  # フォントサイズを少し大きく
-                leading=14,  # リーディングを調整
-                spaceAfter=3,  # 写真キャプションの下部余白を調整
-                alignment=1,  # 中央揃え
-                textColor=colors.darkblue,  # 色を追加
-            )
-        )
+        # フォント・スタイルはプロセス内で共有するテーマから取得
+        styles = pdf_theme.styles
 
         # 写真セット間の区切り線用関数
         def create_divider():
@@ -238,13 +174,7 @@ class PDFService:
                     [[""]],
                     colWidths=[500],  # 幅を広げる
                     rowHeights=[2],  # 線の太さを少し太くする
-                ).setStyle(
-                    TableStyle(
-                        [
-                            # より濃いグレーの線でエレガントな区切り
-                            ("LINEABOVE", (0, 0), (0, 0), 1.0, colors.grey),
-                        ]
-                    )
+                    style=pdf_theme.divider_table_style,
                 ),
                 Spacer(1, 12),  # 下部スペースを増やす
             ]
@@ -261,22 +191,7 @@ class PDFService:
         ]
 
         title_table = Table(title_table_data, colWidths=[300, 200])
-        title_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("ALIGN", (0, 0), (0, 0), "LEFT"),
-                    ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-                    (
-                        "LINEBELOW",
-                        (1, 0),
-                        (1, 0),
-                        0.5,
-                        colors.black,
-                    ),  # IDの下に線を引く
-                ]
-            )
-        )
+        title_table.setStyle(pdf_theme.title_table_style)
 
         elements.append(title_table)
         elements.append(Spacer(1, 12))
@@ -306,20 +221,7 @@ class PDFService:
             ["TEL", "０８０－４６４６－２２６６"],
         ]
         reporter_table = Table(reporter_data, colWidths=[100, 400])
-        reporter_table.setStyle(
-            TableStyle(
-                [
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                    ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (-1, -1), "HeiseiKakuGo-W5"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 10),
-                    ("TOPPADDING", (0, 0), (-1, -1), 3),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-                ]
-            )
-        )
+        reporter_table.setStyle(pdf_theme.info_table_style)
         elements.append(reporter_table)
         elements.append(Spacer(1, 12))
 
@@ -331,20 +233,7 @@ class PDFService:
             ["住所", address],
         ]
         customer_table = Table(customer_data, colWidths=[100, 400])
-        customer_table.setStyle(
-            TableStyle(
-                [
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                    ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (-1, -1), "HeiseiKakuGo-W5"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 10),
-                    ("TOPPADDING", (0, 0), (-1, -1), 3),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-                ]
-            )
-        )
+        customer_table.setStyle(pdf_theme.info_table_style)
         elements.append(customer_table)
         elements.append(Spacer(1, 12))
 
@@ -384,26 +273,7 @@ class PDFService:
                 + [None]
                 * (len(work_time_data) - 1),  # ヘッダー行は25px、データ行は自動調整
             )
-            work_time_table.setStyle(
-                TableStyle(
-                    [
-                        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("FONTNAME", (0, 0), (-1, -1), "HeiseiKakuGo-W5"),
-                        ("FONTSIZE", (0, 0), (-1, -1), 10),
-                        ("TOPPADDING", (0, 0), (-1, -1), 3),
-                        ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-                        (
-                            "WORDWRAP",
-                            (0, 0),
-                            (-1, -1),
-                            True,
-                        ),  # すべてのセルでテキスト折り返しを有効化
-                    ]
-                )
-            )
+            work_time_table.setStyle(pdf_theme.work_time_table_style)
             elements.append(work_time_table)
         else:
             elements.append(Paragraph("作業日時情報なし", styles["JapaneseNormal"]))
@@ -413,13 +283,7 @@ class PDFService:
         elements.append(Paragraph("＜作業内容＞", styles["JapaneseHeading2"]))
         if work_details:
             # ヘッダー行もParagraphオブジェクトに変換
-            header_style = ParagraphStyle(
-                name="JapaneseTableHeader",
-                parent=styles["JapaneseNormal"],
-                fontName="HeiseiKakuGo-W5",
-                fontSize=10,
-                alignment=4,  # 左揃え
-            )
+            header_style = styles["JapaneseTableHeader"]
             work_detail_data = [
                 [
                     Paragraph("エアコン情報", header_style),
@@ -471,25 +335,7 @@ class PDFService:
                     len(work_detail_data) - 1
                 ),  # ヘッダー行は25px、データ行は自動調整（コンテンツに合わせる）
             )
-            work_detail_table.setStyle(
-                TableStyle(
-                    [
-                        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("FONTNAME", (0, 0), (-1, -1), "HeiseiKakuGo-W5"),
-                        ("TOPPADDING", (0, 0), (-1, -1), 3),
-                        ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-                        (
-                            "WORDWRAP",
-                            (0, 0),
-                            (-1, -1),
-                            True,
-                        ),  # すべてのセルでテキスト折り返しを有効化
-                    ]
-                )
-            )
+            work_detail_table.setStyle(pdf_theme.work_detail_table_style)
             elements.append(work_detail_table)
         else:
             elements.append(Paragraph("作業内容情報なし", styles["JapaneseNormal"]))
@@ -501,34 +347,10 @@ class PDFService:
             elements.append(Paragraph(report.note, styles["JapaneseNormal"]))
             elements.append(Spacer(1, 12))
 
-        # PDFドキュメントを生成（1ページ目、基本情報と作業内容）
-        doc.build(elements)
-
-        # 新しいバッファを作成（写真用）
+        # 写真ページ（基本情報と作業内容に続けて同じドキュメントに配置する）
         if photo_pairs:
-            # 初期化したバッファを保存
-            buffer_content = buffer.getvalue()
-            buffer.close()
-
-            # マージするためのPDFライター
-            pdf_writer = PdfWriter()
-
-            # 1ページ目のPDFを読み込む
-            pdf_reader = PdfReader(BytesIO(buffer_content))
-            for page in range(len(pdf_reader.pages)):
-                pdf_writer.add_page(pdf_reader.pages[page])
-
-            # 写真用の新しいPDFを作成
-            photo_buffer = BytesIO()
-            photo_doc = SimpleDocTemplate(
-                photo_buffer,
-                pagesize=A4,
-                title=f"作業完了書_{report.id}_写真",
-                author="エアコンクリーニング完了報告書システム",
-            )
-
-            # 一時ファイルのリストを保持
-            temp_files = []
+            # 写真のデコード・回転・縮小を並列で事前に行う
+            photo_images = PDFService.prepare_photo_images(photo_pairs)
 
             # 写真ページを調整するための追加設定
             # 写真ページのコンテンツ
@@ -634,41 +456,16 @@ class PDFService:
                         caption_row = []
 
                         # 施工前の写真
-                        if (
-                            before_photo
-                            and before_photo.filepath
-                            and os.path.exists(
-                                os.path.join(
-                                    current_app.config["UPLOAD_FOLDER"],
-                                    before_photo.filepath,
-                                )
-                            )
-                        ):
+                        if before_photo and before_photo.id in photo_images:
                             try:
-                                # 画像パスを取得
-                                image_path = os.path.join(
-                                    current_app.config["UPLOAD_FOLDER"],
-                                    before_photo.filepath,
-                                )
-
-                                # 画像の向きを修正
-                                corrected_image = fix_image_orientation(image_path)
-
-                                # 一時ファイルに保存
-                                with tempfile.NamedTemporaryFile(
-                                    suffix=".jpg", delete=False
-                                ) as temp_file:
-                                    corrected_image.save(
-                                        temp_file.name, "JPEG", quality=95
-                                    )
-                                    temp_path = temp_file.name
-                                    temp_files.append(
-                                        temp_path
-                                    )  # 一時ファイルリストに追加
+                                # 前処理ステージで準備した派生画像を取得
+                                image_data = photo_images[before_photo.id]
+                                if image_data is None:
+                                    raise ValueError("派生画像の準備に失敗しました")
 
                                 # 画像をリサイズして挿入（サイズを大きく調整）
                                 img = Image(
-                                    temp_path,
+                                    BytesIO(image_data),
                                     width=240,  # 幅を拡大（180→240）
                                     height=180,  # 高さを拡大（135→180）
                                 )
@@ -708,41 +505,16 @@ class PDFService:
                             )
 
                         # 施工後の写真
-                        if (
-                            after_photo
-                            and after_photo.filepath
-                            and os.path.exists(
-                                os.path.join(
-                                    current_app.config["UPLOAD_FOLDER"],
-                                    after_photo.filepath,
-                                )
-                            )
-                        ):
+                        if after_photo and after_photo.id in photo_images:
                             try:
-                                # 画像パスを取得
-                                image_path = os.path.join(
-                                    current_app.config["UPLOAD_FOLDER"],
-                                    after_photo.filepath,
-                                )
-
-                                # 画像の向きを修正
-                                corrected_image = fix_image_orientation(image_path)
-
-                                # 一時ファイルに保存
-                                with tempfile.NamedTemporaryFile(
-                                    suffix=".jpg", delete=False
-                                ) as temp_file:
-                                    corrected_image.save(
-                                        temp_file.name, "JPEG", quality=95
-                                    )
-                                    temp_path = temp_file.name
-                                    temp_files.append(
-                                        temp_path
-                                    )  # 一時ファイルリストに追加
+                                # 前処理ステージで準備した派生画像を取得
+                                image_data = photo_images[after_photo.id]
+                                if image_data is None:
+                                    raise ValueError("派生画像の準備に失敗しました")
 
                                 # 画像をリサイズして挿入（サイズを大きく調整）
                                 img = Image(
-                                    temp_path,
+                                    BytesIO(image_data),
                                     width=240,  # 幅を拡大（180→240）
                                     height=180,  # 高さを拡大（135→180）
                                 )
@@ -788,39 +560,7 @@ class PDFService:
                         photo_table = Table(
                             photo_data, colWidths=[270, 270]
                         )  # 幅を拡大（225→270）
-                        photo_table.setStyle(
-                            TableStyle(
-                                [
-                                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                                    (
-                                        "BACKGROUND",
-                                        (0, 0),
-                                        (-1, 0),
-                                        colors.lightgrey,
-                                    ),  # ヘッダー行の背景色
-                                    (
-                                        "TOPPADDING",
-                                        (0, 0),
-                                        (-1, -1),
-                                        3,
-                                    ),  # 上部パディングを少し増やす
-                                    (
-                                        "BOTTOMPADDING",
-                                        (0, 0),
-                                        (-1, -1),
-                                        6,
-                                    ),  # 下部パディングを少し増やす
-                                    (
-                                        "GRID",
-                                        (0, 0),
-                                        (-1, -1),
-                                        0.5,
-                                        colors.black,
-                                    ),  # 枠線を追加
-                                ]
-                            )
-                        )
+                        photo_table.setStyle(pdf_theme.photo_table_style)
 
                         # 間隔を調整
                         all_elements = photo_set_elements + [
@@ -829,81 +569,177 @@ class PDFService:
                         ]
                         photo_elements.append(KeepTogether(all_elements))
 
-            # 写真ページを生成
-            photo_doc.build(photo_elements)
+            # 写真ページは新しいページから開始
+            elements.append(PageBreak())
+            elements.extend(photo_elements)
 
-            # 一時ファイルを削除
-            for temp_file in temp_files:
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
-
-            # 写真ページをメインPDFにマージ
-            photo_buffer.seek(0)
-            photo_reader = PdfReader(photo_buffer)
-            for page in range(len(photo_reader.pages)):
-                pdf_writer.add_page(photo_reader.pages[page])
-
-            # マージしたPDFをバッファに書き込む
-            buffer = BytesIO()
-            pdf_writer.write(buffer)
-            buffer.seek(0)
-        else:
-            buffer.seek(0)
+        # PDFドキュメントを生成（1回の書き出しで全ページを出力）
+        try:
+            doc.build(elements)
+        except Exception:
+            # 書きかけのファイルを残さない
+            output.close()
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
+            raise
 
-        # バッファの位置をリセットして内容を返す
-        buffer.seek(0)
+        # 位置をリセットして内容を返す
+        output.seek(0)
 
-        # ディスクに保存する場合
         if save_to_disk:
-            try:
-                # 顧客名と物件名を取得（sanitize_filename関数で安全なファイル名に変換）
-                customer_name = sanitize_filename(
-                    report.property.customer.name
-                    if report.property and report.property.customer
-                    else "unknown"
-                )
-                property_name = sanitize_filename(
-                    report.property.name if report.property else "unknown"
-                )
+            if file_path:
+                print(f"PDF saved to: {file_path}")
+            return output, file_path
 
-                # PDFを保存するディレクトリ構造を作成
-                pdf_dir = os.path.join(
-                    current_app.config["UPLOAD_FOLDER"],
-                    "PDF",
-                    customer_name,
-                    property_name,
-                )
+        return output
 
-                # ディレクトリが存在しない場合は作成
-                if not os.path.exists(pdf_dir):
-                    os.makedirs(pdf_dir, exist_ok=True)
+    @staticmethod
+    def build_save_path(report):
+        """
+        報告書PDFの保存先パスを作成する（ディレクトリも作成）
 
-                # 現在の日時を含むファイル名を生成
-                date_str = (
-                    report.date.strftime("%Y%m%d")
-                    if report.date
-                    else datetime.now().strftime("%Y%m%d")
-                )
-                time_str = datetime.now().strftime("%H%M%S")
-                filename = f"作業完了報告書_{customer_name}_{property_name}_{date_str}_{time_str}.pdf"
+        Args:
+            report (Report): 報告書オブジェクト
 
-                # 最終的なファイルパスを構築
-                file_path = os.path.join(pdf_dir, filename)
+        Returns:
+            str: 保存先のファイルパス
+        """
+        # 顧客名と物件名を取得（sanitize_filename関数で安全なファイル名に変換）
+        customer_name = sanitize_filename(
+            report.property.customer.name
+            if report.property and report.property.customer
+            else "unknown"
+        )
+        property_name = sanitize_filename(
+            report.property.name if report.property else "unknown"
+        )
 
-                # PDFをファイルに保存
-                with open(file_path, "wb") as f:
-                    f.write(buffer.getvalue())
+        # PDFを保存するディレクトリ構造を作成
+        pdf_dir = os.path.join(
+            current_app.config["UPLOAD_FOLDER"],
+            "PDF",
+            customer_name,
+            property_name,
+        )
 
-                print(f"PDF saved to: {file_path}")
-                return buffer, file_path
-            except Exception as e:
-                print(f"PDF保存エラー: {e}")
-                # エラーが発生しても、バッファは返す
-                return buffer, None
+        # ディレクトリが存在しない場合は作成
+        if not os.path.exists(pdf_dir):
+            os.makedirs(pdf_dir, exist_ok=True)
+
+        # 現在の日時を含むファイル名を生成
+        date_str = (
+            report.date.strftime("%Y%m%d")
+            if report.date
+            else datetime.now().strftime("%Y%m%d")
+        )
+        time_str = datetime.now().strftime("%H%M%S")
+        filename = (
+            f"作業完了報告書_{customer_name}_{property_name}_{date_str}_{time_str}.pdf"
+        )
+
+        # 最終的なファイルパスを構築
+        return os.path.join(pdf_dir, filename)
+
+    @staticmethod
+    def collect_report_data(report_id):
+        """
+        報告書PDFに掲載する作業時間・作業内容・写真ペアを取得する
+
+        Args:
+            report_id (int): 報告書ID
+
+        Returns:
+            tuple: (作業時間のリスト, 作業内容のリスト, 写真ペアのリスト)
+        """
+        from app.models.work_time import WorkTime
+        from app.models.work_detail import WorkDetail
+        from app.models.photo import Photo
+
+        # 作業時間の取得
+        work_times = (
+            WorkTime.query.filter_by(report_id=report_id)
+            .order_by(WorkTime.work_date, WorkTime.start_time)
+            .all()
+        )
+
+        # 作業内容の取得
+        work_details = WorkDetail.query.filter_by(report_id=report_id).all()
+
+        # 施工前後の写真を取得
+        before_photos = Photo.query.filter_by(
+            report_id=report_id, photo_type="before"
+        ).all()
+        after_photos = Photo.query.filter_by(
+            report_id=report_id, photo_type="after"
+        ).all()
 
-        return buffer
+        # 写真ペアの作成（最大枚数に合わせる）
+        photo_pairs = []
+        max_photos = max(len(before_photos), len(after_photos))
+        for i in range(max_photos):
+            before_photo = before_photos[i] if i < len(before_photos) else None
+            after_photo = after_photos[i] if i < len(after_photos) else None
+            photo_pairs.append((before_photo, after_photo))
+
+        return work_times, work_details, photo_pairs
+
+    @staticmethod
+    def prepare_photo_images(photo_pairs, max_workers=None):
+        """
+        写真ペアの派生画像（向き補正・縮小済みJPEG）を並列で準備する
+
+        Args:
+            photo_pairs (list): 写真ペアのリスト
+            max_workers (int): 並列数（省略時は設定値またはCPUコア数）
+
+        Returns:
+            dict: 写真ID -> JPEGのバイトデータ（準備に失敗した場合はNone）
+                  ファイルが存在しない写真は含まれない
+        """
+        upload_folder = current_app.config["UPLOAD_FOLDER"]
+        cache_folder = photo_cache_service.get_cache_folder()
+
+        # 対象となる写真のパスを収集（ワーカーではアプリケーションコンテキストを使わない）
+        image_paths = {}
+        for before_photo, after_photo in photo_pairs:
+            for photo in (before_photo, after_photo):
+                if photo and photo.filepath:
+                    image_path = os.path.join(upload_folder, photo.filepath)
+                    if os.path.exists(image_path):
+                        image_paths[photo.id] = image_path
+
+        if not image_paths:
+            return {}
+
+        if max_workers is None:
+            max_workers = current_app.config.get("PDF_PHOTO_WORKERS") or min(
+                PHOTO_DECODE_MAX_WORKERS, os.cpu_count() or 1
+            )
+
+        def load_derivative(image_path):
+            derivative_path = photo_cache_service.get_derivative_path(
+                image_path, cache_folder
+            )
+            with open(derivative_path, "rb") as f:
+                return f.read()
+
+        photo_images = {}
+        # Pillowはデコード・リサイズ中にGILを解放するためスレッドで並列化できる
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(image_paths))
+        ) as executor:
+            futures = {
+                photo_id: executor.submit(load_derivative, image_path)
+                for photo_id, image_path in image_paths.items()
+            }
+            for photo_id, future in futures.items():
+                try:
+                    photo_images[photo_id] = future.result()
+                except Exception as e:
+                    print(f"写真ID {photo_id} の画像処理エラー: {e}")
+                    photo_images[photo_id] = None
+
+        return photo_images
 
     @staticmethod
     def combine_pdfs(pdf_files, output_filename):
@@ -911,11 +747,20 @@ class PDFService:
         複数のPDFファイルを1つのPDFファイルに結合する
 
         Args:
-            pdf_files (list): PDFファイルのパスのリスト
+            pdf_files (list): PDFファイルのパス（またはファイルオブジェクト）のリスト
             output_filename (str): 出力ファイル名
 
         Returns:
             str: 結合したPDFファイルのパス
         """
-        # 実装予定
+        pdf_writer = PdfWriter()
+        for pdf_file in pdf_files:
+            pdf_writer.append(pdf_file)
+
+        # 書き込み途中のファイルを読まれないよう、別名で保存してから置き換える
+        partial_path = f"{output_filename}.part"
+        with open(partial_path, "wb") as f:
+            pdf_writer.write(f)
+        os.replace(partial_path, output_filename)
+
         return output_filename
@@ -0,0 +1,383 @@
+"""
+PDFテーマ（フォント・段落スタイル・テーブルスタイル）
+
+フォントの登録とスタイルの定義をプロセスごとに1回だけ行い、
+報告書PDF・受注明細PDF・受注月間表PDFで共有する
+"""
+
+import os
+import logging
+import threading
+
+from flask import current_app, has_app_context
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+
+# 報告書に使う日本語フォント（ReportLab内蔵のCIDフォント、どの環境でも使用可能）
+CID_FONT_NAME = "HeiseiKakuGo-W5"
+
+# 集計表に使うTrueTypeフォントの登録名
+TTF_FONT_NAME = "Japanese"
+
+# 集計表用フォントの候補パス（TrueType輪郭のフォントのみ使用可能）
+FONT_CANDIDATES = [
+    # Linux
+    "/usr/share/fonts/opentype/ipafont-gothic/ipag.ttf",
+    "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
+    "/usr/share/fonts/truetype/takao-gothic/TakaoGothic.ttf",
+    "/usr/share/fonts/truetype/vlgothic/VL-Gothic-Regular.ttf",
+    # macOS
+    "/Library/Fonts/Arial Unicode.ttf",
+    # Windows
+    "C:/Windows/Fonts/msgothic.ttc",
+    "C:/Windows/Fonts/NotoSansCJK-Regular.ttc",
+]
+
+# 候補パスにない場合に探索するフォントディレクトリとファイル名
+FONT_SEARCH_DIRS = [
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+]
+FONT_SEARCH_FILENAMES = {
+    "ipag.ttf",
+    "ipagp.ttf",
+    "ipaexg.ttf",
+    "fonts-japanese-gothic.ttf",
+    "TakaoGothic.ttf",
+    "TakaoPGothic.ttf",
+    "VL-Gothic-Regular.ttf",
+}
+
+
+class PDFTheme:
+    """PDF生成で共有するフォント・スタイルの管理"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _ensure_initialized(self):
+        """初回アクセス時にフォント登録とスタイル定義を行う"""
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            pdfmetrics.registerFont(UnicodeCIDFont(CID_FONT_NAME))
+            self._table_font_name = self._register_table_font()
+            self._build_styles()
+            self._initialized = True
+
+    def _find_font_paths(self):
+        """集計表用フォントの候補パスを優先順に列挙"""
+        if has_app_context() and current_app.config.get("PDF_FONT_PATH"):
+            yield current_app.config["PDF_FONT_PATH"]
+
+        for path in FONT_CANDIDATES:
+            if os.path.exists(path):
+                yield path
+
+        for search_dir in FONT_SEARCH_DIRS:
+            if not os.path.isdir(search_dir):
+                continue
+            for root, _, filenames in os.walk(search_dir):
+                for filename in sorted(FONT_SEARCH_FILENAMES.intersection(filenames)):
+                    yield os.path.join(root, filename)
+
+    def _register_table_font(self) -> str:
+        """
+        集計表用のTrueTypeフォントを登録
+
+        Returns:
+            str: 使用するフォント名（TrueTypeフォントが見つからない場合はCIDフォント）
+        """
+        for path in self._find_font_paths():
+            try:
+                pdfmetrics.registerFont(TTFont(TTF_FONT_NAME, path))
+                self.logger.info(f"PDF用フォントを登録しました: {path}")
+                return TTF_FONT_NAME
+            except Exception as e:
+                self.logger.warning(f"PDF用フォントの登録エラー: {path}: {e}")
+
+        self.logger.info(
+            f"TrueTypeの日本語フォントが見つからないため {CID_FONT_NAME} を使用します"
+        )
+        return CID_FONT_NAME
+
+    def _build_styles(self):
+        """段落スタイルとテーブルスタイルを定義"""
+        styles = getSampleStyleSheet()
+        styles.add(
+            ParagraphStyle(
+                name="JapaneseNormal",
+                fontName=CID_FONT_NAME,
+                fontSize=10,
+                leading=12,
+                firstLineIndent=0,
+                alignment=4,  # 4=左揃え
+            )
+        )
+        styles.add(
+            ParagraphStyle(
+                name="JapaneseHeading1",
+                parent=styles["Heading1"],
+                fontName=CID_FONT_NAME,
+                fontSize=16,
+                leading=18,
+            )
+        )
+        styles.add(
+            ParagraphStyle(
+                name="JapaneseHeading2",
+                parent=styles["Heading2"],
+                fontName=CID_FONT_NAME,
+                fontSize=14,
+                leading=16,
+            )
+        )
+        styles.add(
+            ParagraphStyle(
+                name="JapaneseHeading3",
+                parent=styles["Heading3"],
+                fontName=CID_FONT_NAME,
+                fontSize=12,
+                leading=14,
+            )
+        )
+        # 写真セット間の区切り線スタイル
+        styles.add(
+            ParagraphStyle(
+                name="JapaneseDivider",
+                fontName=CID_FONT_NAME,
+                fontSize=1,
+                leading=1,
+                spaceBefore=3,
+                spaceAfter=3,
+                alignment=1,  # 中央揃え
+            )
+        )
+        # エアコン情報用のスタイル（余白を減らす）
+        styles.add(
+            ParagraphStyle(
+                name="JapaneseAcInfo",
+                parent=styles["JapaneseNormal"],
+                fontName=CID_FONT_NAME,
+                fontSize=8,
+                leading=9,
+                spaceAfter=0,
+            )
+        )
+        styles.add(
+            ParagraphStyle(
+                name="JapaneseTitle",
+                fontName=CID_FONT_NAME,
+                fontSize=14,
+                leading=16,
+                alignment=0,  # 左揃え
+            )
+        )
+        styles.add(
+            ParagraphStyle(
+                name="JapaneseIdText",
+                fontName=CID_FONT_NAME,
+                fontSize=11,
+                leading=13,
+                alignment=2,  # 右揃え
+                underline=True,
+            )
+        )
+        # 写真セット用のスタイル
+        styles.add(
+            ParagraphStyle(
+                name="JapanesePhotoCaption",
+                parent=styles["JapaneseHeading3"],
+                fontName=CID_FONT_NAME,
+                fontSize=12,
+                leading=14,
+                spaceAfter=3,
+                alignment=1,  # 中央揃え
+                textColor=colors.darkblue,
+            )
+        )
+        # 作業内容テーブルのヘッダー
+        styles.add(
+            ParagraphStyle(
+                name="JapaneseTableHeader",
+                parent=styles["JapaneseNormal"],
+                fontName=CID_FONT_NAME,
+                fontSize=10,
+                alignment=4,  # 左揃え
+            )
+        )
+        # 集計表のタイトル
+        styles.add(
+            ParagraphStyle(
+                name="SummaryTitle",
+                fontSize=16,
+                alignment=1,
+                spaceAfter=20,
+                fontName=self._table_font_name,
+            )
+        )
+        # 集計表の抽出条件
+        styles.add(
+            ParagraphStyle(
+                name="SummaryCondition",
+                fontSize=9,
+                alignment=1,
+                fontName=self._table_font_name,
+            )
+        )
+        self._styles = styles
+
+        # 報告書：タイトル行（IDの下に線を引く）
+        self._title_table_style = TableStyle(
+            [
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("ALIGN", (0, 0), (0, 0), "LEFT"),
+                ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+                ("LINEBELOW", (1, 0), (1, 0), 0.5, colors.black),
+            ]
+        )
+
+        # 報告書：報告者・顧客情報（左列が見出し）
+        self._info_table_style = TableStyle(
+            [
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+                ("BACKGROUND", (0, 0), (0, -1), colors.lightgrey),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                ("FONTNAME", (0, 0), (-1, -1), CID_FONT_NAME),
+                ("FONTSIZE", (0, 0), (-1, -1), 10),
+                ("TOPPADDING", (0, 0), (-1, -1), 3),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+            ]
+        )
+
+        # 報告書：作業日時・作業内容（先頭行が見出し）
+        list_commands = [
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (-1, -1), CID_FONT_NAME),
+            ("TOPPADDING", (0, 0), (-1, -1), 3),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+            ("WORDWRAP", (0, 0), (-1, -1), True),
+        ]
+        self._work_time_table_style = TableStyle(
+            list_commands + [("FONTSIZE", (0, 0), (-1, -1), 10)]
+        )
+        self._work_detail_table_style = TableStyle(list_commands)
+
+        # 報告書：施工前後の写真
+        self._photo_table_style = TableStyle(
+            [
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                ("TOPPADDING", (0, 0), (-1, -1), 3),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            ]
+        )
+
+        # 報告書：写真セット間の区切り線
+        self._divider_table_style = TableStyle(
+            [("LINEABOVE", (0, 0), (0, 0), 1.0, colors.grey)]
+        )
+
+        # 受注明細・受注月間表（先頭2行が見出し、最終行が合計）
+        self._summary_table_style = TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 1), colors.grey),
+                ("TEXTCOLOR", (0, 0), (-1, 1), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, -1), self._table_font_name),
+                ("FONTSIZE", (0, 0), (-1, -1), 8),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+                ("BACKGROUND", (0, -1), (-1, -1), colors.lightgrey),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ]
+        )
+
+        # 受注明細（先頭行が見出し、最終行が合計、数値列は右揃え）
+        self._order_details_table_style = TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                ("ALIGN", (4, 1), (6, -1), "RIGHT"),
+                ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, -1), self._table_font_name),
+                ("FONTSIZE", (0, 0), (-1, -1), 8),
+                ("TOPPADDING", (0, 0), (-1, -1), 3),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+                ("BACKGROUND", (0, -1), (-1, -1), colors.lightgrey),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            ]
+        )
+
+    @property
+    def styles(self):
+        """段落スタイルシート（読み取り専用として共有する）"""
+        self._ensure_initialized()
+        return self._styles
+
+    @property
+    def table_font_name(self) -> str:
+        """集計表に使うフォント名"""
+        self._ensure_initialized()
+        return self._table_font_name
+
+    @property
+    def title_table_style(self) -> TableStyle:
+        self._ensure_initialized()
+        return self._title_table_style
+
+    @property
+    def info_table_style(self) -> TableStyle:
+        self._ensure_initialized()
+        return self._info_table_style
+
+    @property
+    def work_time_table_style(self) -> TableStyle:
+        self._ensure_initialized()
+        return self._work_time_table_style
+
+    @property
+    def work_detail_table_style(self) -> TableStyle:
+        self._ensure_initialized()
+        return self._work_detail_table_style
+
+    @property
+    def photo_table_style(self) -> TableStyle:
+        self._ensure_initialized()
+        return self._photo_table_style
+
+    @property
+    def divider_table_style(self) -> TableStyle:
+        self._ensure_initialized()
+        return self._divider_table_style
+
+    @property
+    def summary_table_style(self) -> TableStyle:
+        self._ensure_initialized()
+        return self._summary_table_style
+
+    @property
+    def order_details_table_style(self) -> TableStyle:
+        self._ensure_initialized()
+        return self._order_details_table_style
+
+
+# テーマインスタンス（プロセス内で共有）
+pdf_theme = PDFTheme()
@@ -0,0 +1,141 @@
+"""
+写真派生画像キャッシュサービス
+
+PDF掲載用に向き補正・縮小済みのJPEGをディスクにキャッシュし、
+PDF生成時に元のスマートフォン写真を毎回デコードしないようにする
+"""
+
+import os
+import hashlib
+import logging
+import threading
+
+from flask import current_app
+from PIL import Image as PILImage
+
+
+# PDF掲載用の派生画像サイズ（240x180ptの枠を約216dpiで印刷できる解像度）
+PDF_PHOTO_SIZE = (720, 540)
+
+# 派生画像のJPEG品質
+PDF_PHOTO_QUALITY = 85
+
+
+class PhotoCacheService:
+    """写真派生画像キャッシュサービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def get_cache_folder(self) -> str:
+        """キャッシュフォルダのパスを取得（アプリケーションコンテキストが必要）"""
+        cache_folder = current_app.config.get("PHOTO_CACHE_FOLDER")
+        if not cache_folder:
+            cache_folder = os.path.join(
+                current_app.config["UPLOAD_FOLDER"], "cache", "pdf"
+            )
+        return cache_folder
+
+    @staticmethod
+    def build_cache_key(image_path: str, mtime_ns: int, size: tuple) -> str:
+        """
+        キャッシュキーを生成
+
+        Args:
+            image_path: 元画像のパス
+            mtime_ns: 元画像の更新日時（ナノ秒）
+            size: 派生画像の最大サイズ (幅, 高さ)
+
+        Returns:
+            str: キャッシュファイル名
+        """
+        source = f"{os.path.abspath(image_path)}|{mtime_ns}|{size[0]}x{size[1]}"
+        return hashlib.sha1(source.encode("utf-8")).hexdigest() + ".jpg"
+
+    def get_derivative_path(
+        self, image_path: str, cache_folder: str = None, size: tuple = PDF_PHOTO_SIZE
+    ) -> str:
+        """
+        向き補正・縮小済みの派生画像のパスを取得（キャッシュがなければ作成）
+
+        Args:
+            image_path: 元画像のパス
+            cache_folder: キャッシュフォルダ（省略時は設定から取得）
+            size: 派生画像の最大サイズ (幅, 高さ)
+
+        Returns:
+            str: 派生画像のパス
+        """
+        if cache_folder is None:
+            cache_folder = self.get_cache_folder()
+
+        mtime_ns = os.stat(image_path).st_mtime_ns
+        cache_path = os.path.join(
+            cache_folder, self.build_cache_key(image_path, mtime_ns, size)
+        )
+
+        if os.path.exists(cache_path):
+            return cache_path
+
+        self._render_derivative(image_path, cache_path, size)
+        return cache_path
+
+    def _render_derivative(self, image_path: str, cache_path: str, size: tuple):
+        """派生画像を生成して保存"""
+        # 循環インポートを避けるため、ここでインポート
+        from app.services.pdf_service import fix_image_orientation
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+        # JPEGはdraftモードで縮小デコードする（回転で縦横が入れ替わるため長辺で指定）
+        longest = max(size)
+        image = fix_image_orientation(image_path, draft_size=(longest, longest))
+        try:
+            image.thumbnail(size, PILImage.LANCZOS)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+
+            # 書き込み途中のファイルを読まれないよう、別名で保存してから置き換える
+            # （同じプロセスの複数のスレッドが同じ写真を同時に生成する場合があるため、
+            # スレッドごとに別のファイルにする）
+            partial_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.part"
+            image.save(partial_path, "JPEG", quality=PDF_PHOTO_QUALITY)
+            os.replace(partial_path, cache_path)
+        finally:
+            image.close()
+
+    def warm(self, image_path: str) -> bool:
+        """
+        アップロード時に派生画像を事前生成
+
+        Args:
+            image_path: 元画像のパス
+
+        Returns:
+            bool: 生成に成功した場合True
+        """
+        try:
+            self.get_derivative_path(image_path)
+            return True
+        except Exception as e:
+            self.logger.warning(f"派生画像の事前生成エラー: {image_path}: {e}")
+            return False
+
+    def discard(self, image_path: str):
+        """元画像の削除前に、対応する派生画像を削除"""
+        try:
+            if not os.path.exists(image_path):
+                return
+            mtime_ns = os.stat(image_path).st_mtime_ns
+            cache_path = os.path.join(
+                self.get_cache_folder(),
+                self.build_cache_key(image_path, mtime_ns, PDF_PHOTO_SIZE),
+            )
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+        except Exception as e:
+            self.logger.warning(f"派生画像の削除エラー: {image_path}: {e}")
+
+
+# サービスインスタンス
+photo_cache_service = PhotoCacheService()
@@ -0,0 +1,375 @@
+"""
+繰り返しスケジュールの展開サービス
+
+繰り返しスケジュールは元のスケジュール1件だけを保存し、表示・通知に必要な期間の分だけ
+各回（ScheduleOccurrence）をその場で作成する。特定の回の取り消し・日時やステータスの変更は
+例外（ScheduleException）として保存し、展開時に反映する
+"""
+
+import calendar
+import logging
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, or_
+
+from app import db
+from app.models.schedule import Schedule, RECURRENCE_TYPES
+from app.models.schedule_exception import ScheduleException
+
+
+# 1件の繰り返しスケジュールから一度に作成する回数の上限（誤った期間指定への備え）
+MAX_OCCURRENCES = 1000
+
+# 繰り返しの間隔（日単位のもの）
+RECURRENCE_STEPS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    """月を加算（その月にない日付は月末日にする）"""
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def occurrence_starts(
+    first_start: datetime,
+    recurrence_type: str,
+    recurrence_end: date,
+    window_start: datetime,
+    window_end: datetime,
+):
+    """
+    開始日時が期間内にある各回の開始日時を順に返す
+
+    期間の前の回は計算で読み飛ばすため、元のスケジュールが古くても処理量は期間の長さで決まる
+
+    Args:
+        first_start (datetime): 元のスケジュールの開始日時（1回目）
+        recurrence_type (str): 繰り返しの種類（daily/weekly/monthly）
+        recurrence_end (date): 繰り返し終了日（この日を含む、Noneの場合は無期限）
+        window_start (datetime): 期間の開始日時（この日時を含む）
+        window_end (datetime): 期間の終了日時（この日時を含まない）
+
+    Yields:
+        tuple: (回数（0から）, 開始日時)
+    """
+    if recurrence_type in RECURRENCE_STEPS:
+        step = RECURRENCE_STEPS[recurrence_type]
+        index = 0
+        if window_start > first_start:
+            # 期間の開始以降の最初の回（切り上げ）
+            index = -((first_start - window_start) // step)
+
+        def start_of(i):
+            return first_start + step * i
+
+    elif recurrence_type == "monthly":
+        index = 0
+        if window_start > first_start:
+            # 月末日への補正で前にずれる場合があるため、1か月前から確認する
+            index = max(
+                0,
+                (window_start.year - first_start.year) * 12
+                + window_start.month
+                - first_start.month
+                - 1,
+            )
+
+        def start_of(i):
+            return _add_months(first_start, i)
+
+    else:
+        return
+
+    for _ in range(MAX_OCCURRENCES):
+        start = start_of(index)
+        if start >= window_end:
+            break
+        if recurrence_end is not None and start.date() > recurrence_end:
+            break
+        if start >= window_start:
+            yield index, start
+        index += 1
+
+
+class ScheduleOccurrence:
+    """
+    繰り返しスケジュールの1回分
+
+    開始・終了日時とステータスはこの回の値を持ち、それ以外の属性（タイトル・顧客など）は
+    元のスケジュールの値を参照する。idは元のスケジュールのIDになる
+    """
+
+    is_occurrence = True
+
+    def __init__(self, schedule, occurrence_date, start_datetime, end_datetime, status):
+        self.schedule = schedule
+        self.occurrence_date = occurrence_date
+        self.start_datetime = start_datetime
+        self.end_datetime = end_datetime
+        self.status = status
+
+    def __getattr__(self, name):
+        # この回の値として持っていない属性は元のスケジュールから取得
+        return getattr(self.schedule, name)
+
+    # ステータスの表示はこの回のステータスで行う
+    status_display = property(Schedule.status_display.fget)
+
+    def __repr__(self):
+        return f"<ScheduleOccurrence {self.schedule.id} {self.occurrence_date}>"
+
+
+class RecurrenceService:
+    """繰り返しスケジュールの展開サービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def single_filter(self):
+        """繰り返しでないスケジュールの条件"""
+        return or_(
+            Schedule.recurrence_type.is_(None),
+            Schedule.recurrence_type.notin_(RECURRENCE_TYPES),
+        )
+
+    def recurring_filters(self, start_dt: datetime, end_dt: datetime):
+        """
+        期間内に回がある可能性のある繰り返しスケジュールの条件
+
+        繰り返しの期間（1回目から繰り返し終了日まで）が期間と重なるものに加えて、
+        繰り返しの期間外の日時に変更した回が期間内にあるものも含める
+        """
+        moved_into_window = (
+            db.select(ScheduleException.id)
+            .where(
+                ScheduleException.schedule_id == Schedule.id,
+                ScheduleException.cancelled == False,
+                ScheduleException.start_datetime >= start_dt,
+                ScheduleException.start_datetime < end_dt,
+            )
+            .exists()
+        )
+        return [
+            Schedule.recurrence_type.in_(RECURRENCE_TYPES),
+            or_(
+                and_(
+                    Schedule.start_datetime < end_dt,
+                    or_(
+                        Schedule.recurrence_end.is_(None),
+                        Schedule.recurrence_end >= start_dt.date(),
+                    ),
+                ),
+                moved_into_window,
+            ),
+        ]
+
+    def load_exceptions(self, schedule_ids):
+        """
+        繰り返しスケジュールの例外を取得
+
+        Returns:
+            dict: スケジュールID -> {本来の開始日 -> ScheduleException}
+        """
+        exceptions = {}
+        if not schedule_ids:
+            return exceptions
+        for exception in ScheduleException.query.filter(
+            ScheduleException.schedule_id.in_(schedule_ids)
+        ):
+            exceptions.setdefault(exception.schedule_id, {})[
+                exception.occurrence_date
+            ] = exception
+        return exceptions
+
+    def _make_occurrence(self, schedule, occurrence_date, start, exception=None):
+        end = start + (schedule.end_datetime - schedule.start_datetime)
+        status = schedule.status
+        if exception is not None:
+            start = exception.start_datetime or start
+            end = exception.end_datetime or end
+            status = exception.status or status
+        return ScheduleOccurrence(schedule, occurrence_date, start, end, status)
+
+    def expand(self, schedule, start_dt: datetime, end_dt: datetime, exceptions=None):
+        """
+        繰り返しスケジュールの期間内の回を作成（開始日時順）
+
+        取り消した回は含めず、日時を変更した回は変更後の開始日時が期間内にある場合に含める
+
+        Args:
+            schedule (Schedule): 繰り返しスケジュール
+            start_dt (datetime): 期間の開始日時（この日時を含む）
+            end_dt (datetime): 期間の終了日時（この日時を含まない）
+            exceptions (dict): 本来の開始日 -> ScheduleException
+
+        Returns:
+            list: ScheduleOccurrenceのリスト
+        """
+        exceptions = exceptions or {}
+        occurrences = []
+        for _, start in occurrence_starts(
+            schedule.start_datetime,
+            schedule.recurrence_type,
+            schedule.recurrence_end,
+            start_dt,
+            end_dt,
+        ):
+            occurrence_date = start.date()
+            exception = exceptions.get(occurrence_date)
+            if exception is not None and exception.cancelled:
+                continue
+            occurrence = self._make_occurrence(
+                schedule, occurrence_date, start, exception
+            )
+            if start_dt <= occurrence.start_datetime < end_dt:
+                occurrences.append(occurrence)
+
+        # 期間外の回から期間内に日時を変更した回を追加
+        for occurrence_date, exception in exceptions.items():
+            if exception.cancelled or exception.start_datetime is None:
+                continue
+            if not start_dt <= exception.start_datetime < end_dt:
+                continue
+            original_start = datetime.combine(
+                occurrence_date, schedule.start_datetime.time()
+            )
+            if start_dt <= original_start < end_dt:
+                continue  # 上で追加済み
+            if self.is_occurrence_date(schedule, occurrence_date):
+                occurrences.append(
+                    self._make_occurrence(
+                        schedule, occurrence_date, original_start, exception
+                    )
+                )
+
+        occurrences.sort(key=lambda occurrence: occurrence.start_datetime)
+        return occurrences
+
+    def is_occurrence_date(self, schedule, occurrence_date: date) -> bool:
+        """指定した日が繰り返しスケジュールの回の本来の開始日かどうか"""
+        day_start = datetime.combine(occurrence_date, datetime.min.time())
+        return any(
+            True
+            for _ in occurrence_starts(
+                schedule.start_datetime,
+                schedule.recurrence_type,
+                schedule.recurrence_end,
+                day_start,
+                day_start + timedelta(days=1),
+            )
+        )
+
+    def get_occurrence(self, schedule, occurrence_date: date):
+        """
+        繰り返しスケジュールの指定した回を取得
+
+        Returns:
+            ScheduleOccurrence: 指定した回（回でない日・取り消した回の場合はNone）
+        """
+        if not schedule.is_recurring or not self.is_occurrence_date(
+            schedule, occurrence_date
+        ):
+            return None
+        exception = ScheduleException.query.filter_by(
+            schedule_id=schedule.id, occurrence_date=occurrence_date
+        ).first()
+        if exception is not None and exception.cancelled:
+            return None
+        start = datetime.combine(occurrence_date, schedule.start_datetime.time())
+        return self._make_occurrence(schedule, occurrence_date, start, exception)
+
+    def set_exception(self, schedule, occurrence_date: date, **values):
+        """
+        繰り返しスケジュールの指定した回の例外を作成・更新（コミットは呼び出し側で行う）
+
+        Args:
+            schedule (Schedule): 繰り返しスケジュール
+            occurrence_date (date): 本来の開始日
+            **values: cancelled, start_datetime, end_datetime, status
+
+        Returns:
+            ScheduleException: 作成・更新した例外
+
+        Raises:
+            ValueError: 指定した日が繰り返しの回でない場合
+        """
+        if not schedule.is_recurring or not self.is_occurrence_date(
+            schedule, occurrence_date
+        ):
+            raise ValueError("指定した日は繰り返しスケジュールの予定日ではありません")
+
+        exception = ScheduleException.query.filter_by(
+            schedule_id=schedule.id, occurrence_date=occurrence_date
+        ).first()
+        if exception is None:
+            exception = ScheduleException(
+                schedule_id=schedule.id, occurrence_date=occurrence_date
+            )
+            db.session.add(exception)
+        for name, value in values.items():
+            setattr(exception, name, value)
+        return exception
+
+    def occurrences_in_range(
+        self, start_dt: datetime, end_dt: datetime, status: str = "all", options=()
+    ):
+        """
+        期間内の繰り返しスケジュールの回を取得（開始日時順）
+
+        Args:
+            start_dt (datetime): 期間の開始日時（この日時を含む）
+            end_dt (datetime): 期間の終了日時（この日時を含まない）
+            status (str): この回のステータスの絞り込み（allの場合はすべて）
+            options (tuple): 元のスケジュールの読み込みオプション
+
+        Returns:
+            list: ScheduleOccurrenceのリスト
+        """
+        masters = (
+            Schedule.query.options(*options)
+            .filter(*self.recurring_filters(start_dt, end_dt))
+            .all()
+        )
+        exceptions = self.load_exceptions([schedule.id for schedule in masters])
+
+        occurrences = []
+        for schedule in masters:
+            occurrences.extend(
+                occurrence
+                for occurrence in self.expand(
+                    schedule, start_dt, end_dt, exceptions.get(schedule.id)
+                )
+                if status == "all" or occurrence.status == status
+            )
+        occurrences.sort(key=lambda occurrence: occurrence.start_datetime)
+        return occurrences
+
+    def schedules_in_range(
+        self, start_dt: datetime, end_dt: datetime, status: str = "all", options=()
+    ):
+        """
+        期間内のスケジュール（繰り返しの回を含む）を取得（開始日時順）
+
+        Returns:
+            list: ScheduleとScheduleOccurrenceのリスト
+        """
+        query = Schedule.query.options(*options).filter(
+            Schedule.start_datetime >= start_dt,
+            Schedule.start_datetime < end_dt,
+            self.single_filter(),
+        )
+        if status != "all":
+            query = query.filter(Schedule.status == status)
+
+        schedules = query.all() + self.occurrences_in_range(
+            start_dt, end_dt, status, options
+        )
+        schedules.sort(key=lambda schedule: schedule.start_datetime)
+        return schedules
+
+
+# サービスインスタンス
+recurrence_service = RecurrenceService()
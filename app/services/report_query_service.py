@@ -0,0 +1,278 @@
+"""
+報告書一覧クエリサービス
+
+一覧画面で表示する報告書を、物件・顧客・作業日・件数とあわせて
+ページの件数に関係なく一定回数のクエリで読み込む。
+受注明細の件数・台数・金額はGROUP BYの集計クエリで計算する
+"""
+
+import logging
+from collections import defaultdict
+
+from sqlalchemy import or_
+from sqlalchemy.orm import contains_eager
+
+from app import db
+from app.models.report import Report
+from app.models.property import Property
+from app.models.customer import Customer
+from app.models.work_time import WorkTime
+from app.models.work_detail import WorkDetail
+from app.models.photo import Photo
+from app.models.air_conditioner import AirConditioner
+
+
+def status_search_conditions(search: str):
+    """日本語のステータス名で検索するための条件を作成"""
+    conditions = []
+    search_lower = search.lower()
+    if "未完了" in search_lower:
+        conditions.append(Report.status == "pending")
+    if "完了" in search_lower and "未完了" not in search_lower:
+        conditions.append(Report.status == "completed")
+    if "下書き" in search_lower:
+        conditions.append(Report.status == "draft")
+    if "キャンセル" in search_lower:
+        conditions.append(Report.status == "cancelled")
+    return conditions
+
+
+class ReportQueryService:
+    """報告書一覧クエリサービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def build_list_query(
+        self, status=None, search="", sort_by="created_at", order="desc"
+    ):
+        """
+        報告書一覧のクエリを作成
+
+        物件・顧客は一覧のJOINからそのまま読み込むため、表示時に追加のクエリは発生しない
+
+        Args:
+            status (str): ステータスフィルタ
+            search (str): 検索文字列（顧客名、物件名、作業住所、備考、報告日、作業日、ステータス）
+            sort_by (str): ソート項目
+            order (str): ソート順（asc/desc）
+
+        Returns:
+            Query: 報告書のクエリ
+        """
+        # WorkTimeテーブルには複数の外部キーがあるため、明示的にJOIN条件を指定
+        query = (
+            Report.query.join(Report.property)
+            .join(Property.customer)
+            .outerjoin(WorkTime, Report.id == WorkTime.report_id)
+            .options(contains_eager(Report.property).contains_eager(Property.customer))
+        )
+
+        if status:
+            query = query.filter(Report.status == status)
+
+        if search:
+            search_conditions = [
+                Customer.name.contains(search),
+                Property.name.contains(search),
+                Report.work_address.contains(search),
+                Report.note.contains(search),
+                # 報告日での検索（YYYY-MM-DD形式）
+                Report.date.cast(db.String).contains(search),
+                # 作業日での検索（YYYY-MM-DD形式）
+                WorkTime.work_date.cast(db.String).contains(search),
+                # ステータスでの検索（英語コード）
+                Report.status.contains(search),
+            ]
+            search_conditions.extend(status_search_conditions(search))
+            query = query.filter(or_(*search_conditions))
+
+        # 重複を除去（WorkTimeとのJOINで重複が発生する可能性があるため）
+        query = query.distinct()
+
+        sort_columns = {
+            "id": Report.id,
+            "date": Report.date,
+            # 作業日でのソート（最初の作業日を基準）
+            "work_date": WorkTime.work_date,
+            "customer": Customer.name,
+            "property": Property.name,
+            "status": Report.status,
+            "updated_at": Report.updated_at,
+        }
+        sort_column = sort_columns.get(sort_by, Report.created_at)
+
+        if order == "asc":
+            return query.order_by(sort_column.asc())
+        return query.order_by(sort_column.desc())
+
+    def load_work_times(self, report_ids):
+        """
+        複数の報告書の作業時間を1回のクエリで取得
+
+        Returns:
+            dict: 報告書ID -> 作業時間のリスト（作業日順）
+        """
+        work_times_by_report = defaultdict(list)
+        if not report_ids:
+            return work_times_by_report
+
+        work_times = (
+            WorkTime.query.filter(WorkTime.report_id.in_(report_ids))
+            .order_by(WorkTime.report_id, WorkTime.work_date.asc(), WorkTime.id)
+            .all()
+        )
+        for work_time in work_times:
+            work_times_by_report[work_time.report_id].append(work_time)
+        return work_times_by_report
+
+    def count_by_report(self, model, report_ids):
+        """
+        報告書ごとの件数を1回のGROUP BYクエリで取得
+
+        Returns:
+            dict: 報告書ID -> 件数
+        """
+        if not report_ids:
+            return {}
+        rows = (
+            db.session.query(model.report_id, db.func.count(model.id))
+            .filter(model.report_id.in_(report_ids))
+            .group_by(model.report_id)
+        )
+        return dict(rows)
+
+    def attach_list_data(self, reports):
+        """
+        一覧表示用の作業日・作業内容数・写真数を報告書に設定
+
+        報告書の件数に関係なく3回のクエリで取得する
+
+        Args:
+            reports (list): 報告書のリスト
+        """
+        report_ids = [report.id for report in reports]
+        work_times_by_report = self.load_work_times(report_ids)
+        work_detail_counts = self.count_by_report(WorkDetail, report_ids)
+        photo_counts = self.count_by_report(Photo, report_ids)
+
+        for report in reports:
+            work_times = work_times_by_report.get(report.id, [])
+            report.work_times_data = work_times
+            report.work_dates = [wt.work_date for wt in work_times]
+            report.work_detail_count = work_detail_counts.get(report.id, 0)
+            report.photo_count = photo_counts.get(report.id, 0)
+
+    def sum_air_conditioners_by_report(self, report_ids):
+        """
+        報告書ごとのエアコン台数・金額の合計を1回のGROUP BYクエリで取得
+
+        Returns:
+            dict: 報告書ID -> (台数の合計, 金額の合計)
+        """
+        if not report_ids:
+            return {}
+        rows = (
+            db.session.query(
+                WorkDetail.report_id,
+                db.func.coalesce(db.func.sum(AirConditioner.quantity), 0),
+                db.func.coalesce(db.func.sum(AirConditioner.total_amount), 0),
+            )
+            .join(AirConditioner, AirConditioner.id == WorkDetail.air_conditioner_id)
+            .filter(WorkDetail.report_id.in_(report_ids))
+            .group_by(WorkDetail.report_id)
+        )
+        return {report_id: (ac_count, amount) for report_id, ac_count, amount in rows}
+
+    def load_order_details(self, reports):
+        """
+        受注明細一覧の各行のデータを作成
+
+        報告書の件数に関係なく3回のクエリで取得する
+
+        Args:
+            reports (list): 報告書のリスト
+
+        Returns:
+            list: 受注明細の行（辞書）のリスト
+        """
+        report_ids = [report.id for report in reports]
+        work_times_by_report = self.load_work_times(report_ids)
+        work_detail_counts = self.count_by_report(WorkDetail, report_ids)
+        ac_totals = self.sum_air_conditioners_by_report(report_ids)
+
+        order_details = []
+        for report in reports:
+            ac_count, total_amount = ac_totals.get(report.id, (0, 0))
+            order_details.append(
+                {
+                    "report": report,
+                    "property": report.property,
+                    "customer": report.property.customer,
+                    "work_detail_count": work_detail_counts.get(report.id, 0),
+                    "ac_count": ac_count,
+                    "total_amount": total_amount,
+                    "work_dates": [
+                        wt.work_date for wt in work_times_by_report.get(report.id, [])
+                    ],
+                }
+            )
+        return order_details
+
+    def compute_order_totals(self, query):
+        """
+        受注明細の総合計をデータベースで集計
+
+        報告書を読み込まずに、条件に一致する報告書IDのサブクエリに対して
+        1回のクエリで件数・台数・作業内容数・金額・物件数を計算する
+
+        Args:
+            query (Query): 受注明細の条件を適用した報告書クエリ（ソートなし）
+
+        Returns:
+            dict: 総合計
+        """
+        report_ids = query.with_entities(Report.id).subquery()
+        report_id_select = db.select(report_ids.c.id)
+
+        report_stats = db.select(
+            db.func.count(Report.id), db.func.count(db.distinct(Report.property_id))
+        ).where(Report.id.in_(report_id_select))
+        work_detail_stats = db.select(db.func.count(WorkDetail.id)).where(
+            WorkDetail.report_id.in_(report_id_select)
+        )
+        ac_stats = (
+            db.select(
+                db.func.coalesce(db.func.sum(AirConditioner.quantity), 0),
+                db.func.coalesce(db.func.sum(AirConditioner.total_amount), 0),
+            )
+            .select_from(WorkDetail)
+            .join(AirConditioner, AirConditioner.id == WorkDetail.air_conditioner_id)
+            .where(WorkDetail.report_id.in_(report_id_select))
+        )
+
+        report_stats = report_stats.subquery()
+        ac_stats = ac_stats.subquery()
+        # それぞれ1行の集計結果を1行にまとめる
+        row = db.session.execute(
+            db.select(
+                *report_stats.c,
+                work_detail_stats.scalar_subquery(),
+                *ac_stats.c,
+            )
+            .select_from(report_stats)
+            .join(ac_stats, db.true())
+        ).one()
+        total_reports, unique_properties, total_work_details, total_ac_count, total_amount = row
+
+        return {
+            "total_reports": total_reports,
+            "total_ac_count": total_ac_count,
+            "total_work_details": total_work_details,
+            "total_amount": total_amount,
+            "unique_properties": unique_properties,
+        }
+
+
+# サービスインスタンス
+report_query_service = ReportQueryService()
@@ -0,0 +1,243 @@
+"""
+カレンダー表示用イベントデータの作成サービス
+
+スケジュールと顧客名・物件名を1回の結合クエリで列の値として取得し（ORMオブジェクトを
+作成しない）、繰り返しスケジュールは期間内の回だけを展開して加える。
+JSONは高速なシリアライザでまとめて変換する。
+ETagは同じ条件の集計クエリ（件数・更新日時の最大値など）から求めるため、
+データに変更がなければイベントを読み込まずに304を返せる
+"""
+
+import json
+import hashlib
+import logging
+
+try:
+    import orjson
+except ImportError:
+    # orjsonがインストールされていない場合は標準のjsonを使用
+    orjson = None
+
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models.schedule import Schedule
+from app.models.customer import Customer
+from app.models.property import Property
+from app.models.schedule_exception import ScheduleException
+from app.services.recurrence_service import recurrence_service
+
+
+# ステータスに応じた色設定
+EVENT_COLORS = {
+    "pending": "#ffc107",  # 黄色（警告）
+    "completed": "#28a745",  # 緑色（成功）
+    "cancelled": "#6c757d",  # 灰色（無効）
+}
+DEFAULT_EVENT_COLOR = "#007bff"
+
+# イベントデータの形式を変更した場合に増やす（古いETagを無効にするため）
+EVENT_FORMAT_VERSION = 2
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _event(
+    schedule_id,
+    title,
+    start_datetime,
+    end_datetime,
+    all_day,
+    status,
+    priority,
+    description,
+    customer_name,
+    property_name,
+    occurrence_date=None,
+):
+    """カレンダーライブラリ形式のイベントの辞書を作成"""
+    color = EVENT_COLORS.get(status, DEFAULT_EVENT_COLOR)
+    extended_props = {
+        "status": status,
+        "priority": priority,
+        "description": description,
+        "customer_name": customer_name,
+        "property_name": property_name,
+    }
+    if occurrence_date is not None:
+        # 繰り返しスケジュールの回（idは元のスケジュールのID）
+        extended_props["occurrence_date"] = occurrence_date.isoformat()
+    return {
+        "id": schedule_id,
+        "title": title,
+        "start": start_datetime.isoformat(),
+        "end": end_datetime.isoformat(),
+        "allDay": all_day,
+        "backgroundColor": color,
+        "borderColor": color,
+        "extendedProps": extended_props,
+    }
+
+
+class ScheduleEventService:
+    """カレンダー表示用イベントデータの作成サービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def _filters(self, start_dt, end_dt, status):
+        # 期間フィルタ（開始日時・ステータスの複合インデックスを使用）
+        filters = [
+            Schedule.start_datetime >= start_dt,
+            Schedule.start_datetime < end_dt,
+            recurrence_service.single_filter(),
+        ]
+        if status != "all":
+            filters.append(Schedule.status == status)
+        return filters
+
+    def compute_etag(self, start_dt, end_dt, status: str = "all") -> str:
+        """
+        指定した期間・ステータスのイベントデータのETagを求める
+
+        スケジュールの件数・IDの合計・更新日時の最大値と、関連する顧客・物件の
+        更新日時の最大値を、繰り返しでないスケジュールと期間内に回がある繰り返し
+        スケジュールのそれぞれについて求め、繰り返しの例外の件数・更新日時の最大値と
+        合わせて1回のクエリで取得してハッシュ化する
+        （追加・削除・編集、顧客名・物件名の変更、例外の登録でETagが変わる）
+
+        Args:
+            start_dt (datetime): 開始日時（この日時を含む）
+            end_dt (datetime): 終了日時（この日時を含まない）
+            status (str): ステータスの絞り込み（allの場合はすべて）
+
+        Returns:
+            str: ETag（引用符なし）
+        """
+        singles = self._aggregate(self._filters(start_dt, end_dt, status))
+        recurring_filters = recurrence_service.recurring_filters(start_dt, end_dt)
+        masters = self._aggregate(recurring_filters)
+        exceptions = (
+            db.select(
+                db.func.count(ScheduleException.id),
+                db.func.max(ScheduleException.updated_at),
+            )
+            .where(
+                ScheduleException.schedule_id.in_(
+                    db.select(Schedule.id).where(*recurring_filters)
+                )
+            )
+            .subquery()
+        )
+        # それぞれ1行の集計結果を1行にまとめる
+        validator = db.session.execute(
+            db.select(singles, masters, exceptions)
+            .select_from(singles)
+            .join(masters, db.true())
+            .join(exceptions, db.true())
+        ).one()
+
+        source = "|".join(
+            str(value)
+            for value in (
+                EVENT_FORMAT_VERSION,
+                _isoformat(start_dt),
+                _isoformat(end_dt),
+                status,
+                *validator,
+            )
+        )
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def _aggregate(self, filters):
+        """条件に合うスケジュールの件数・IDの合計・更新日時の最大値を求めるサブクエリ"""
+        return (
+            db.select(
+                db.func.count(Schedule.id),
+                db.func.sum(Schedule.id),
+                db.func.max(Schedule.updated_at),
+                db.func.max(Customer.updated_at),
+                db.func.max(Property.updated_at),
+            )
+            .select_from(Schedule)
+            .outerjoin(Customer, Schedule.customer_id == Customer.id)
+            .outerjoin(Property, Schedule.property_id == Property.id)
+            .where(*filters)
+            .subquery()
+        )
+
+    def load_events(self, start_dt, end_dt, status: str = "all"):
+        """
+        指定した期間・ステータスのイベントデータを取得
+
+        Returns:
+            list: カレンダーライブラリ形式のイベントの辞書のリスト（開始日時順）
+        """
+        rows = db.session.execute(
+            db.select(
+                Schedule.id,
+                Schedule.title,
+                Schedule.start_datetime,
+                Schedule.end_datetime,
+                Schedule.all_day,
+                Schedule.status,
+                Schedule.priority,
+                Schedule.description,
+                Customer.name,
+                Property.name,
+            )
+            .outerjoin(Customer, Schedule.customer_id == Customer.id)
+            .outerjoin(Property, Schedule.property_id == Property.id)
+            .where(*self._filters(start_dt, end_dt, status))
+            .order_by(Schedule.start_datetime.asc(), Schedule.id.asc())
+        )
+
+        events = [_event(*row) for row in rows]
+
+        # 繰り返しスケジュールの期間内の回（元のスケジュールは顧客・物件と合わせて読み込む）
+        occurrences = recurrence_service.occurrences_in_range(
+            start_dt,
+            end_dt,
+            status,
+            options=(
+                joinedload(Schedule.customer),
+                joinedload(Schedule.schedule_property),
+            ),
+        )
+        if occurrences:
+            events.extend(
+                _event(
+                    occurrence.id,
+                    occurrence.title,
+                    occurrence.start_datetime,
+                    occurrence.end_datetime,
+                    occurrence.all_day,
+                    occurrence.status,
+                    occurrence.priority,
+                    occurrence.description,
+                    occurrence.customer.name if occurrence.customer else None,
+                    (
+                        occurrence.schedule_property.name
+                        if occurrence.schedule_property
+                        else None
+                    ),
+                    occurrence.occurrence_date,
+                )
+                for occurrence in occurrences
+            )
+            events.sort(key=lambda event: (event["start"], event["id"]))
+        return events
+
+    def serialize(self, events) -> bytes:
+        """イベントデータを空白なしのUTF-8のJSONに変換"""
+        if orjson is not None:
+            return orjson.dumps(events)
+        return json.dumps(events, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+
+# サービスインスタンス
+schedule_event_service = ScheduleEventService()
@@ -12,6 +12,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.executors.pool import ThreadPoolExecutor
 
 from app.services.email_service import email_service
+from app.services.outbox_service import outbox_service
 
 
 class SchedulerService:
@@ -19,8 +20,11 @@ class SchedulerService:
 
     def __init__(self):
         self.scheduler = None
+        # ジョブの実行に使うアプリケーション（create_appで作成済みのものを使い回す）
+        self.app = None
         self.logger = logging.getLogger(__name__)
         self.check_interval = int(os.getenv("NOTIFICATION_CHECK_INTERVAL", 60))  # 秒
+        self.outbox_interval = int(os.getenv("MAIL_OUTBOX_INTERVAL", 10))  # 秒
         self.enabled = os.getenv("NOTIFICATION_ENABLED", "True").lower() == "true"
 
     def init_scheduler(self):
@@ -58,6 +62,16 @@ class SchedulerService:
                 replace_existing=True,
             )
 
+            # 送信待ちメールの送信ジョブを追加（登録時にはすぐに実行させる）
+            self.scheduler.add_job(
+                func=self._send_outbox_job,
+                trigger=IntervalTrigger(seconds=self.outbox_interval),
+                id="outbox_sender",
+                name="送信待ちメールの送信",
+                replace_existing=True,
+            )
+            outbox_service.set_wakeup(self.wake_outbox_sender)
+
             self.logger.info(
                 f"スケジューラーを初期化しました（チェック間隔: {self.check_interval}秒）"
             )
@@ -66,8 +80,20 @@ class SchedulerService:
             self.logger.error(f"スケジューラー初期化エラー: {e}")
             self.scheduler = None
 
-    def start(self):
-        """スケジューラーを開始"""
+    def init_app(self, app):
+        """ジョブの実行に使うアプリケーションを設定"""
+        self.app = app
+
+    def start(self, app=None):
+        """
+        スケジューラーを開始
+
+        Args:
+            app: ジョブの実行に使うアプリケーション（create_appから渡す）
+        """
+        if app is not None:
+            self.init_app(app)
+
         if not self.enabled:
             self.logger.info("通知機能が無効のためスケジューラーを開始しません")
             return False
@@ -138,11 +164,16 @@ class SchedulerService:
 
     def _check_notifications_job(self):
         """通知チェックジョブ（バックグラウンド実行）"""
-        try:
-            # アプリケーションコンテキストが必要な場合の対応
-            from app import create_app
+        # 起動時に設定したアプリケーションのコンテキストで実行する
+        # （毎回create_appを呼ぶとデータベース接続やスケジューラーが作り直されるため）
+        app = self.app
+        if app is None:
+            self.logger.warning(
+                "アプリケーションが設定されていないため通知チェックをスキップ"
+            )
+            return
 
-            app = create_app()
+        try:
             with app.app_context():
                 # メール設定チェック
                 if not email_service.is_configured():
@@ -154,6 +185,9 @@ class SchedulerService:
                 sent_count = email_service.check_and_send_notifications()
                 end_time = datetime.now()
 
+                # 次のチェックまで使われないSMTP接続は閉じる
+                email_service.close_idle_connection()
+
                 processing_time = (end_time - start_time).total_seconds()
 
                 if sent_count > 0:
@@ -170,6 +204,29 @@ class SchedulerService:
         except Exception as e:
             self.logger.error(f"通知チェックジョブエラー: {e}")
 
+    def wake_outbox_sender(self):
+        """送信待ちメールの送信ジョブをすぐに実行させる"""
+        if not self.is_running():
+            return
+        self.scheduler.modify_job(
+            "outbox_sender", next_run_time=datetime.now(self.scheduler.timezone)
+        )
+
+    def _send_outbox_job(self):
+        """送信待ちメールの送信ジョブ（バックグラウンド実行）"""
+        app = self.app
+        if app is None:
+            return
+
+        try:
+            with app.app_context():
+                if not email_service.is_configured():
+                    return
+                email_service.send_outbox()
+
+        except Exception as e:
+            self.logger.error(f"送信待ちメールの送信ジョブエラー: {e}")
+
     def trigger_manual_check(self) -> dict:
         """手動で通知チェックを実行"""
         try:
@@ -0,0 +1,233 @@
+"""
+SMTP接続の管理サービス
+
+認証済みのSMTP接続を保持して複数のメール送信で使い回し、接続・STARTTLS・ログインを
+送信ごとに行わないようにする。一定時間使われなかった接続と、一定数のメールを送信した接続は
+閉じて新しく接続し、送信中に接続が切れていた場合は接続し直して1回だけ再送する
+"""
+
+import time
+import socket
+import smtplib
+import logging
+import threading
+from contextlib import contextmanager
+
+
+# 使われなかった接続を閉じるまでの時間（秒）
+DEFAULT_IDLE_TIMEOUT = 60
+
+# この時間（秒）以上使われなかった接続は送信前にNOOPで確認する
+KEEPALIVE_CHECK_INTERVAL = 10
+
+# 1つの接続で送信するメール数の上限（サーバー側の制限への備え）
+DEFAULT_MAX_MESSAGES_PER_CONNECTION = 100
+
+# 接続・応答待ちのタイムアウト（秒）
+DEFAULT_SOCKET_TIMEOUT = 30
+
+# 接続し直して再送する例外（サーバーによる切断・ネットワークエラー）
+# SMTPExceptionもOSErrorのサブクラスのため、OSError全体は対象にしない
+# （送信先の拒否などの恒久的なエラーで再送しないようにする）
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout)
+
+
+class SMTPConnectionManager:
+    """認証済みのSMTP接続を保持して使い回す接続管理（スレッドセーフ）"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        use_tls: bool = True,
+        username: str = None,
+        password: str = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_messages_per_connection: int = DEFAULT_MAX_MESSAGES_PER_CONNECTION,
+        timeout: float = DEFAULT_SOCKET_TIMEOUT,
+    ):
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.timeout = timeout
+
+        self.logger = logging.getLogger(__name__)
+        # バッチ送信中は同じスレッドから送信するためRLockを使用
+        self._lock = threading.RLock()
+        self._connection = None
+        self._last_used = 0.0
+        self._sent_on_connection = 0
+        self._batch_depth = 0
+
+        # 接続・送信の回数（状態確認・テスト用）
+        self.connect_count = 0
+        self.sent_count = 0
+
+    @property
+    def settings(self) -> tuple:
+        """接続先・認証情報（設定が変わったかどうかの判定用）"""
+        return (self.host, self.port, self.use_tls, self.username, self.password)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None
+
+    def _connect(self):
+        """SMTPサーバーに接続してSTARTTLS・ログインを行う"""
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.ehlo()
+            if self.use_tls:
+                connection.starttls()
+                connection.ehlo()
+            if self.username:
+                connection.login(self.username, self.password)
+        except Exception:
+            connection.close()
+            raise
+
+        self._connection = connection
+        self._sent_on_connection = 0
+        self._last_used = time.monotonic()
+        self.connect_count += 1
+        self.logger.debug(f"SMTP接続を開始しました: {self.host}:{self.port}")
+        return connection
+
+    def _close(self):
+        """保持している接続を閉じる（QUITに失敗しても接続は破棄する）"""
+        connection = self._connection
+        self._connection = None
+        self._sent_on_connection = 0
+        if connection is None:
+            return
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def _is_alive(self, connection) -> bool:
+        try:
+            return connection.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _get_connection(self):
+        """送信に使う接続を取得（必要に応じて閉じて接続し直す）"""
+        connection = self._connection
+        if connection is not None:
+            idle = time.monotonic() - self._last_used
+            if self._batch_depth == 0 and (
+                idle >= self.idle_timeout
+                or self._sent_on_connection >= self.max_messages_per_connection
+            ):
+                self._close()
+            elif idle >= KEEPALIVE_CHECK_INTERVAL and not self._is_alive(connection):
+                self.logger.info("SMTP接続が切断されていたため接続し直します")
+                self._close()
+
+        if self._connection is None:
+            return self._connect()
+        return self._connection
+
+    def send(self, message, from_addr: str = None, to_addrs=None):
+        """
+        メールを送信（接続が切れていた場合は接続し直して1回だけ再送）
+
+        Args:
+            message (Message): 送信するメール
+            from_addr (str): 送信元（省略時はメールのFrom）
+            to_addrs (list): 送信先（省略時はメールのTo・Cc・Bcc）
+
+        Returns:
+            dict: 受け付けられなかった送信先（smtplib.SMTP.send_messageの戻り値）
+
+        Raises:
+            smtplib.SMTPException: 送信に失敗した場合
+        """
+        with self._lock:
+            for attempt in range(2):
+                connection = self._get_connection()
+                try:
+                    refused = connection.send_message(message, from_addr, to_addrs)
+                except smtplib.SMTPResponseException as e:
+                    # 421はサーバーが接続を閉じる応答のため、次の送信では接続し直す
+                    if e.smtp_code == 421:
+                        self._close()
+                    raise
+                except RECONNECT_ERRORS as e:
+                    self._close()
+                    if attempt == 1:
+                        raise
+                    self.logger.info(f"SMTP接続エラーのため接続し直して再送します: {e}")
+                    continue
+
+                self._last_used = time.monotonic()
+                self._sent_on_connection += 1
+                self.sent_count += 1
+                return refused
+
+    def send_messages(self, messages) -> int:
+        """
+        複数のメールを1つの接続でまとめて送信
+
+        Args:
+            messages (list): 送信するメールのリスト
+
+        Returns:
+            int: 送信できたメール数（失敗したメールはログに記録して続行する）
+        """
+        sent = 0
+        with self.batch():
+            for message in messages:
+                try:
+                    self.send(message)
+                    sent += 1
+                except Exception as e:
+                    self.logger.error(f"メール送信エラー: {message['To']}: {e}")
+        return sent
+
+    @contextmanager
+    def batch(self):
+        """
+        まとめて送信する間、他のスレッドの送信を待たせて接続を使い続ける
+
+        バッチ中は1接続あたりの送信数の上限・アイドル時間で接続を閉じない
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+
+    def close_idle(self) -> bool:
+        """
+        アイドル時間を過ぎた接続を閉じる（定期的な通知チェックの後に呼び出す）
+
+        Returns:
+            bool: 接続を閉じた場合True
+        """
+        # 送信中の場合は待たずに次の機会に確認する
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if (
+                self._connection is not None
+                and self._batch_depth == 0
+                and time.monotonic() - self._last_used >= self.idle_timeout
+            ):
+                self._close()
+                self.logger.debug("アイドル時間を過ぎたSMTP接続を閉じました")
+                return True
+            return False
+        finally:
+            self._lock.release()
+
+    def close(self):
+        """保持している接続を閉じる"""
+        with self._lock:
+            self._close()
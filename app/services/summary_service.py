@@ -0,0 +1,194 @@
+"""
+受注月間表の集計サービス
+
+作業年月・受付種別・ステータスごとの件数・台数・金額を、集計種別ごとに1回の
+GROUP BYクエリで集計する（集計済みテーブルの作成に使用）。
+画面表示・PDF出力では集計済みテーブルを読み込み、月×受付種別の表の形に組み替える
+"""
+
+import logging
+
+from sqlalchemy import func, extract
+
+from app import db
+from app.models.report import Report
+from app.models.property import Property
+from app.models.work_time import WorkTime
+from app.models.work_detail import WorkDetail
+from app.models.air_conditioner import AirConditioner
+from app.models.monthly_rollup import MonthlyRollup
+
+
+# 集計種別（count: 件数, quantity: 台数, amount: 金額）
+SUMMARY_TYPES = ("count", "quantity", "amount")
+SUMMARY_TYPE_DISPLAY = {"count": "件数", "quantity": "台数", "amount": "金額"}
+
+# 完了状況の区分（未完了には下書きを含める）
+PENDING_STATUSES = ("pending", "draft")
+
+# 集計種別と集計済みテーブルのカラムの対応
+ROLLUP_FIELDS = {"count": "report_count", "quantity": "ac_quantity", "amount": "amount"}
+
+
+def empty_cell():
+    return {"completed": 0, "pending": 0, "total": 0}
+
+
+class SummaryService:
+    """受注月間表の集計サービス"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def get_reception_types(self):
+        """集計対象の受付種別の一覧を取得"""
+        rows = (
+            db.session.query(Property.reception_type)
+            .filter(Property.reception_type.isnot(None), Property.reception_type != "")
+            .distinct()
+            .order_by(Property.reception_type)
+        )
+        return [reception_type for (reception_type,) in rows]
+
+    def build_aggregate_query(self, summary_type: str, start_date=None, end_date=None):
+        """
+        作業年月・受付種別・ステータスごとの集計クエリを作成
+
+        WorkTimeを使って実際の作業月で集計する
+
+        Args:
+            summary_type (str): 集計種別（count/quantity/amount）
+            start_date (date): 集計開始日（この日を含む、Noneの場合は制限なし）
+            end_date (date): 集計終了日（この日を含まない、Noneの場合は制限なし）
+
+        Returns:
+            Query: (年, 月, 受付種別, ステータス, 集計値) の行を返すクエリ
+        """
+        year_column = extract("year", WorkTime.work_date).label("year")
+        month_column = extract("month", WorkTime.work_date).label("month")
+
+        if summary_type == "quantity":
+            # 台数ベースの集計
+            value = func.sum(AirConditioner.quantity)
+        elif summary_type == "amount":
+            # 金額ベースの集計
+            value = func.sum(AirConditioner.total_amount)
+        else:
+            # 件数ベースの集計
+            value = func.count(Report.id)
+
+        query = db.session.query(
+            year_column,
+            month_column,
+            Property.reception_type,
+            Report.status,
+            value.label("value"),
+        )
+        if summary_type in ("quantity", "amount"):
+            query = (
+                query.select_from(AirConditioner)
+                .join(WorkDetail, AirConditioner.id == WorkDetail.air_conditioner_id)
+                .join(Report, WorkDetail.report_id == Report.id)
+            )
+        else:
+            query = query.select_from(Report)
+
+        query = query.join(Property, Report.property_id == Property.id).join(
+            WorkTime, Report.id == WorkTime.report_id
+        )
+        # 作業日の範囲で絞り込む（作業日のインデックスを使えるようにする）
+        if start_date is not None:
+            query = query.filter(WorkTime.work_date >= start_date)
+        if end_date is not None:
+            query = query.filter(WorkTime.work_date < end_date)
+        if summary_type == "amount":
+            query = query.filter(AirConditioner.total_amount.isnot(None))
+
+        return query.group_by(
+            year_column, month_column, Property.reception_type, Report.status
+        )
+
+    def aggregate_rows(self, start_date=None, end_date=None):
+        """
+        作業年月・受付種別・ステータスごとの件数・台数・金額を集計
+
+        集計種別ごとに1回ずつ、計3回のGROUP BYクエリで取得する
+
+        Returns:
+            dict: (年, 月, 受付種別, ステータス) -> {"report_count", "ac_quantity", "amount"}
+        """
+        rows = {}
+        for summary_type, field in ROLLUP_FIELDS.items():
+            for year, month, reception_type, status, value in self.build_aggregate_query(
+                summary_type, start_date, end_date
+            ):
+                key = (int(year), int(month), reception_type or "", status or "")
+                values = rows.setdefault(
+                    key, {name: 0 for name in ROLLUP_FIELDS.values()}
+                )
+                values[field] = value or 0
+        return rows
+
+    def build_monthly_summary(self, year: int, summary_type: str = "count"):
+        """
+        受注月間表のデータを作成
+
+        Args:
+            year (int): 集計年
+            summary_type (str): 集計種別（count/quantity/amount）
+
+        Returns:
+            dict: monthly_data（月別の行）, reception_types, reception_type_totals, grand_totals
+        """
+        if summary_type not in SUMMARY_TYPES:
+            summary_type = "count"
+
+        reception_types = self.get_reception_types()
+
+        monthly_data = [
+            {
+                "month": month,
+                "month_name": f"{month}月",
+                "reception_types": {
+                    reception_type: empty_cell() for reception_type in reception_types
+                },
+                "totals": empty_cell(),
+            }
+            for month in range(1, 13)
+        ]
+        reception_type_totals = {
+            reception_type: empty_cell() for reception_type in reception_types
+        }
+        grand_totals = empty_cell()
+
+        # 集計済みデータ（作業月×受付種別×ステータス）を月×受付種別の表に組み替える
+        field = ROLLUP_FIELDS[summary_type]
+        rollups = MonthlyRollup.query.filter(
+            MonthlyRollup.year == year,
+            MonthlyRollup.status.in_(("completed",) + PENDING_STATUSES),
+        )
+        for rollup in rollups:
+            value = getattr(rollup, field)
+            if rollup.reception_type not in reception_type_totals or not value:
+                continue
+            status_group = "completed" if rollup.status == "completed" else "pending"
+            month_data = monthly_data[rollup.month - 1]
+            for cell in (
+                month_data["reception_types"][rollup.reception_type],
+                month_data["totals"],
+                reception_type_totals[rollup.reception_type],
+                grand_totals,
+            ):
+                cell[status_group] += value
+                cell["total"] += value
+
+        return {
+            "monthly_data": monthly_data,
+            "reception_types": reception_types,
+            "reception_type_totals": reception_type_totals,
+            "grand_totals": grand_totals,
+        }
+
+
+# サービスインスタンス
+summary_service = SummaryService()
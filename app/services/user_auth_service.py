@@ -0,0 +1,102 @@
+"""
+ログイン中のユーザーの取得と権限情報のキャッシュ
+
+認証デコレータの権限チェックは、ユーザーIDごとの権限・有効状態を短時間だけ
+プロセス内にキャッシュして行い、リクエストごとにユーザーを検索しない。
+ユーザーそのもの（g.user）は画面の描画などで必要になったときに、
+リクエスト中に1回だけ検索する
+"""
+
+import os
+import time
+import threading
+from collections import namedtuple
+
+from flask import g, session
+
+from app import db
+from app.models.user import User
+
+
+# 権限・有効状態をキャッシュする秒数の既定値
+DEFAULT_USER_AUTH_CACHE_TTL = 30
+
+# キャッシュするユーザーの権限・有効状態
+UserAuth = namedtuple("UserAuth", ["role", "active"])
+
+
+class UserAuthService:
+    """ログイン中のユーザーの取得と権限情報のキャッシュ"""
+
+    def __init__(self):
+        # 他のプロセスでの変更は、キャッシュの期限が切れるまで反映されない
+        self.ttl = float(os.getenv("USER_AUTH_CACHE_TTL", DEFAULT_USER_AUTH_CACHE_TTL))
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _store(self, user: User) -> UserAuth:
+        auth = UserAuth(user.role, bool(user.active))
+        with self._lock:
+            self._cache[user.id] = (auth, time.monotonic() + self.ttl)
+        return auth
+
+    def _cached(self, user_id) -> UserAuth:
+        with self._lock:
+            entry = self._cache.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def invalidate(self, user_id=None):
+        """
+        キャッシュを削除（ユーザーの権限・有効状態を変更したときに呼ぶ）
+
+        Args:
+            user_id: 削除するユーザーID（省略時はすべて）
+        """
+        with self._lock:
+            if user_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(user_id, None)
+
+    def start_request(self):
+        """リクエストの開始時に、前のリクエストで取得したユーザーを破棄"""
+        g.pop("_current_user", None)
+
+    def current_user(self):
+        """
+        ログイン中のユーザー（リクエスト中に1回だけ検索）
+
+        Returns:
+            User: ログイン中のユーザー（ログインしていない場合はNone）
+        """
+        if "_current_user" not in g:
+            user_id = session.get("user_id")
+            user = db.session.get(User, user_id) if user_id is not None else None
+            if user is not None:
+                self._store(user)
+            g._current_user = user
+        return g._current_user
+
+    def current_auth(self) -> UserAuth:
+        """
+        ログイン中のユーザーの権限・有効状態（キャッシュがあれば検索しない）
+
+        Returns:
+            UserAuth: 権限・有効状態（ログインしていない・ユーザーがいない場合はNone）
+        """
+        user_id = session.get("user_id")
+        if user_id is None:
+            return None
+
+        auth = self._cached(user_id)
+        if auth is None:
+            user = self.current_user()
+            if user is not None:
+                auth = self._store(user)
+        return auth
+
+
+# サービスインスタンス
+user_auth_service = UserAuthService()
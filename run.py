@@ -21,6 +21,20 @@ def init_db_command():
 app.cli.add_command(init_db_command)
 
 
+@click.command("rebuild-monthly-rollup")
+@click.option("--year", type=int, default=None, help="対象年（省略時はすべての年）")
+@with_appcontext
+def rebuild_monthly_rollup_command(year):
+    """受注月間表の集計済みテーブルを作り直します。"""
+    from app.services.monthly_rollup_service import monthly_rollup_service
+
+    row_count = monthly_rollup_service.rebuild(year)
+    click.echo(f"受注月間表の集計を作り直しました（{row_count}行）。")
+
+
+app.cli.add_command(rebuild_monthly_rollup_command)
+
+
 def create_db_backup(app, backup_type="startup"):
     """
     データベースのバックアップを作成する関数
@@ -0,0 +1,135 @@
+"""
+ログイン処理のベンチマーク
+
+一時データベースにユーザーを作成し、複数のスレッドから同時に /auth/login へ
+ログインした場合の1秒あたりのログイン数を、パスワードハッシュの方式ごとに計測する。
+ログインが集中している間の他の画面の応答時間も表示する。
+
+使用方法:
+    python scripts/benchmarks/benchmark_login.py [同時にログインする数] [方式 ...]
+
+    例: python scripts/benchmarks/benchmark_login.py 8 scrypt pbkdf2:sha256:600000
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import statistics
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app import create_app, db
+from app.models.user import User
+from app.services.login_throttle_service import login_throttle_service
+
+
+# 各スレッドがログインする回数
+LOGINS_PER_THREAD = 5
+
+# 計測するハッシュの方式の既定値
+DEFAULT_METHODS = ["scrypt", "pbkdf2:sha256:600000", "pbkdf2:sha256:100000"]
+
+
+def create_users(count, method):
+    """指定した方式のハッシュでユーザーを作成"""
+    os.environ["PASSWORD_HASH_METHOD"] = method
+    db.session.query(User).delete()
+    for number in range(count):
+        user = User(username=f"user{number}", email=f"user{number}@example.com")
+        user.set_password("benchmark")
+        db.session.add(user)
+    db.session.commit()
+
+
+def login_storm(app, threads):
+    """
+    複数のスレッドから同時にログインし、その間の他の画面の応答時間を計測
+
+    Returns:
+        tuple: (1秒あたりのログイン数, 他の画面の応答時間の中央値（秒）)
+    """
+    start = threading.Barrier(threads + 1)
+    done = threading.Event()
+
+    def login(number):
+        client = app.test_client()
+        start.wait()
+        for _ in range(LOGINS_PER_THREAD):
+            response = client.post(
+                "/auth/login",
+                data={"username": f"user{number}", "password": "benchmark"},
+            )
+            assert response.status_code == 302, response.status_code
+
+    workers = [
+        threading.Thread(target=login, args=(number,)) for number in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # ログイン中の他の画面の応答時間（軽い画面の例としてログイン画面の表示で計測する）
+    other_client = app.test_client()
+    other_timings = []
+
+    def other_requests():
+        while not done.is_set():
+            started = time.perf_counter()
+            other_client.get("/auth/login")
+            other_timings.append(time.perf_counter() - started)
+
+    other = threading.Thread(target=other_requests)
+    other.start()
+
+    started = time.perf_counter()
+    start.wait()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    other.join()
+
+    return (
+        threads * LOGINS_PER_THREAD / elapsed,
+        statistics.median(other_timings) if other_timings else 0,
+    )
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    methods = sys.argv[2:] or DEFAULT_METHODS
+    work_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(
+            {
+                "TESTING": True,
+                "SECRET_KEY": "benchmark",
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{work_dir}/benchmark.db",
+                "UPLOAD_FOLDER": os.path.join(work_dir, "uploads"),
+            }
+        )
+        with app.app_context():
+            db.create_all()
+        # 計測中のログインを混雑として断らないよう、検証の順番を待つ時間を長くする
+        login_throttle_service.verification_wait = 600
+
+        print(
+            f"同時ログイン {threads} 件・同時に検証する数の上限 "
+            f"{login_throttle_service.max_concurrent_verifications}"
+        )
+        for method in methods:
+            with app.app_context():
+                create_users(threads, method)
+            per_second, other_median = login_storm(app, threads)
+            print(
+                f"{method}: {per_second:.1f} ログイン/秒、"
+                f"ログイン中の他の画面 中央値 {other_median * 1000:.1f}ms"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
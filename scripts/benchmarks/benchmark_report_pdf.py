@@ -0,0 +1,158 @@
+"""
+報告書PDF生成のベンチマーク
+
+一時データベースに写真付きの報告書を作成し、PDF生成の処理時間と
+ピークメモリ使用量を計測する。比較のため、以前の実装で行っていた
+PyPDF2による再読み込み・結合処理を追加した場合の値も表示する。
+
+使用方法:
+    python scripts/benchmarks/benchmark_report_pdf.py [写真ペア数]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+from io import BytesIO
+from datetime import date, time as dt_time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from PIL import Image as PILImage
+from PyPDF2 import PdfReader, PdfWriter
+
+from app import create_app, db
+from app.models.customer import Customer
+from app.models.property import Property
+from app.models.report import Report
+from app.models.photo import Photo
+from app.models.work_time import WorkTime
+from app.models.work_detail import WorkDetail
+from app.services.pdf_service import PDFService
+
+
+def create_sample_report(upload_folder, pair_count):
+    """写真付きのサンプル報告書を作成"""
+    customer = Customer(name="ベンチマーク顧客")
+    db.session.add(customer)
+    db.session.flush()
+    property_obj = Property(
+        name="ベンチマーク物件", customer_id=customer.id, reception_type="個人"
+    )
+    db.session.add(property_obj)
+    db.session.flush()
+    report = Report(date=date(2025, 6, 1), property_id=property_obj.id)
+    db.session.add(report)
+    db.session.flush()
+
+    db.session.add(
+        WorkTime(
+            report_id=report.id,
+            property_id=property_obj.id,
+            work_date=date(2025, 6, 1),
+            start_time=dt_time(9, 0),
+            end_time=dt_time(17, 0),
+        )
+    )
+    db.session.add(
+        WorkDetail(
+            report_id=report.id,
+            property_id=property_obj.id,
+            work_item_text="分解洗浄",
+            description="ベンチマーク用作業",
+        )
+    )
+
+    # スマートフォン写真相当のサイズ（4032x3024）・圧縮しにくいノイズ画像で作成
+    noise = PILImage.merge(
+        "RGB", [PILImage.effect_noise((1008, 756), 64) for _ in range(3)]
+    ).resize((4032, 3024))
+    for photo_type in ("before", "after"):
+        os.makedirs(os.path.join(upload_folder, photo_type), exist_ok=True)
+    for i in range(pair_count):
+        for photo_type in ("before", "after"):
+            relative_path = os.path.join(photo_type, f"{i}.jpg")
+            # ReportLabは同一画像をまとめるため、写真ごとに内容を変える
+            photo = noise.rotate(i * 3 + (180 if photo_type == "after" else 0))
+            photo.save(os.path.join(upload_folder, relative_path), quality=90)
+            db.session.add(
+                Photo(
+                    report_id=report.id,
+                    photo_type=photo_type,
+                    filename=f"{i}.jpg",
+                    filepath=relative_path,
+                    caption=f"写真{i + 1}",
+                )
+            )
+    db.session.commit()
+    return report
+
+
+def merge_like_legacy(pdf_file):
+    """以前の実装と同じPyPDF2による再読み込み・再書き出しを行う"""
+    pdf_writer = PdfWriter()
+    for page in PdfReader(BytesIO(pdf_file.read())).pages:
+        pdf_writer.add_page(page)
+    merged = BytesIO()
+    pdf_writer.write(merged)
+    return merged
+
+
+def measure(label, func):
+    """処理時間とピークメモリを計測して表示"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label}: {elapsed:.2f}秒, ピークメモリ {peak / 1024 / 1024:.1f}MB")
+    return result
+
+
+def main():
+    pair_count = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    work_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{work_dir}/benchmark.db",
+                "UPLOAD_FOLDER": os.path.join(work_dir, "uploads"),
+            }
+        )
+        with app.app_context():
+            db.create_all()
+            report = create_sample_report(app.config["UPLOAD_FOLDER"], pair_count)
+            work_times = WorkTime.query.filter_by(report_id=report.id).all()
+            work_details = WorkDetail.query.filter_by(report_id=report.id).all()
+            photo_pairs = list(
+                zip(
+                    Photo.query.filter_by(report_id=report.id, photo_type="before"),
+                    Photo.query.filter_by(report_id=report.id, photo_type="after"),
+                )
+            )
+
+            print(f"写真 {pair_count * 2} 枚の報告書PDFを生成します")
+
+            def generate():
+                return PDFService.generate_report_pdf(
+                    report, work_times, work_details, photo_pairs
+                )
+
+            # 1回目は派生画像キャッシュの作成を含む
+            measure("初回生成（キャッシュ作成含む）", generate)
+            pdf_file = measure("単一ドキュメント生成", generate)
+            measure(
+                "単一ドキュメント生成 + 旧実装の結合処理",
+                lambda: merge_like_legacy(generate()),
+            )
+            print(f"PDFサイズ: {len(pdf_file.read()) / 1024:.0f}KB")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+カレンダー用イベントAPIのベンチマーク
+
+一時データベースに大量のスケジュールを作成し、/schedules/api/events で
+1か月分のイベントを取得する処理時間を計測する。ETagによる再取得（304）と、比較のため
+インデックスを削除した場合・以前の実装のように全件を読み込んだ場合の値も表示する。
+
+使用方法:
+    python scripts/benchmarks/benchmark_schedule_events.py [スケジュール件数]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app import create_app, db
+from app.models.user import User
+from app.models.schedule import Schedule
+
+
+# 計測する月（作成するスケジュールの期間の中ほど）
+TARGET_MONTHS = [(2024, 3), (2024, 9), (2025, 2)]
+
+# 各計測の繰り返し回数
+REPEAT = 20
+
+
+def create_schedules(count):
+    """2022年〜2025年に分散したスケジュールを一括で作成"""
+    random.seed(0)
+    base = datetime(2022, 1, 1, 8)
+    statuses = ["pending", "completed", "cancelled"]
+    rows = []
+    for i in range(count):
+        start = base + timedelta(
+            days=random.randrange(365 * 4), hours=random.randrange(10)
+        )
+        rows.append(
+            {
+                "title": f"点検{i}",
+                "start_datetime": start,
+                "end_datetime": start + timedelta(hours=2),
+                "all_day": False,
+                "status": random.choice(statuses),
+                "priority": "normal",
+            }
+        )
+    db.session.execute(Schedule.__table__.insert(), rows)
+    db.session.commit()
+
+
+def measure(label, func):
+    """処理時間の中央値を計測して表示"""
+    func()  # 初回はキャッシュの影響を除くため計測しない
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    print(f"{label}: 中央値 {statistics.median(timings) * 1000:.1f}ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    work_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(
+            {
+                "TESTING": True,
+                "SECRET_KEY": "benchmark",
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{work_dir}/benchmark.db",
+                "UPLOAD_FOLDER": os.path.join(work_dir, "uploads"),
+            }
+        )
+        client = app.test_client()
+        with app.app_context():
+            db.create_all()
+            user = User(
+                username="admin", email="admin@example.com", name="管理者", role="admin"
+            )
+            user.set_password("benchmark")
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+
+            print(f"スケジュール {count} 件を作成します")
+            create_schedules(count)
+            db.session.execute(db.text("ANALYZE"))
+
+        with client.session_transaction() as session:
+            session["user_id"] = user_id
+
+        etags = {}
+
+        def fetch_months(status="all", revalidate=False):
+            for year, month in TARGET_MONTHS:
+                headers = {}
+                if revalidate:
+                    headers["If-None-Match"] = etags[(year, month, status)]
+                response = client.get(
+                    "/schedules/api/events",
+                    query_string={
+                        "start": f"{year}-{month:02d}-01",
+                        "end": f"{year}-{month:02d}-31",
+                        "status": status,
+                    },
+                    headers=headers,
+                )
+                assert response.status_code == (304 if revalidate else 200)
+                etags[(year, month, status)] = response.headers["ETag"]
+
+        def fetch_all_like_legacy():
+            # 以前の実装で期間指定がない場合に行っていた全件の読み込み
+            with app.app_context():
+                schedules = Schedule.query.all()
+                [schedule.start_datetime.isoformat() for schedule in schedules]
+
+        per_request = len(TARGET_MONTHS)
+        measure(f"1か月分×{per_request}回（インデックスあり）", fetch_months)
+        measure(
+            f"1か月分×{per_request}回・未完了のみ（インデックスあり）",
+            lambda: fetch_months("pending"),
+        )
+        measure(
+            f"1か月分×{per_request}回・ETagで再取得（304）",
+            lambda: fetch_months(revalidate=True),
+        )
+
+        with app.app_context():
+            for index in Schedule.__table__.indexes:
+                index.drop(bind=db.engine)
+        measure(f"1か月分×{per_request}回（インデックスなし）", fetch_months)
+        measure("全件の読み込み（以前の期間指定なしの場合）", fetch_all_like_legacy)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from app import create_app, db
+from app.models.schedule import Schedule
+from app.models.notification_log import NotificationLog
+from app.services.notification_queue_service import notification_queue_service
+from sqlalchemy import inspect
+
+# アプリケーションコンテキストを作成
+app = create_app()
+app_context = app.app_context()
+app_context.push()
+
+print("スケジュール通知の送信待ちキューを作成します...")
+
+try:
+    # schedulesテーブルにnext_notification_atカラムを追加（既に存在する場合は何もしない）
+    columns = [column["name"] for column in inspect(db.engine).get_columns("schedules")]
+    if "next_notification_at" in columns:
+        print("next_notification_atカラムは既に存在しています")
+    else:
+        with db.engine.begin() as conn:
+            conn.execute(
+                db.text("ALTER TABLE schedules ADD COLUMN next_notification_at DATETIME")
+            )
+        print("next_notification_atカラムを追加しました")
+
+    # インデックスの作成（既に存在する場合は何もしない）
+    for index in Schedule.__table__.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+    print("schedulesテーブルのインデックスを確認しました")
+
+    # notification_logsテーブルの作成（既に存在する場合は何もしない）
+    db.metadata.create_all(bind=db.engine, tables=[NotificationLog.__table__])
+    print("notification_logsテーブルを作成しました")
+
+    # 既存のスケジュールの次の通知日時を設定
+    count = notification_queue_service.rebuild()
+    print(f"通知予定のあるスケジュール: {count}件")
+
+    print("\nスケジュール通知の送信待ちキューの作成が完了しました")
+
+except Exception as e:
+    print(f"エラー: {e}")
+
+app_context.pop()
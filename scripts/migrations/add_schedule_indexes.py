@@ -0,0 +1,47 @@
+from app import create_app, db
+from app.models.schedule import Schedule
+import sqlite3
+
+# アプリケーションコンテキストを作成
+app = create_app()
+app_context = app.app_context()
+app_context.push()
+
+print("schedulesテーブルにインデックスを追加します...")
+
+# このマイグレーションで追加するインデックス
+# （後のマイグレーションで追加するカラムのインデックスは、そのスクリプトで作成する）
+INDEX_NAMES = [
+    "ix_schedules_start_datetime_status",
+    "ix_schedules_report_id",
+    "ix_schedules_recurring",
+]
+
+try:
+    # モデルに定義したインデックスを作成（既に存在する場合は何もしない）
+    indexes = {index.name: index for index in Schedule.__table__.indexes}
+    for name in INDEX_NAMES:
+        indexes[name].create(bind=db.engine, checkfirst=True)
+        print(f"インデックス {name} を作成しました")
+
+    # インデックスの確認
+    db_path = "./instance/aircon_report.db"
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    print("\n=== schedulesテーブルのインデックス ===")
+    cursor.execute("PRAGMA index_list(schedules);")
+    for index in cursor.fetchall():
+        cursor.execute(f"PRAGMA index_info({index[1]});")
+        columns = [col[2] for col in cursor.fetchall()]
+        print(f"{index[1]}: {', '.join(columns)}")
+
+    # 統計情報を更新してクエリプランナーがインデックスを使えるようにする
+    conn.execute("ANALYZE schedules;")
+    conn.close()
+    print("\nインデックスの追加が完了しました")
+
+except Exception as e:
+    print(f"エラー: {e}")
+
+app_context.pop()
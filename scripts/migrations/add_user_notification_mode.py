@@ -0,0 +1,36 @@
+from app import create_app, db
+from app.models.notification_digest import NotificationDigest
+from sqlalchemy import inspect
+
+# アプリケーションコンテキストを作成
+app = create_app()
+app_context = app.app_context()
+app_context.push()
+
+print("ユーザーごとの通知の受け取り方を追加します...")
+
+try:
+    # usersテーブルにnotification_modeカラムを追加（既に存在する場合は何もしない）
+    columns = [column["name"] for column in inspect(db.engine).get_columns("users")]
+    if "notification_mode" in columns:
+        print("notification_modeカラムは既に存在しています")
+    else:
+        with db.engine.begin() as conn:
+            conn.execute(
+                db.text(
+                    "ALTER TABLE users ADD COLUMN notification_mode VARCHAR(20) "
+                    "NOT NULL DEFAULT 'immediate'"
+                )
+            )
+        print("notification_modeカラムを追加しました")
+
+    # notification_digestsテーブルの作成（既に存在する場合は何もしない）
+    db.metadata.create_all(bind=db.engine, tables=[NotificationDigest.__table__])
+    print("notification_digestsテーブルを作成しました")
+
+    print("\nユーザーごとの通知の受け取り方の追加が完了しました")
+
+except Exception as e:
+    print(f"エラー: {e}")
+
+app_context.pop()
@@ -0,0 +1,39 @@
+from app import create_app, db
+from app.models.monthly_rollup import MonthlyRollup
+from app.services.monthly_rollup_service import monthly_rollup_service
+import sqlite3
+
+# アプリケーションコンテキストを作成
+app = create_app()
+app_context = app.app_context()
+app_context.push()
+
+print("monthly_rollupsテーブルを作成します...")
+
+try:
+    # monthly_rollupsテーブルの作成（既に存在する場合は何もしない）
+    db.metadata.create_all(bind=db.engine, tables=[MonthlyRollup.__table__])
+    print("monthly_rollupsテーブルを作成しました")
+
+    # 既存の報告書から集計済みデータを作成
+    row_count = monthly_rollup_service.rebuild()
+    print(f"既存データから集計済みデータを作成しました（{row_count}行）")
+
+    # テーブル構造の確認
+    db_path = "./instance/aircon_report.db"
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    print("\n=== monthly_rollupsテーブルの構造 ===")
+    cursor.execute("PRAGMA table_info(monthly_rollups);")
+    columns = cursor.fetchall()
+    for col in columns:
+        print(f"{col[0]}: {col[1]} ({col[2]}) {'PRIMARY KEY' if col[5] else ''}")
+
+    conn.close()
+    print("\nmonthly_rollupsテーブルの作成が完了しました")
+
+except Exception as e:
+    print(f"エラー: {e}")
+
+app_context.pop()
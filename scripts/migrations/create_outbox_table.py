@@ -0,0 +1,26 @@
+from app import create_app, db
+from app.models.outbox_message import OutboxMessage
+
+# アプリケーションコンテキストを作成
+app = create_app()
+app_context = app.app_context()
+app_context.push()
+
+print("outbox_messagesテーブルを作成します...")
+
+try:
+    # outbox_messagesテーブルの作成（既に存在する場合は何もしない）
+    db.metadata.create_all(bind=db.engine, tables=[OutboxMessage.__table__])
+    print("outbox_messagesテーブルを作成しました")
+
+    # インデックスの作成（既に存在する場合は何もしない）
+    for index in OutboxMessage.__table__.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+    print("outbox_messagesテーブルのインデックスを確認しました")
+
+    print("\noutbox_messagesテーブルの作成が完了しました")
+
+except Exception as e:
+    print(f"エラー: {e}")
+
+app_context.pop()
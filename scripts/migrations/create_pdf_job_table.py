@@ -0,0 +1,34 @@
+from app import create_app, db
+from app.models.pdf_job import PdfJob
+import sqlite3
+
+# アプリケーションコンテキストを作成
+app = create_app()
+app_context = app.app_context()
+app_context.push()
+
+print("pdf_jobsテーブルを作成します...")
+
+try:
+    # pdf_jobsテーブルの作成（既に存在する場合は何もしない）
+    db.metadata.create_all(bind=db.engine, tables=[PdfJob.__table__])
+    print("pdf_jobsテーブルを作成しました")
+
+    # テーブル構造の確認
+    db_path = "./instance/aircon_report.db"
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    print("\n=== pdf_jobsテーブルの構造 ===")
+    cursor.execute("PRAGMA table_info(pdf_jobs);")
+    columns = cursor.fetchall()
+    for col in columns:
+        print(f"{col[0]}: {col[1]} ({col[2]}) {'PRIMARY KEY' if col[5] else ''}")
+
+    conn.close()
+    print("\npdf_jobsテーブルの作成が完了しました")
+
+except Exception as e:
+    print(f"エラー: {e}")
+
+app_context.pop()
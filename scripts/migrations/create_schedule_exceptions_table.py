@@ -0,0 +1,42 @@
+from app import create_app, db
+from app.models.schedule import Schedule
+from app.models.schedule_exception import ScheduleException
+import sqlite3
+
+# アプリケーションコンテキストを作成
+app = create_app()
+app_context = app.app_context()
+app_context.push()
+
+print("schedule_exceptionsテーブルを作成します...")
+
+try:
+    # schedule_exceptionsテーブルの作成（既に存在する場合は何もしない）
+    db.metadata.create_all(bind=db.engine, tables=[ScheduleException.__table__])
+    print("schedule_exceptionsテーブルを作成しました")
+
+    # 繰り返しスケジュール検索用のインデックスを作成（既に存在する場合は何もしない）
+    # （後のマイグレーションで追加するカラムのインデックスは、そのスクリプトで作成する）
+    for index in Schedule.__table__.indexes:
+        if index.name == "ix_schedules_recurring":
+            index.create(bind=db.engine, checkfirst=True)
+    print("schedulesテーブルのインデックスを確認しました")
+
+    # テーブル構造の確認
+    db_path = "./instance/aircon_report.db"
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    print("\n=== schedule_exceptionsテーブルの構造 ===")
+    cursor.execute("PRAGMA table_info(schedule_exceptions);")
+    columns = cursor.fetchall()
+    for col in columns:
+        print(f"{col[0]}: {col[1]} ({col[2]}) {'PRIMARY KEY' if col[5] else ''}")
+
+    conn.close()
+    print("\nschedule_exceptionsテーブルの作成が完了しました")
+
+except Exception as e:
+    print(f"エラー: {e}")
+
+app_context.pop()
@@ -0,0 +1,109 @@
+import os
+from datetime import date, time
+
+import pytest
+from PIL import Image as PILImage
+
+from app import create_app, db
+from app.services.user_auth_service import user_auth_service
+
+
+@pytest.fixture
+def app(tmp_path):
+    """テスト用の一時データベース・アップロードフォルダを使うアプリケーション"""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+            "UPLOAD_FOLDER": str(tmp_path / "uploads"),
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    # テストごとにユーザーIDが同じになるため、権限情報のキャッシュを残さない
+    user_auth_service.invalidate()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(app, client):
+    """管理者としてログイン済みのテストクライアント"""
+    from app.models.user import User
+
+    user = User(username="admin", email="admin@example.com", name="管理者", role="admin")
+    user.set_password("password")
+    db.session.add(user)
+    db.session.commit()
+
+    with client.session_transaction() as session:
+        session["user_id"] = user.id
+    return client
+
+
+@pytest.fixture
+def create_report_with_photos(app):
+    """写真付きのテスト用報告書を作成する関数"""
+    from app.models.customer import Customer
+    from app.models.property import Property
+    from app.models.report import Report
+    from app.models.photo import Photo
+    from app.models.work_time import WorkTime
+    from app.models.work_detail import WorkDetail
+
+    def create(pair_count=2):
+        customer = Customer(name="テスト顧客")
+        db.session.add(customer)
+        db.session.flush()
+        property_obj = Property(
+            name="テスト物件", customer_id=customer.id, reception_type="個人"
+        )
+        db.session.add(property_obj)
+        db.session.flush()
+        report = Report(date=date(2025, 6, 1), property_id=property_obj.id)
+        db.session.add(report)
+        db.session.flush()
+
+        db.session.add(
+            WorkTime(
+                report_id=report.id,
+                property_id=property_obj.id,
+                work_date=date(2025, 6, 1),
+                start_time=time(9, 0),
+                end_time=time(12, 0),
+            )
+        )
+        db.session.add(
+            WorkDetail(
+                report_id=report.id,
+                property_id=property_obj.id,
+                work_item_text="分解洗浄",
+                description="テスト作業",
+            )
+        )
+
+        for i in range(pair_count):
+            for photo_type in ("before", "after"):
+                relative_path = os.path.join(photo_type, f"{report.id}_{i}.jpg")
+                PILImage.new("RGB", (1600, 1200), (i * 40 % 255, 120, 60)).save(
+                    os.path.join(app.config["UPLOAD_FOLDER"], relative_path)
+                )
+                db.session.add(
+                    Photo(
+                        report_id=report.id,
+                        photo_type=photo_type,
+                        filename=f"{report.id}_{i}.jpg",
+                        filepath=relative_path,
+                    )
+                )
+        db.session.commit()
+        return report
+
+    return create
@@ -0,0 +1,76 @@
+from datetime import date
+
+import pytest
+
+from app.services.analytics_service import analytics_service
+from tests.test_report_query_service import count_queries
+from tests.test_summary_service import create_order
+
+
+@pytest.fixture(autouse=True)
+def clear_analytics_cache():
+    analytics_service.clear_cache()
+    yield
+    analytics_service.clear_cache()
+
+
+def create_history():
+    create_order("個人", "completed", date(2023, 1, 10), quantity=1, total_amount=10000)
+    create_order("個人", "completed", date(2024, 1, 10), quantity=2, total_amount=20000)
+    create_order("個人", "completed", date(2024, 1, 20), quantity=1, total_amount=5000)
+    create_order("法人", "pending", date(2025, 2, 1), quantity=4, total_amount=40000)
+
+
+def test_trends_include_year_over_year(app):
+    """年ごとの月次系列と前年差・前年比が計算されること"""
+    create_history()
+
+    data = analytics_service.build_trends(2024, 2025)
+
+    assert data["years"] == [2024, 2025]
+    assert data["reception_types"] == ["個人", "法人"]
+    personal_2024 = data["metrics"]["count"]["個人"]["2024"]
+    assert personal_2024["monthly"][0] == 2
+    # 2023年（開始年の前年）を基準に前年比較する
+    assert personal_2024["yoy_delta"][0] == 1
+    assert personal_2024["yoy_rate"][0] == 100.0
+    amount_2025 = data["metrics"]["amount"]["合計"]["2025"]
+    assert amount_2025["total"] == 40000
+    assert amount_2025["yoy_total_delta"] == 40000 - 25000
+    assert data["metrics"]["quantity"]["法人"]["2024"]["yoy_rate"][1] is None
+
+    completed = analytics_service.build_trends(2025, 2025, status="completed")
+    assert completed["metrics"]["count"]["合計"]["2025"]["total"] == 0
+
+
+def test_trends_are_cached_until_rollup_changes(app):
+    """集計済みデータが変わるまでキャッシュした結果を返すこと"""
+    create_history()
+
+    first = analytics_service.get_trends(2024, 2025)
+    with count_queries() as statements:
+        assert analytics_service.get_trends(2024, 2025) is first
+    assert statements == []
+
+    create_order("個人", "completed", date(2025, 3, 1))
+    refreshed = analytics_service.get_trends(2024, 2025)
+    assert refreshed["metrics"]["count"]["個人"]["2025"]["monthly"][2] == 1
+
+
+def test_analytics_endpoint(admin_client):
+    """JSONで推移データを返し、不正な期間はエラーになること"""
+    create_history()
+
+    response = admin_client.get(
+        "/reports/monthly-summary/analytics",
+        query_string={"start_year": 2023, "end_year": 2025},
+    )
+    assert response.status_code == 200
+    assert response.get_json()["years"] == [2023, 2024, 2025]
+
+    response = admin_client.get(
+        "/reports/monthly-summary/analytics",
+        query_string={"start_year": 2000, "end_year": 2025},
+    )
+    assert response.status_code == 400
+    assert "error" in response.get_json()
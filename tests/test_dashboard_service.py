@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from app.services.dashboard_service import dashboard_service
+from tests.test_report_query_service import count_queries
+
+
+@pytest.fixture(autouse=True)
+def clear_dashboard_cache():
+    dashboard_service.invalidate()
+    yield
+    dashboard_service.invalidate()
+
+
+def test_index_is_served_from_cache(admin_client, create_report_with_photos):
+    """2回目以降のトップページは統計情報のクエリを実行しないこと"""
+    create_report_with_photos(pair_count=0)
+
+    response = admin_client.get("/")
+    assert response.status_code == 200
+    assert "テスト物件" in response.get_data(as_text=True)
+
+    with count_queries() as statements:
+        assert admin_client.get("/").status_code == 200
+    assert not any("count(" in statement.lower() for statement in statements)
+
+
+def test_customer_create_invalidates_cache(admin_client):
+    """顧客の登録でキャッシュが破棄され、件数が更新されること"""
+    assert dashboard_service.get_snapshot()["stats"]["customer_count"] == 0
+
+    response = admin_client.post("/customers/create", data={"name": "新規顧客"})
+    assert response.status_code == 302
+
+    snapshot = dashboard_service.get_snapshot()
+    assert snapshot["stats"]["customer_count"] == 1
+    assert snapshot["recent_customers"][0]["name"] == "新規顧客"
+    assert snapshot["recent_customers"][0]["property_count"] == 0
+
+
+def test_concurrent_requests_build_snapshot_once(app, monkeypatch):
+    """同時アクセス時も集計は1回だけ行われること"""
+    calls = []
+    original = dashboard_service.build_snapshot
+    started = threading.Event()
+
+    def slow_build():
+        calls.append(1)
+        started.wait(timeout=1)
+        return original()
+
+    monkeypatch.setattr(dashboard_service, "build_snapshot", slow_build)
+
+    results = []
+
+    def worker():
+        with app.app_context():
+            results.append(dashboard_service.get_snapshot())
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.schedule import Schedule
+from app.models.user import User
+from app.models.notification_digest import NotificationDigest
+from app.services.digest_service import digest_service
+from app.services.email_service import EmailService
+from tests.test_report_query_service import count_queries
+
+
+DAY = datetime(2030, 6, 3)
+
+
+def create_user(username, notification_mode):
+    user = User(
+        username=username,
+        email=f"{username}@example.com",
+        name=username,
+        notification_mode=notification_mode,
+    )
+    user.set_password("password")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def create_schedule(user, start, title, **values):
+    schedule = Schedule(
+        title=title,
+        start_datetime=start,
+        end_datetime=start + timedelta(hours=1),
+        status="pending",
+        notification_enabled=True,
+        notification_minutes=30,
+        created_by=user.id,
+        **values,
+    )
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule
+
+
+class DigestSender:
+    """送信したまとめを記録するテスト用の送信処理"""
+
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, user, digest_type, window_start, schedules):
+        self.sent.append(
+            (user.username, digest_type, window_start, [s.title for s in schedules])
+        )
+        return True
+
+
+def test_daily_digest_groups_the_days_schedules_per_user(app):
+    """1日1回のまとめで、その日の予定をユーザーごとに1通にまとめること"""
+    daily = create_user("daily", User.NOTIFICATION_MODE_DAILY)
+    immediate = create_user("immediate", User.NOTIFICATION_MODE_IMMEDIATE)
+    create_schedule(daily, DAY.replace(hour=15), "午後の点検")
+    create_schedule(daily, DAY.replace(hour=9), "朝の点検")
+    create_schedule(daily, DAY + timedelta(days=1, hours=9), "翌日の点検")
+    create_schedule(
+        daily, DAY - timedelta(days=7, hours=-11), "毎日の巡回", recurrence_type="daily"
+    )
+    create_schedule(immediate, DAY.replace(hour=10), "即時通知の点検")
+    sender = DigestSender()
+
+    # 送信時刻の前は送らない
+    assert digest_service.process(sender, DAY.replace(hour=6, minute=59)) == 0
+
+    assert digest_service.process(sender, DAY.replace(hour=7, minute=1)) == 1
+    assert sender.sent == [
+        ("daily", "daily", DAY, ["朝の点検", "毎日の巡回", "午後の点検"])
+    ]
+
+    # 期間のスケジュールの取得は繰り返しでないもの・繰り返しのものの各1回
+    with count_queries() as statements:
+        digest_service.load_schedules(DAY, DAY + timedelta(days=1), {daily.id})
+    assert sum("FROM schedules" in statement for statement in statements) == 2
+
+    # 同じ日のまとめは二重に送らない
+    assert digest_service.process(sender, DAY.replace(hour=8)) == 0
+    assert NotificationDigest.query.filter_by(digest_type="daily").count() == 1
+
+
+def test_hourly_digest_covers_the_next_hour(app):
+    """1時間ごとのまとめで、次の1時間の予定だけを送ること"""
+    hourly = create_user("hourly", User.NOTIFICATION_MODE_HOURLY)
+    create_schedule(hourly, DAY.replace(hour=10, minute=15), "10時台の点検")
+    create_schedule(hourly, DAY.replace(hour=11, minute=30), "11時台の点検")
+    sender = DigestSender()
+
+    assert digest_service.process(sender, DAY.replace(hour=9, minute=5)) == 1
+    assert digest_service.process(sender, DAY.replace(hour=9, minute=50)) == 0
+    assert digest_service.process(sender, DAY.replace(hour=10, minute=0)) == 1
+    # 予定のない時間はメールを送らず、確認済みとして記録する
+    assert digest_service.process(sender, DAY.replace(hour=11, minute=0)) == 0
+    assert [titles for *_, titles in sender.sent] == [["10時台の点検"], ["11時台の点検"]]
+    assert (
+        NotificationDigest.query.filter_by(
+            window_start=DAY.replace(hour=12), status="empty"
+        ).count()
+        == 1
+    )
+
+
+def test_failed_digest_is_retried(app):
+    """送信できなかったまとめは次のチェックで再送すること"""
+    hourly = create_user("hourly", User.NOTIFICATION_MODE_HOURLY)
+    create_schedule(hourly, DAY.replace(hour=10, minute=15), "点検")
+
+    now = DAY.replace(hour=9, minute=5)
+    assert digest_service.process(lambda *args: False, now) == 0
+    assert NotificationDigest.query.count() == 0
+    assert digest_service.process(DigestSender(), now) == 1
+
+
+def test_digest_users_do_not_get_per_schedule_mail(app, monkeypatch):
+    """まとめて通知のユーザーにはスケジュールごとの通知メールを送らないこと"""
+    daily = create_user("daily", User.NOTIFICATION_MODE_DAILY)
+    immediate = create_user("immediate", User.NOTIFICATION_MODE_IMMEDIATE)
+    start = datetime.now() + timedelta(minutes=10)
+    create_schedule(daily, start, "まとめの点検")
+    create_schedule(immediate, start, "即時の点検")
+
+    service = EmailService()
+    monkeypatch.setattr(service, "is_configured", lambda: True)
+    sent = []
+    monkeypatch.setattr(
+        service,
+        "send_email",
+        lambda to_addresses, subject, html_body, text_body=None: sent.append(
+            (to_addresses, subject)
+        )
+        or True,
+    )
+    monkeypatch.setattr(digest_service, "process", lambda send: 0)
+
+    service.check_and_send_notifications()
+
+    assert [to_addresses for to_addresses, _ in sent] == [["immediate@example.com"]]
+    # まとめて通知のスケジュールも再送の対象にしない
+    assert Schedule.query.filter_by(title="まとめの点検").one().notification_logs
+
+
+def test_edit_user_sets_notification_mode(admin_client):
+    """ユーザー編集画面で通知の受け取り方を変更できること"""
+    user = create_user("staff", User.NOTIFICATION_MODE_IMMEDIATE)
+
+    response = admin_client.get(f"/auth/admin/users/{user.id}/edit")
+    assert "スケジュール通知の受け取り方" in response.get_data(as_text=True)
+
+    response = admin_client.post(
+        f"/auth/admin/users/{user.id}/edit",
+        data={
+            "username": "staff",
+            "email": "staff@example.com",
+            "name": "staff",
+            "role": "viewer",
+            "notification_mode": "hourly",
+        },
+    )
+
+    assert response.status_code == 302
+    db.session.expire_all()
+    assert db.session.get(User, user.id).notification_mode == "hourly"
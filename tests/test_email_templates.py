@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.schedule import Schedule
+from app.models.user import User
+from app.services.email_service import EmailService
+from app.services.email_templates import get_environment
+
+
+def create_user():
+    user = User(username="staff", email="staff@example.com", name="担当者")
+    user.set_password("password")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def create_schedule(start, user, title="点検 <A棟>", **values):
+    schedule = Schedule(
+        title=title,
+        description="室外機 & 配管",
+        start_datetime=start,
+        end_datetime=start + timedelta(hours=1),
+        status="pending",
+        notification_enabled=True,
+        notification_minutes=30,
+        created_by=user.id,
+        **values,
+    )
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule
+
+
+def configured_service(monkeypatch):
+    """メール設定済みで、送信したメールを記録するサービス"""
+    service = EmailService()
+    monkeypatch.setattr(service, "is_configured", lambda: True)
+    sent = []
+    monkeypatch.setattr(
+        service,
+        "send_email",
+        lambda to_addresses, subject, html_body, text_body=None: sent.append(
+            (to_addresses, subject, html_body, text_body)
+        )
+        or True,
+    )
+    return service, sent
+
+
+def test_templates_are_compiled_once(app):
+    """テンプレートは1回だけ読み込み、同じコンパイル済みのテンプレートを使うこと"""
+    environment = get_environment()
+
+    assert get_environment() is environment
+    assert environment.get_template(
+        "schedule_notification.html"
+    ) is environment.get_template("schedule_notification.html")
+
+
+def test_notification_content_is_rendered_and_escaped(app):
+    """通知メールの本文が描画され、HTML本文ではスケジュールの値がエスケープされること"""
+    schedule = create_schedule(datetime(2030, 6, 1, 10), create_user())
+
+    subject, html_body, text_body = EmailService()._generate_notification_content(
+        schedule, "reminder"
+    )
+
+    assert subject == "【リマインダー】点検 <A棟> - 2030年06月01日 10:00"
+    assert "<h3>点検 &lt;A棟&gt;</h3>" in html_body
+    assert "室外機 &amp; 配管" in html_body
+    assert "30 分後に開始予定です" in html_body
+    assert "- タイトル: 点検 <A棟>" in text_body
+    assert "- 説明: 室外機 & 配管" in text_body
+    assert "- 終了: 2030年06月01日 11:00" in text_body
+
+
+def test_all_user_content_is_rendered(app):
+    """全ユーザー向けの通知メールに詳細情報・送信先数が含まれること"""
+    schedule = create_schedule(datetime(2030, 6, 1, 10), create_user())
+
+    subject, html_body, text_body = (
+        EmailService()._generate_all_user_notification_content(schedule, "start", 12)
+    )
+
+    assert subject == "【全社通知】スケジュール開始: 点検 <A棟>"
+    assert "担当者: staff" in html_body
+    assert "全登録ユーザー（12名）" in html_body
+    assert "- 説明: 室外機 & 配管" in text_body
+
+
+def test_due_notifications_are_sent_as_one_digest(app, monkeypatch):
+    """同じ通知チェックで送信先が同じ通知は1通のメールにまとめること"""
+    user = create_user()
+    start = datetime.now() + timedelta(minutes=10)
+    for number in range(3):
+        create_schedule(start + timedelta(minutes=number), user, title=f"点検{number}")
+    service, sent = configured_service(monkeypatch)
+    service.digest_enabled = True
+
+    assert service.check_and_send_notifications() == 3
+
+    assert len(sent) == 1
+    to_addresses, subject, html_body, text_body = sent[0]
+    assert to_addresses == ["staff@example.com"]
+    assert subject.startswith("【通知まとめ】スケジュール 3 件")
+    assert [title in html_body for title in ("点検0", "点検1", "点検2")] == [True] * 3
+    assert text_body.index("点検0") < text_body.index("点検1")
+
+    # 送信済みの通知は再送しない
+    assert service.check_and_send_notifications() == 0
+
+
+def test_notifications_are_sent_one_by_one_by_default(app, monkeypatch):
+    """まとめる設定をしていない場合は、これまでどおり通知ごとにメールを送信すること"""
+    user = create_user()
+    start = datetime.now() + timedelta(minutes=10)
+    for number in range(2):
+        create_schedule(start, user, title=f"点検{number}")
+    service, sent = configured_service(monkeypatch)
+    assert not service.digest_enabled
+
+    assert service.check_and_send_notifications() == 2
+    assert len(sent) == 2
+    assert all(subject.startswith("【リマインダー】") for _, subject, _, _ in sent)
@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from app import create_app, db
+from app.models.user import User
+from app.services.login_throttle_service import login_throttle_service
+
+
+# テストでは計算量の少ないハッシュを使う
+FAST_METHOD = "pbkdf2:sha256:1000"
+
+
+@pytest.fixture(autouse=True)
+def fast_hash(monkeypatch):
+    monkeypatch.setenv("PASSWORD_HASH_METHOD", FAST_METHOD)
+    login_throttle_service.clear()
+    yield
+    login_throttle_service.clear()
+
+
+def create_user(username="staff", password="password"):
+    user = User(username=username, email=f"{username}@example.com")
+    user.set_password(password)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def login(client, username="staff", password="password"):
+    return client.post("/auth/login", data={"username": username, "password": password})
+
+
+def test_password_is_rehashed_with_configured_method(app, client, monkeypatch):
+    """ハッシュの方式を変更すると、次のログインで新しい方式のハッシュに作り直すこと"""
+    user = create_user()
+    assert user.password_hash.startswith(FAST_METHOD + "$")
+    assert not user.password_needs_rehash()
+
+    monkeypatch.setenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:2000")
+    assert user.password_needs_rehash()
+    assert login(client).status_code == 302
+
+    db.session.expire_all()
+    user = db.session.get(User, user.id)
+    assert user.password_hash.startswith("pbkdf2:sha256:2000$")
+    assert user.check_password("password")
+
+
+def test_repeated_failures_lock_the_username(app, client, monkeypatch):
+    """ユーザー名ごとの失敗回数が上限に達すると、正しいパスワードでもログインできないこと"""
+    monkeypatch.setattr(login_throttle_service, "max_failures_per_username", 3)
+    create_user()
+    create_user("other")
+
+    for _ in range(3):
+        assert login(client, password="wrong").status_code == 200
+
+    response = login(client)
+    assert response.status_code == 429
+    assert "秒後にもう一度お試しください" in response.get_data(as_text=True)
+
+    # 他のユーザー名は同じIPアドレスからでもログインできる
+    assert login(client, username="other").status_code == 302
+
+
+def test_repeated_failures_lock_the_ip_address(app, client, monkeypatch):
+    """IPアドレスごとの失敗回数が上限に達すると、そのIPアドレスからログインできないこと"""
+    monkeypatch.setattr(login_throttle_service, "max_failures_per_ip", 2)
+    create_user()
+
+    login(client, username="unknown1")
+    login(client, username="unknown2")
+
+    assert login(client).status_code == 429
+    other_ip = {"REMOTE_ADDR": "192.0.2.10"}
+    response = client.post(
+        "/auth/login",
+        data={"username": "staff", "password": "password"},
+        environ_base=other_ip,
+    )
+    assert response.status_code == 302
+
+
+def test_busy_login_is_rejected_without_verifying(app, client, monkeypatch):
+    """同時に検証できる数を超えた場合は、パスワードを検証せずに混雑として断ること"""
+    create_user()
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(login_throttle_service, "_verification_slots", slots)
+    monkeypatch.setattr(login_throttle_service, "verification_wait", 0)
+    monkeypatch.setattr(
+        User, "check_password", lambda self, password: pytest.fail("検証しないこと")
+    )
+
+    response = login(client)
+
+    assert response.status_code == 503
+    assert "ログインが混雑しています" in response.get_data(as_text=True)
+
+
+def test_forwarded_clients_do_not_share_ip_limit(tmp_path, monkeypatch):
+    """プロキシ経由の場合、X-Forwarded-Forの接続元ごとに失敗回数を数えること"""
+    monkeypatch.setattr(login_throttle_service, "max_failures_per_ip", 2)
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+            "UPLOAD_FOLDER": str(tmp_path / "uploads"),
+            "PROXY_FIX_X_FOR": 1,
+        }
+    )
+    client = app.test_client()
+
+    def login_from(address, username, password="password"):
+        return client.post(
+            "/auth/login",
+            data={"username": username, "password": password},
+            headers={"X-Forwarded-For": address},
+        )
+
+    with app.app_context():
+        db.create_all()
+        create_user()
+
+        login_from("198.51.100.1", "unknown1")
+        login_from("198.51.100.1", "unknown2")
+
+        assert login_from("198.51.100.1", "staff").status_code == 429
+        assert login_from("198.51.100.2", "staff").status_code == 302
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,109 @@
+from datetime import date
+
+from app import db
+from app.models.monthly_rollup import MonthlyRollup
+from app.models.report import Report
+from app.models.work_time import WorkTime
+from app.services.monthly_rollup_service import monthly_rollup_service
+from app.services.summary_service import summary_service
+from tests.test_summary_service import create_order, create_orders
+
+
+def rollup_snapshot():
+    """集計済みテーブルの内容を比較用の集合として取得"""
+    return {
+        (
+            rollup.year,
+            rollup.month,
+            rollup.reception_type,
+            rollup.status,
+            rollup.report_count,
+            rollup.ac_quantity,
+            rollup.amount,
+        )
+        for rollup in MonthlyRollup.query.all()
+    }
+
+
+def assert_matches_rebuild():
+    """差分更新した集計が、作り直した集計と一致すること"""
+    incremental = rollup_snapshot()
+    monthly_rollup_service.rebuild()
+    assert rollup_snapshot() == incremental
+
+
+def test_rollup_follows_report_and_work_time_changes(app):
+    """ステータス・作業日・受付種別・金額の変更が集計に反映されること"""
+    create_orders()
+    report = create_order("個人", "pending", date(2025, 2, 1), quantity=2, total_amount=10000)
+    assert_matches_rebuild()
+
+    # ステータスの変更
+    report.status = "completed"
+    db.session.commit()
+    february = summary_service.build_monthly_summary(2025)["monthly_data"][1]
+    assert february["reception_types"]["個人"]["completed"] == 1
+    assert february["reception_types"]["個人"]["pending"] == 0
+
+    # 作業日を別の月に変更（変更前の月から外れること）
+    work_time = WorkTime.query.filter_by(report_id=report.id).one()
+    db.session.expire_all()
+    work_time.work_date = date(2025, 4, 1)
+    db.session.commit()
+    summary = summary_service.build_monthly_summary(2025)
+    assert summary["monthly_data"][1]["totals"]["total"] == 0
+    assert summary["monthly_data"][3]["totals"]["total"] == 1
+
+    # 受付種別・エアコン金額の変更
+    report.property.reception_type = "法人"
+    report.work_details[0].air_conditioner.total_amount = 12000
+    db.session.commit()
+    amount = summary_service.build_monthly_summary(2025, "amount")
+    assert amount["monthly_data"][3]["reception_types"]["法人"]["completed"] == 12000
+    assert amount["monthly_data"][3]["reception_types"]["個人"]["total"] == 0
+    assert_matches_rebuild()
+
+
+def test_rollup_removes_deleted_reports(app):
+    """報告書の削除で集計から外れること"""
+    create_orders()
+    report = Report.query.filter_by(status="draft").one()
+    db.session.expire_all()
+
+    db.session.delete(report)
+    db.session.commit()
+
+    march = summary_service.build_monthly_summary(2025)["monthly_data"][2]
+    assert march["totals"]["total"] == 0
+    assert_matches_rebuild()
+
+
+def test_rollback_discards_pending_changes(app):
+    """ロールバックした変更は集計されないこと"""
+    create_orders()
+    before = rollup_snapshot()
+
+    report = Report.query.filter_by(status="draft").one()
+    report.status = "completed"
+    db.session.flush()
+    db.session.rollback()
+    create_order("法人", "completed", date(2025, 5, 1))
+
+    may = summary_service.build_monthly_summary(2025)["monthly_data"][4]
+    assert may["reception_types"]["法人"]["completed"] == 1
+    assert rollup_snapshot() - before == {(2025, 5, "法人", "completed", 1, 1, 0)}
+
+
+def test_rollup_follows_bulk_delete(app):
+    """query.delete()による一括削除も集計に反映されること"""
+    create_orders()
+    report = Report.query.filter_by(status="completed").filter(
+        Report.date == date(2025, 1, 10)
+    ).one()
+
+    WorkTime.query.filter_by(report_id=report.id).delete()
+    db.session.commit()
+
+    january = summary_service.build_monthly_summary(2025)["monthly_data"][0]
+    assert january["reception_types"]["個人"] == {"completed": 0, "pending": 1, "total": 1}
+    assert_matches_rebuild()
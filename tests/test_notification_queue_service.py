@@ -0,0 +1,155 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+
+from app import db
+from app.models.schedule import Schedule
+from app.models.notification_log import NotificationLog
+from app.services.recurrence_service import recurrence_service
+from app.services.notification_queue_service import notification_queue_service
+
+
+def create_schedule(start, minutes=30, **values):
+    schedule = Schedule(
+        title=values.pop("title", "点検"),
+        start_datetime=start,
+        end_datetime=start + timedelta(hours=1),
+        status="pending",
+        notification_enabled=True,
+        notification_minutes=minutes,
+        **values,
+    )
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule
+
+
+class Sender:
+    """送信した通知を記録するテスト用の送信処理"""
+
+    def __init__(self, result=True):
+        self.result = result
+        self.sent = []
+
+    def __call__(self, schedule, notification_type):
+        self.sent.append((schedule.id, schedule.start_datetime, notification_type))
+        return self.result
+
+
+def test_next_notification_is_set_on_save(app):
+    """保存時に次の通知日時が設定され、完了・通知無効で解除されること"""
+    schedule = create_schedule(datetime(2030, 6, 1, 10), minutes=60)
+    assert schedule.next_notification_at == datetime(2030, 6, 1, 9)
+
+    schedule.start_datetime = datetime(2030, 6, 2, 10)
+    db.session.commit()
+    assert schedule.next_notification_at == datetime(2030, 6, 2, 9)
+
+    schedule.status = "completed"
+    db.session.commit()
+    assert schedule.next_notification_at is None
+
+
+def test_tick_sends_each_notification_once(app):
+    """送信日時になった通知だけを1回ずつ送信すること"""
+    start = datetime(2030, 6, 1, 10)
+    schedule = create_schedule(start, minutes=30)
+    create_schedule(datetime(2030, 6, 3, 10), title="まだ先")
+    sender = Sender()
+
+    # 通知時刻前は何も送らない
+    assert (
+        notification_queue_service.process_due(sender, start - timedelta(minutes=31))
+        == 0
+    )
+
+    # リマインダー（チェックが重複しても二重に送らない）
+    now = start - timedelta(minutes=29)
+    assert notification_queue_service.process_due(sender, now) == 1
+    assert notification_queue_service.process_due(sender, now) == 0
+    assert schedule.next_notification_at == start
+
+    # 開始時刻通知の後は通知予定がなくなる
+    assert (
+        notification_queue_service.process_due(sender, start + timedelta(minutes=1))
+        == 1
+    )
+    assert schedule.next_notification_at is None
+    assert [notification_type for _, _, notification_type in sender.sent] == [
+        "reminder",
+        "start",
+    ]
+    assert NotificationLog.query.filter_by(status="sent").count() == 2
+
+
+def test_failed_send_is_retried(app):
+    """送信できなかった通知は記録を残さず、次のチェックで再送すること"""
+    start = datetime(2030, 6, 1, 10)
+    create_schedule(start, minutes=30)
+    now = start - timedelta(minutes=10)
+
+    assert notification_queue_service.process_due(Sender(result=False), now) == 0
+    assert NotificationLog.query.count() == 0
+
+    sender = Sender()
+    assert (
+        notification_queue_service.process_due(sender, now + timedelta(minutes=1))
+        == 1
+    )
+    assert len(sender.sent) == 1
+
+
+def test_claimed_notification_is_not_sent_again(app):
+    """他のチェックが送信記録を登録済みの通知は送らないこと"""
+    start = datetime(2030, 6, 1, 10)
+    schedule = create_schedule(start, minutes=30)
+    db.session.add(
+        NotificationLog(
+            schedule_id=schedule.id,
+            occurrence_date=start.date(),
+            notification_type="reminder",
+        )
+    )
+    db.session.commit()
+    sender = Sender()
+
+    assert (
+        notification_queue_service.process_due(sender, start - timedelta(minutes=5))
+        == 0
+    )
+    assert sender.sent == []
+    assert schedule.next_notification_at == start
+
+
+def test_recurring_schedule_advances_to_next_occurrence(app):
+    """繰り返しスケジュールは送信後に次の回の通知日時へ進み、例外を反映すること"""
+    schedule = create_schedule(
+        datetime(2030, 6, 3, 10), minutes=60, recurrence_type="weekly"
+    )
+    sender = Sender()
+
+    now = datetime(2030, 6, 10, 9, 30)
+    assert notification_queue_service.process_due(sender, now) == 1
+    assert sender.sent == [(schedule.id, datetime(2030, 6, 10, 10), "reminder")]
+    assert schedule.next_notification_at == datetime(2030, 6, 10, 10)
+
+    notification_queue_service.process_due(sender, datetime(2030, 6, 10, 10, 1))
+    assert schedule.next_notification_at == datetime(2030, 6, 17, 9)
+
+    # 次の回を取り消すと、その次の回の通知日時になる
+    recurrence_service.set_exception(schedule, date(2030, 6, 17), cancelled=True)
+    db.session.commit()
+    notification_queue_service.process_due(sender, datetime(2030, 6, 10, 10, 2))
+    assert schedule.next_notification_at == datetime(2030, 6, 24, 9)
+
+
+def test_due_query_uses_index(app):
+    """通知チェックの対象の取得で次の通知日時のインデックスが使われること"""
+    plan = db.session.execute(
+        text(
+            "EXPLAIN QUERY PLAN SELECT * FROM schedules "
+            "WHERE next_notification_at <= :now ORDER BY next_notification_at"
+        ),
+        {"now": "2030-06-01 10:00:00"},
+    ).all()
+    assert any("ix_schedules_next_notification_at" in row[-1] for row in plan)
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.outbox_message import OutboxMessage
+from app.services.email_service import email_service
+from app.services.outbox_service import outbox_service, retry_delay
+from app.services.smtp_connection_service import SMTPConnectionManager
+
+
+@pytest.fixture
+def mail_settings(monkeypatch):
+    """メール設定済みの状態にする（SMTPには接続しない）"""
+    monkeypatch.setattr(email_service, "username", "system@example.com")
+    monkeypatch.setattr(email_service, "password", "secret")
+    monkeypatch.setattr(email_service, "default_sender", "system@example.com")
+    monkeypatch.setattr(email_service, "enabled", True)
+
+
+def enqueue(count=1):
+    return [
+        outbox_service.enqueue(
+            [f"user{number}@example.com"], f"件名 {number}", "<p>本文</p>"
+        )
+        for number in range(count)
+    ]
+
+
+def failing_send(message):
+    raise ConnectionError("relay unavailable")
+
+
+def test_retry_delay_doubles_up_to_limit():
+    """再送までの間隔が失敗ごとに倍になり、上限で止まること"""
+    assert [retry_delay(attempts) for attempts in (1, 2, 3)] == [
+        timedelta(minutes=1),
+        timedelta(minutes=2),
+        timedelta(minutes=4),
+    ]
+    assert retry_delay(20) == timedelta(hours=1)
+
+
+def test_failed_message_is_retried_with_backoff(app, monkeypatch):
+    """送信に失敗したメールは間隔を空けて再送し、上限の回数で送信失敗になること"""
+    monkeypatch.setattr(outbox_service, "max_attempts", 3)
+    (message,) = enqueue()
+    now = datetime.utcnow()
+
+    assert outbox_service.process(failing_send, now) == {
+        "sent": 0,
+        "retry": 1,
+        "failed": 0,
+    }
+    assert message.status == "queued"
+    assert message.next_attempt_at == now + timedelta(minutes=1)
+    assert message.last_error == "relay unavailable"
+
+    # 再送日時の前は送信しない
+    result = outbox_service.process(failing_send, now + timedelta(seconds=30))
+    assert result["retry"] == 0
+
+    now += timedelta(minutes=1)
+    outbox_service.process(failing_send, now)
+    assert message.next_attempt_at == now + timedelta(minutes=2)
+
+    now += timedelta(minutes=2)
+    assert outbox_service.process(failing_send, now)["failed"] == 1
+    assert message.status == "failed"
+    assert message.attempts == 3
+
+    # 手動で送信待ちに戻すと送信できる
+    assert outbox_service.retry(message.id)
+    sent = []
+    assert outbox_service.process(sent.append)["sent"] == 1
+    assert sent == [message]
+    assert message.status == "sent"
+
+
+def test_rate_limit_per_minute(app, monkeypatch):
+    """1分あたりの送信数の上限を超えて送信しないこと"""
+    monkeypatch.setattr(outbox_service, "rate_limit_per_minute", 3)
+    enqueue(5)
+    sent = []
+
+    assert outbox_service.process(sent.append)["sent"] == 3
+    assert outbox_service.process(sent.append)["sent"] == 0
+    assert outbox_service.get_status()["counts"]["queued"] == 2
+
+    # 1分後には残りを送信する
+    later = datetime.utcnow() + timedelta(minutes=1, seconds=1)
+    assert outbox_service.process(sent.append, later)["sent"] == 2
+    assert len(sent) == 5
+
+
+def test_stale_sending_message_is_requeued(app):
+    """送信中のまま残ったメールは送信待ちに戻して送信すること"""
+    (message,) = enqueue()
+    message.status = "sending"
+    message.started_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+
+    sent = []
+    assert outbox_service.process(sent.append)["sent"] == 1
+    assert sent == [message]
+
+
+def test_reminder_route_queues_without_smtp(admin_client, mail_settings, monkeypatch):
+    """一括リマインダーは送信待ちに登録するだけで、SMTPでの送信は送信処理で行うこと"""
+    sent = []
+
+    def fail_send(self, message, from_addr=None, to_addrs=None):
+        raise AssertionError("画面の処理でSMTPに送信しないこと")
+
+    monkeypatch.setattr(SMTPConnectionManager, "send", fail_send)
+    response = admin_client.post("/notifications/send-all-reminder")
+
+    assert response.status_code == 302
+    message = OutboxMessage.query.one()
+    assert message.status == "queued"
+    assert message.recipients == ["admin@example.com"]
+    assert message.created_by is not None
+
+    monkeypatch.setattr(
+        SMTPConnectionManager,
+        "send",
+        lambda self, message, from_addr=None, to_addrs=None: sent.append(message),
+    )
+    assert email_service.send_outbox()["sent"] == 1
+    assert sent[0]["To"] == "admin@example.com"
+
+    html = admin_client.get("/notifications/").get_data(as_text=True)
+    assert "送信済み 1" in html
+    assert message.subject in html
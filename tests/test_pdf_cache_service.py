@@ -0,0 +1,75 @@
+import os
+from io import BytesIO
+from unittest import mock
+
+from app.models.photo import Photo
+from app.services.pdf_cache_service import pdf_cache_service
+from app.services.pdf_service import PDFService
+
+
+def test_download_pdf_is_cached_and_revalidated(
+    admin_client, create_report_with_photos
+):
+    """2回目以降は生成済みのPDFを返し、ETagが一致すれば304を返すこと"""
+    report = create_report_with_photos(pair_count=1)
+
+    with mock.patch.object(
+        PDFService, "generate_report_pdf", wraps=PDFService.generate_report_pdf
+    ) as generate:
+        first = admin_client.get(f"/reports/{report.id}/pdf")
+        second = admin_client.get(f"/reports/{report.id}/pdf")
+        not_modified = admin_client.get(
+            f"/reports/{report.id}/pdf",
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+
+    assert first.status_code == 200
+    assert first.data.startswith(b"%PDF-")
+    assert second.data == first.data
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert not_modified.status_code == 304
+    assert generate.call_count == 1
+
+
+def test_photo_edit_changes_fingerprint_and_invalidates(
+    app, admin_client, create_report_with_photos
+):
+    """写真情報の編集でキャッシュが削除され、ETagが変わること"""
+    report = create_report_with_photos(pair_count=1)
+    photo = Photo.query.filter_by(report_id=report.id).first()
+
+    first = admin_client.get(f"/reports/{report.id}/pdf")
+    cache_folder = pdf_cache_service.get_cache_folder()
+    assert len(os.listdir(cache_folder)) == 1
+
+    admin_client.post(
+        f"/reports/{report.id}/photos/{photo.id}/edit",
+        data={"caption": "新しいキャプション", "room_name": "リビング"},
+    )
+    assert os.listdir(cache_folder) == []
+
+    second = admin_client.get(
+        f"/reports/{report.id}/pdf",
+        headers={"If-None-Match": first.headers["ETag"]},
+    )
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+def test_evicts_least_recently_used(app):
+    """上限サイズを超えた場合、最終利用日時の古いキャッシュから削除されること"""
+    app.config["PDF_CACHE_MAX_BYTES"] = 2500
+    pdf_data = BytesIO(b"%PDF-" + b"0" * 995)
+
+    old_path = pdf_cache_service.store(1, "a", pdf_data)
+    recent_path = pdf_cache_service.store(2, "b", pdf_data)
+    os.utime(old_path, ns=(1, 1))
+    os.utime(recent_path, ns=(2, 2))
+
+    # 古い方を参照すると最終利用日時が更新され、削除対象から外れる
+    assert pdf_cache_service.get(1, "a") == old_path
+    pdf_cache_service.store(3, "c", pdf_data)
+
+    assert os.path.exists(old_path)
+    assert not os.path.exists(recent_path)
+    assert pdf_cache_service.get(3, "c") is not None
@@ -0,0 +1,128 @@
+import time
+import zipfile
+from io import BytesIO
+
+from PyPDF2 import PdfReader
+
+from app.services.pdf_export_service import pdf_export_service
+from app.services.pdf_service import PDFService
+
+
+def test_export_zip_contains_each_report_in_order(
+    admin_client, create_report_with_photos
+):
+    """指定した報告書のPDFが指定順にZIPへ格納されること"""
+    first = create_report_with_photos(pair_count=1)
+    second = create_report_with_photos(pair_count=0)
+
+    response = admin_client.get(
+        "/reports/order-details/export",
+        query_string={"format": "zip", "report_ids": [second.id, first.id, 9999]},
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
+    with zipfile.ZipFile(BytesIO(response.data)) as zip_file:
+        names = zip_file.namelist()
+        assert names[0].startswith(f"{second.id}_")
+        assert names[1].startswith(f"{first.id}_")
+        assert names[2] == "エラー一覧.txt"
+        assert "9999" in zip_file.read(names[2]).decode("utf-8")
+        assert zip_file.read(names[0]).startswith(b"%PDF-")
+
+
+def test_export_combined_pdf_uses_order_details_filter(
+    admin_client, create_report_with_photos
+):
+    """受注明細の条件に一致する報告書が1つのPDFに結合されること"""
+    create_report_with_photos(pair_count=1)
+    create_report_with_photos(pair_count=0)
+
+    response = admin_client.get(
+        "/reports/order-details/export",
+        query_string={"format": "pdf", "start_date": "2025-06-01"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Export-Errors"] == "0"
+    # 写真付き（2ページ）と写真なし（1ページ）の合計
+    assert len(PdfReader(BytesIO(response.data)).pages) == 3
+
+
+def test_export_survives_cache_eviction(app, admin_client, create_report_with_photos):
+    """エクスポート中にPDFキャッシュの上限で古いPDFが削除されても出力できること"""
+    app.config["PDF_CACHE_MAX_BYTES"] = 1
+    reports = [create_report_with_photos(pair_count=1) for _ in range(3)]
+    report_ids = [report.id for report in reports]
+
+    response = admin_client.get(
+        "/reports/order-details/export",
+        query_string={"format": "zip", "report_ids": report_ids},
+    )
+    with zipfile.ZipFile(BytesIO(response.data)) as zip_file:
+        assert len(zip_file.namelist()) == 3
+        for name in zip_file.namelist():
+            assert zip_file.read(name).startswith(b"%PDF-")
+
+    response = admin_client.get(
+        "/reports/order-details/export",
+        query_string={"format": "pdf", "report_ids": report_ids},
+    )
+    assert response.headers["X-Export-Errors"] == "0"
+    assert len(PdfReader(BytesIO(response.data)).pages) == 6
+
+
+def test_export_renders_at_most_worker_count_ahead(app, monkeypatch):
+    """受け取られていないPDFの生成はワーカー数までに抑え、中断時は閉じること"""
+    app.config["PDF_EXPORT_WORKERS"] = 2
+    started = []
+    files = {}
+
+    def render(app, report_id):
+        started.append(report_id)
+        files[report_id] = BytesIO(b"%PDF-")
+        return f"{report_id}.pdf", files[report_id]
+
+    monkeypatch.setattr(pdf_export_service, "_render_in_context", render)
+    pdf_files = pdf_export_service.iter_report_pdfs(app, list(range(1, 11)))
+
+    report_id, _, pdf_file, _ = next(pdf_files)
+    assert report_id == 1
+    # 次のPDFの生成が終わるまで待っても、3件目以降は生成を始めない
+    for _ in range(100):
+        if 2 in files:
+            break
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert sorted(started) == [1, 2]
+
+    pdf_files.close()
+    assert sorted(started) == [1, 2]
+    # 受け取られなかったPDFは閉じる
+    assert files[2].closed
+
+
+def test_export_without_matching_reports_redirects(admin_client):
+    response = admin_client.get(
+        "/reports/order-details/export", query_string={"search": "該当なし"}
+    )
+    assert response.status_code == 302
+
+
+def test_combine_pdfs_writes_all_pages(tmp_path):
+    """combine_pdfsが入力したPDFのページをすべて結合すること"""
+    from reportlab.pdfgen import canvas
+
+    sources = []
+    for pages in (1, 2):
+        buffer = BytesIO()
+        pdf = canvas.Canvas(buffer)
+        for _ in range(pages):
+            pdf.showPage()
+        pdf.save()
+        buffer.seek(0)
+        sources.append(buffer)
+
+    output_path = str(tmp_path / "combined.pdf")
+    assert PDFService.combine_pdfs(sources, output_path) == output_path
+    assert len(PdfReader(output_path).pages) == 3
@@ -0,0 +1,80 @@
+import os
+from datetime import datetime, timedelta
+
+from app import db
+
+from app.models.pdf_job import PdfJob
+from app.services.pdf_job_service import pdf_job_service
+
+
+def test_pdf_job_submit_poll_and_download(admin_client, create_report_with_photos):
+    """ジョブを登録し、状態確認後に生成したPDFをダウンロードできること"""
+    report = create_report_with_photos(pair_count=1)
+
+    response = admin_client.post(f"/reports/{report.id}/pdf/jobs")
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    pdf_job_service.shutdown()
+
+    status = admin_client.get(f"/reports/pdf/jobs/{job_id}").get_json()
+    assert status["status"] == "completed"
+    assert status["progress"] == 100
+
+    download = admin_client.get(status["download_url"])
+    assert download.status_code == 200
+    assert download.data.startswith(b"%PDF-")
+
+    job = PdfJob.query.filter_by(token=job_id).first()
+    assert os.path.exists(job.file_path)
+
+
+def test_pdf_job_failure_is_recorded(app, admin_client):
+    """報告書が存在しない場合、ジョブが失敗として記録されること"""
+    job = pdf_job_service.submit(report_id=9999)
+    pdf_job_service.shutdown()
+    # ワーカーが更新した内容を読み直す
+    db.session.expire_all()
+
+    status = admin_client.get(f"/reports/pdf/jobs/{job.token}").get_json()
+    assert status["status"] == "failed"
+    assert "9999" in status["error_message"]
+    assert status["download_url"] is None
+
+
+def test_pdf_job_status_not_found(admin_client):
+    response = admin_client.get("/reports/pdf/jobs/unknown")
+    assert response.status_code == 404
+
+
+def test_running_job_left_by_restart_is_requeued(app, create_report_with_photos):
+    """作成中のまま残ったジョブを起動時に待機中に戻して実行すること"""
+    report = create_report_with_photos(pair_count=1)
+    job = PdfJob(report_id=report.id, status="running", started_at=datetime.utcnow())
+    db.session.add(job)
+    db.session.commit()
+
+    assert pdf_job_service.requeue_pending() == 1
+    pdf_job_service.shutdown()
+    db.session.expire_all()
+
+    assert job.status == "completed"
+    assert os.path.exists(job.file_path)
+
+
+def test_submit_requeues_stale_running_job(app, create_report_with_photos):
+    """作成中のまま一定時間を過ぎたジョブは、登録時に待機中に戻して実行すること"""
+    report = create_report_with_photos(pair_count=1)
+    job = PdfJob(
+        report_id=report.id,
+        status="running",
+        started_at=datetime.utcnow() - timedelta(hours=1),
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    assert pdf_job_service.submit(report.id).id == job.id
+    pdf_job_service.shutdown()
+    db.session.expire_all()
+
+    assert job.status == "completed"
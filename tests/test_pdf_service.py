@@ -0,0 +1,95 @@
+import os
+from app.models.photo import Photo
+from app.models.work_time import WorkTime
+from app.models.work_detail import WorkDetail
+from app.services.pdf_service import PDFService
+
+
+def _photo_pairs(report):
+    before_photos = Photo.query.filter_by(report_id=report.id, photo_type="before")
+    after_photos = Photo.query.filter_by(report_id=report.id, photo_type="after")
+    return list(zip(before_photos.all(), after_photos.all()))
+
+
+def test_prepare_photo_images_skips_missing_and_marks_broken(
+    app, create_report_with_photos
+):
+    """存在しない写真は除外され、壊れた写真はNoneになること"""
+    report = create_report_with_photos(pair_count=2)
+    pairs = _photo_pairs(report)
+
+    missing_photo, broken_photo = pairs[0][0], pairs[1][0]
+    os.remove(os.path.join(app.config["UPLOAD_FOLDER"], missing_photo.filepath))
+    with open(
+        os.path.join(app.config["UPLOAD_FOLDER"], broken_photo.filepath), "wb"
+    ) as f:
+        f.write(b"not a jpeg")
+
+    photo_images = PDFService.prepare_photo_images(pairs, max_workers=4)
+
+    assert missing_photo.id not in photo_images
+    assert photo_images[broken_photo.id] is None
+    assert photo_images[pairs[0][1].id].startswith(b"\xff\xd8")
+
+
+def test_generate_report_pdf_with_photos(create_report_with_photos):
+    """写真付き報告書のPDFが生成できること"""
+    report = create_report_with_photos(pair_count=3)
+
+    buffer = PDFService.generate_report_pdf(
+        report,
+        WorkTime.query.filter_by(report_id=report.id).all(),
+        WorkDetail.query.filter_by(report_id=report.id).all(),
+        _photo_pairs(report),
+    )
+
+    assert buffer.read(5) == b"%PDF-"
+
+
+def test_generate_report_pdf_spools_to_temporary_file(app, create_report_with_photos):
+    """上限サイズを超えたPDFはメモリではなく一時ファイルに書き出されること"""
+    app.config["PDF_SPOOL_MAX_SIZE"] = 1024
+    report = create_report_with_photos(pair_count=1)
+    work_times, work_details, photo_pairs = PDFService.collect_report_data(report.id)
+
+    with PDFService.generate_report_pdf(
+        report, work_times, work_details, photo_pairs
+    ) as pdf_file:
+        assert pdf_file._rolled
+        assert pdf_file.read(5) == b"%PDF-"
+
+
+def test_generate_report_pdf_saves_to_disk_in_single_write(create_report_with_photos):
+    """ディスク保存時は保存先のファイルに直接書き出し、同じ内容を返すこと"""
+    report = create_report_with_photos(pair_count=1)
+    work_times, work_details, photo_pairs = PDFService.collect_report_data(report.id)
+
+    pdf_file, file_path = PDFService.generate_report_pdf(
+        report, work_times, work_details, photo_pairs, save_to_disk=True
+    )
+    with pdf_file:
+        assert pdf_file.name == file_path
+        data = pdf_file.read()
+
+    with open(file_path, "rb") as f:
+        assert f.read() == data
+    assert data.startswith(b"%PDF-")
+
+
+def test_download_pdf_save_failure_is_not_reported_as_saved(
+    admin_client, create_report_with_photos, monkeypatch
+):
+    """保存先に書き出せなかった場合は、保存したと表示せずエラーを表示すること"""
+    report = create_report_with_photos(pair_count=0)
+
+    def fail(report):
+        raise OSError("書き込めません")
+
+    monkeypatch.setattr(PDFService, "build_save_path", staticmethod(fail))
+
+    response = admin_client.get(f"/reports/{report.id}/pdf?save=1")
+
+    assert response.status_code == 302
+    with admin_client.session_transaction() as session:
+        flashes = session["_flashes"]
+    assert flashes == [("danger", "PDFの保存中にエラーが発生しました")]
@@ -0,0 +1,38 @@
+from unittest import mock
+
+from reportlab.pdfbase import pdfmetrics
+
+from app.services.pdf_theme import PDFTheme, pdf_theme, CID_FONT_NAME
+
+
+def test_theme_initializes_once():
+    """フォント登録とスタイル定義は初回アクセス時の1回だけ行われること"""
+    theme = PDFTheme()
+    with mock.patch.object(
+        pdfmetrics, "registerFont", wraps=pdfmetrics.registerFont
+    ) as register_font:
+        styles = theme.styles
+        first_count = register_font.call_count
+        for _ in range(5):
+            assert theme.styles is styles
+            theme.summary_table_style
+
+    assert first_count >= 1
+    assert register_font.call_count == first_count
+
+
+def test_theme_falls_back_to_cid_font():
+    """TrueTypeフォントが見つからない場合はCIDフォントを使うこと"""
+    theme = PDFTheme()
+    with mock.patch.object(PDFTheme, "_find_font_paths", return_value=iter([])):
+        assert theme.table_font_name == CID_FONT_NAME
+    assert theme.styles["SummaryTitle"].fontName == CID_FONT_NAME
+
+
+def test_monthly_summary_pdf_uses_shared_theme(admin_client):
+    """受注月間表PDFが共有テーマで生成できること"""
+    response = admin_client.get("/reports/monthly-summary/pdf?year=2025")
+
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF-")
+    assert pdf_theme.styles["SummaryTitle"].fontName == pdf_theme.table_font_name
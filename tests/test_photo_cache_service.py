@@ -0,0 +1,78 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image as PILImage
+
+from app.services.photo_cache_service import photo_cache_service, PDF_PHOTO_SIZE
+
+
+def _save_rotated_jpeg(path, size=(2000, 1500)):
+    """EXIF Orientation=6（90度時計回り）のJPEGを作成"""
+    image = PILImage.new("RGB", size, (200, 30, 30))
+    exif = PILImage.Exif()
+    exif[274] = 6
+    image.save(path, "JPEG", exif=exif)
+
+
+def test_derivative_is_rotated_and_downsampled(app, tmp_path):
+    """派生画像は向き補正・縮小されていること"""
+    source = tmp_path / "photo.jpg"
+    _save_rotated_jpeg(source)
+
+    derivative = photo_cache_service.get_derivative_path(str(source))
+
+    with PILImage.open(derivative) as image:
+        width, height = image.size
+    assert width <= PDF_PHOTO_SIZE[0] and height <= PDF_PHOTO_SIZE[1]
+    # 横長の元画像が縦長に補正されている
+    assert height > width
+
+
+def test_derivative_is_reused_until_source_changes(app, tmp_path):
+    """元画像が変わらない限りキャッシュを再利用し、更新されたら作り直すこと"""
+    source = tmp_path / "photo.jpg"
+    _save_rotated_jpeg(source)
+
+    first = photo_cache_service.get_derivative_path(str(source))
+    first_mtime = os.stat(first).st_mtime_ns
+    assert photo_cache_service.get_derivative_path(str(source)) == first
+    assert os.stat(first).st_mtime_ns == first_mtime
+
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert photo_cache_service.get_derivative_path(str(source)) != first
+
+
+def test_concurrent_renders_of_same_photo(app, tmp_path):
+    """同じ写真を複数のスレッドが同時に生成しても、壊れた派生画像を作らないこと"""
+    source = tmp_path / "photo.jpg"
+    _save_rotated_jpeg(source)
+    cache_folder = tmp_path / "cache"
+    barrier = threading.Barrier(4)
+
+    def render():
+        barrier.wait()
+        return photo_cache_service.get_derivative_path(
+            str(source), cache_folder=str(cache_folder)
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        paths = set(executor.map(lambda _: render(), range(4)))
+
+    (derivative,) = paths
+    with PILImage.open(derivative) as image:
+        image.verify()
+    # 書き込み途中のファイルが残っていない
+    assert os.listdir(cache_folder) == [os.path.basename(derivative)]
+
+
+def test_discard_removes_derivative(app, tmp_path):
+    """元画像削除前のdiscardで派生画像も削除されること"""
+    source = tmp_path / "photo.jpg"
+    _save_rotated_jpeg(source)
+    derivative = photo_cache_service.get_derivative_path(str(source))
+
+    photo_cache_service.discard(str(source))
+
+    assert not os.path.exists(derivative)
@@ -0,0 +1,268 @@
+from datetime import date, datetime, timedelta
+
+from app import db
+from app.models.schedule import Schedule
+from app.models.schedule_exception import ScheduleException
+from app.services.email_service import EmailService
+from app.services.recurrence_service import occurrence_starts, recurrence_service
+
+
+JUNE = {"start": "2025-06-01", "end": "2025-06-30"}
+
+
+def create_recurring(start, recurrence_type="weekly", recurrence_end=None, **values):
+    schedule = Schedule(
+        title=values.pop("title", "定期点検"),
+        start_datetime=start,
+        end_datetime=start + timedelta(hours=2),
+        status="pending",
+        recurrence_type=recurrence_type,
+        recurrence_end=recurrence_end,
+        **values,
+    )
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule
+
+
+def test_monthly_occurrences_use_month_end():
+    """毎月の繰り返しは、その月にない日付を月末日にすること"""
+    starts = [
+        start
+        for _, start in occurrence_starts(
+            datetime(2024, 1, 31, 9),
+            "monthly",
+            None,
+            datetime(2024, 2, 1),
+            datetime(2024, 5, 1),
+        )
+    ]
+    assert starts == [
+        datetime(2024, 2, 29, 9),
+        datetime(2024, 3, 31, 9),
+        datetime(2024, 4, 30, 9),
+    ]
+
+
+def test_expand_only_requested_window(app):
+    """期間内の回だけを作成し、繰り返し終了日以降の回を含まないこと"""
+    schedule = create_recurring(
+        datetime(2020, 1, 6, 9), "weekly", recurrence_end=date(2025, 6, 16)
+    )
+
+    occurrences = recurrence_service.expand(
+        schedule, datetime(2025, 6, 1), datetime(2025, 7, 1)
+    )
+
+    assert [o.start_datetime for o in occurrences] == [
+        datetime(2025, 6, 2, 9),
+        datetime(2025, 6, 9, 9),
+        datetime(2025, 6, 16, 9),
+    ]
+    assert occurrences[0].end_datetime == datetime(2025, 6, 2, 11)
+    assert occurrences[0].id == schedule.id
+    assert occurrences[0].title == "定期点検"
+    assert Schedule.query.count() == 1
+
+
+def test_exceptions_cancel_move_and_complete(app):
+    """例外で取り消し・日時の変更・ステータスの変更ができること"""
+    schedule = create_recurring(datetime(2025, 6, 2, 9), "weekly")
+    recurrence_service.set_exception(schedule, date(2025, 6, 9), cancelled=True)
+    recurrence_service.set_exception(schedule, date(2025, 6, 16), status="completed")
+    # 7月の回を6月末に移動
+    recurrence_service.set_exception(
+        schedule,
+        date(2025, 7, 7),
+        start_datetime=datetime(2025, 6, 30, 13),
+        end_datetime=datetime(2025, 6, 30, 15),
+    )
+    db.session.commit()
+
+    occurrences = recurrence_service.occurrences_in_range(
+        datetime(2025, 6, 1), datetime(2025, 7, 1)
+    )
+    assert [(o.occurrence_date, o.start_datetime, o.status) for o in occurrences] == [
+        (date(2025, 6, 2), datetime(2025, 6, 2, 9), "pending"),
+        (date(2025, 6, 16), datetime(2025, 6, 16, 9), "completed"),
+        (date(2025, 6, 23), datetime(2025, 6, 23, 9), "pending"),
+        (date(2025, 6, 30), datetime(2025, 6, 30, 9), "pending"),
+        (date(2025, 7, 7), datetime(2025, 6, 30, 13), "pending"),
+    ]
+    assert occurrences[1].status_display == "完了"
+
+    july = recurrence_service.occurrences_in_range(
+        datetime(2025, 7, 1), datetime(2025, 7, 15)
+    )
+    assert [o.occurrence_date for o in july] == [date(2025, 7, 14)]
+
+
+def test_occurrence_moved_outside_series_is_found(admin_client):
+    """繰り返し終了日の後・1回目の前に移動した回も、移動先の期間で取得できること"""
+    schedule = create_recurring(
+        datetime(2025, 6, 2, 9), "weekly", recurrence_end=date(2025, 6, 16)
+    )
+    recurrence_service.set_exception(
+        schedule,
+        date(2025, 6, 16),
+        start_datetime=datetime(2025, 6, 20, 13),
+        end_datetime=datetime(2025, 6, 20, 15),
+    )
+    recurrence_service.set_exception(
+        schedule,
+        date(2025, 6, 2),
+        start_datetime=datetime(2025, 5, 30, 9),
+        end_datetime=datetime(2025, 5, 30, 11),
+    )
+    db.session.commit()
+
+    after_end = recurrence_service.occurrences_in_range(
+        datetime(2025, 6, 18), datetime(2025, 6, 25)
+    )
+    assert [(o.occurrence_date, o.start_datetime) for o in after_end] == [
+        (date(2025, 6, 16), datetime(2025, 6, 20, 13))
+    ]
+    before_first = recurrence_service.occurrences_in_range(
+        datetime(2025, 5, 26), datetime(2025, 6, 1)
+    )
+    assert [o.occurrence_date for o in before_first] == [date(2025, 6, 2)]
+
+    response = admin_client.get(
+        "/schedules/api/events",
+        query_string={"start": "2025-06-18", "end": "2025-06-25"},
+    )
+    assert [event["start"] for event in response.get_json()] == ["2025-06-20T13:00:00"]
+
+
+def test_events_api_expands_recurring_schedules(admin_client):
+    """イベントAPIが繰り返しの回を含め、回の取り消しでETagが変わること"""
+    schedule = create_recurring(
+        datetime(2025, 5, 26, 9), "weekly", recurrence_end=date(2025, 6, 20)
+    )
+    db.session.add(
+        Schedule(
+            title="単発",
+            start_datetime=datetime(2025, 6, 3, 10),
+            end_datetime=datetime(2025, 6, 3, 11),
+            status="pending",
+        )
+    )
+    db.session.commit()
+
+    response = admin_client.get("/schedules/api/events", query_string=JUNE)
+    events = response.get_json()
+    assert [(event["title"], event["start"]) for event in events] == [
+        ("定期点検", "2025-06-02T09:00:00"),
+        ("単発", "2025-06-03T10:00:00"),
+        ("定期点検", "2025-06-09T09:00:00"),
+        ("定期点検", "2025-06-16T09:00:00"),
+    ]
+    assert events[0]["id"] == schedule.id
+    assert events[0]["extendedProps"]["occurrence_date"] == "2025-06-02"
+    assert "occurrence_date" not in events[1]["extendedProps"]
+
+    etag = response.headers["ETag"]
+    response = admin_client.post(
+        f"/schedules/{schedule.id}/occurrences/2025-06-09/cancel"
+    )
+    assert response.status_code == 302
+
+    response = admin_client.get(
+        "/schedules/api/events", query_string=JUNE, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert [event["start"] for event in response.get_json()] == [
+        "2025-06-02T09:00:00",
+        "2025-06-03T10:00:00",
+        "2025-06-16T09:00:00",
+    ]
+
+
+def test_move_occurrence_keeps_series(admin_client):
+    """回を移動しても元のスケジュールは変わらず、その回だけが移動すること"""
+    schedule = create_recurring(datetime(2025, 6, 2, 9), "weekly")
+
+    response = admin_client.post(
+        "/schedules/api/move",
+        json={
+            "schedule_id": schedule.id,
+            "new_date": "2025-06-11",
+            "occurrence_date": "2025-06-09",
+        },
+    )
+
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert schedule.start_datetime == datetime(2025, 6, 2, 9)
+    exception = ScheduleException.query.one()
+    assert exception.occurrence_date == date(2025, 6, 9)
+    assert exception.start_datetime == datetime(2025, 6, 11, 9)
+    assert exception.end_datetime == datetime(2025, 6, 11, 11)
+
+
+def test_list_and_view_show_occurrences(admin_client):
+    """一覧画面に期間内の回が表示され、詳細画面で回を指定できること"""
+    schedule = create_recurring(datetime(2025, 1, 1, 9), "daily", title="毎日の巡回")
+
+    response = admin_client.get(
+        "/schedules/", query_string={"view": "list", "year": 2025, "month": 6}
+    )
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).count("?occurrence=2025-06-") == 30
+
+    response = admin_client.get(
+        f"/schedules/{schedule.id}", query_string={"occurrence": "2025-06-10"}
+    )
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert "2025年06月10日 09:00" in html
+    assert "この回のみ取り消し" in html
+
+
+def test_notifications_include_occurrences(app, monkeypatch):
+    """通知時刻になった繰り返しの回に通知を送ること"""
+    now = datetime.now()
+    # 昨日から毎日、今から30分後に開始（30分前に通知）
+    create_recurring(
+        now - timedelta(days=1) + timedelta(minutes=30),
+        "daily",
+        notification_enabled=True,
+        notification_minutes=30,
+    )
+
+    service = EmailService()
+    monkeypatch.setattr(service, "is_configured", lambda: True)
+    sent = []
+    monkeypatch.setattr(
+        service,
+        "send_schedule_notification",
+        lambda schedule, notification_type: sent.append(
+            (schedule.occurrence_date, notification_type)
+        )
+        or True,
+    )
+
+    assert service.check_and_send_notifications() == 1
+    assert sent == [((now + timedelta(minutes=30)).date(), "reminder")]
+
+
+def test_create_recurring_schedule_from_form(admin_client):
+    """作成画面から繰り返し設定付きのスケジュールを登録できること"""
+    response = admin_client.post(
+        "/schedules/create",
+        data={
+            "title": "月次点検",
+            "start_date": "2025-06-05",
+            "start_time": "10:00",
+            "end_date": "2025-06-05",
+            "end_time": "11:00",
+            "recurrence_type": "monthly",
+            "recurrence_end": "2025-12-31",
+        },
+    )
+
+    assert response.status_code == 302
+    schedule = Schedule.query.one()
+    assert schedule.recurrence_type == "monthly"
+    assert schedule.recurrence_end == date(2025, 12, 31)
+    assert schedule.is_recurring
@@ -0,0 +1,134 @@
+import warnings
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.exc import SAWarning
+
+from app import db
+from app.services.report_query_service import report_query_service
+
+
+@contextmanager
+def count_queries():
+    """ブロック内で実行されたSQLの件数を数える"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_list_page_query_count_does_not_depend_on_page_size(
+    admin_client, create_report_with_photos
+):
+    """報告書一覧のクエリ数がページ内の報告書数によらず一定であること"""
+    create_report_with_photos(pair_count=1)
+    with count_queries() as statements:
+        response = admin_client.get("/reports/")
+    assert response.status_code == 200
+    single_count = len(statements)
+
+    for _ in range(5):
+        create_report_with_photos(pair_count=1)
+    with count_queries() as statements:
+        response = admin_client.get("/reports/")
+    assert response.status_code == 200
+    assert len(statements) == single_count
+
+
+def test_attach_list_data_sets_work_dates_and_counts(app, create_report_with_photos):
+    """作業日・作業内容数・写真数がまとめて設定されること"""
+    with_photos = create_report_with_photos(pair_count=2)
+    without_photos = create_report_with_photos(pair_count=0)
+    db.session.expire_all()
+
+    reports = report_query_service.build_list_query(sort_by="id", order="asc").all()
+    with count_queries() as statements:
+        report_query_service.attach_list_data(reports)
+        customer_names = [report.property.customer.name for report in reports]
+
+    assert len(statements) == 3
+    assert customer_names == ["テスト顧客", "テスト顧客"]
+    assert [report.id for report in reports] == [with_photos.id, without_photos.id]
+    assert [len(report.work_dates) for report in reports] == [1, 1]
+    assert [report.work_detail_count for report in reports] == [1, 1]
+    assert [report.photo_count for report in reports] == [4, 0]
+
+
+def add_air_conditioner(report, quantity, total_amount):
+    """報告書の作業内容にエアコンを紐付ける"""
+    from app.models.air_conditioner import AirConditioner
+    from app.models.work_detail import WorkDetail
+
+    air_conditioner = AirConditioner(
+        property_id=report.property_id, quantity=quantity, total_amount=total_amount
+    )
+    db.session.add(air_conditioner)
+    db.session.flush()
+    db.session.add(
+        WorkDetail(
+            report_id=report.id,
+            property_id=report.property_id,
+            air_conditioner_id=air_conditioner.id,
+            description="エアコン洗浄",
+        )
+    )
+    db.session.commit()
+
+
+def test_order_details_rows_and_totals_use_grouped_queries(
+    app, create_report_with_photos
+):
+    """受注明細の行と総合計がGROUP BYの集計で計算されること"""
+    from app.routes.reports import build_order_details_query
+
+    first = create_report_with_photos(pair_count=0)
+    second = create_report_with_photos(pair_count=0)
+    add_air_conditioner(first, quantity=2, total_amount=16000)
+    add_air_conditioner(first, quantity=1, total_amount=None)
+    add_air_conditioner(second, quantity=3, total_amount=30000)
+    db.session.expire_all()
+
+    reports = build_order_details_query({"sort": "id", "order": "asc"}).all()
+    with count_queries() as statements:
+        order_details = report_query_service.load_order_details(reports)
+        customer_names = [detail["customer"].name for detail in order_details]
+    assert len(statements) == 3
+    assert customer_names == ["テスト顧客", "テスト顧客"]
+    assert [detail["ac_count"] for detail in order_details] == [3, 3]
+    assert [detail["total_amount"] for detail in order_details] == [16000, 30000]
+    assert [detail["work_detail_count"] for detail in order_details] == [3, 2]
+
+    # 集計のサブクエリ同士が結合条件なしで選択されていないこと（直積の警告が出ないこと）
+    with count_queries() as statements, warnings.catch_warnings():
+        warnings.simplefilter("error", SAWarning)
+        totals = report_query_service.compute_order_totals(
+            build_order_details_query({}, sort=False)
+        )
+    assert len(statements) == 1
+    assert totals == {
+        "total_reports": 2,
+        "total_ac_count": 6,
+        "total_work_details": 5,
+        "total_amount": 46000,
+        "unique_properties": 2,
+    }
+
+
+def test_order_details_pdf_downloads(admin_client, create_report_with_photos):
+    """受注明細PDFが作成されること"""
+    report = create_report_with_photos(pair_count=0)
+    add_air_conditioner(report, quantity=2, total_amount=16000)
+
+    response = admin_client.get(
+        "/reports/order-details/pdf", query_string={"search": "テスト"}
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/pdf"
+    assert response.data.startswith(b"%PDF-")
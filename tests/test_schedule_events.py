@@ -0,0 +1,165 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app import db
+from app.models.schedule import Schedule
+from app.models.customer import Customer
+from app.models.property import Property
+from tests.test_report_query_service import count_queries
+
+
+JUNE = {"start": "2025-06-01", "end": "2025-06-30"}
+
+
+def create_schedule(start, status="pending", title="点検", customer=None, prop=None):
+    schedule = Schedule(
+        title=title,
+        start_datetime=start,
+        end_datetime=start.replace(hour=start.hour + 1),
+        status=status,
+        customer=customer,
+        schedule_property=prop,
+    )
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule
+
+
+def test_events_require_range(admin_client):
+    """取得期間の指定がない・不正な場合はエラーになること"""
+    assert admin_client.get("/schedules/api/events").status_code == 400
+    response = admin_client.get(
+        "/schedules/api/events", query_string={"start": "2025-06-30", "end": "2025-06-01"}
+    )
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_events_in_range_include_end_date(admin_client):
+    """終了日の予定を含み、期間外・他ステータスの予定を含まないこと"""
+    create_schedule(datetime(2025, 5, 31, 10), title="期間外")
+    create_schedule(datetime(2025, 6, 1, 9), title="初日")
+    create_schedule(datetime(2025, 6, 30, 18), title="最終日")
+    create_schedule(datetime(2025, 6, 15, 9), status="completed", title="完了")
+
+    response = admin_client.get(
+        "/schedules/api/events",
+        query_string={"start": "2025-06-01", "end": "2025-06-31", "status": "pending"},
+    )
+
+    assert response.status_code == 200
+    assert [event["title"] for event in response.get_json()] == ["初日", "最終日"]
+    assert "X-Events-Range-End" not in response.headers
+
+
+def test_events_range_is_windowed(admin_client):
+    """上限日数を超える期間は開始日から上限日数までに制限されること"""
+    create_schedule(datetime(2025, 1, 10, 9), title="範囲内")
+    create_schedule(datetime(2025, 12, 10, 9), title="範囲外")
+
+    response = admin_client.get(
+        "/schedules/api/events",
+        query_string={"start": "2025-01-01T00:00:00+09:00", "end": "2026-01-01"},
+    )
+
+    assert response.status_code == 200
+    assert [event["title"] for event in response.get_json()] == ["範囲内"]
+    assert response.headers["X-Events-Range-End"] == "2025-03-04T00:00:00"
+
+
+def test_range_query_uses_start_status_index(app):
+    """期間・ステータスの絞り込みで複合インデックスが使われること"""
+    plan = db.session.execute(
+        text(
+            "EXPLAIN QUERY PLAN SELECT * FROM schedules "
+            "WHERE start_datetime >= :start AND start_datetime < :end AND status = :status"
+        ),
+        {"start": "2025-06-01", "end": "2025-07-01", "status": "pending"},
+    ).all()
+    assert any("ix_schedules_start_datetime_status" in row[-1] for row in plan)
+
+
+def create_customer_property(name):
+    customer = Customer(name=f"{name}様")
+    prop = Property(name=f"{name}ビル", customer=customer)
+    db.session.add_all([customer, prop])
+    db.session.commit()
+    return customer, prop
+
+
+def test_events_query_count_does_not_depend_on_event_count(admin_client):
+    """顧客名・物件名を含めてもクエリ数がイベント数によらず一定であること"""
+    customer, prop = create_customer_property("山田")
+    create_schedule(datetime(2025, 6, 2, 9), customer=customer, prop=prop)
+    # ログイン中のユーザーの権限をキャッシュしてから比較する
+    admin_client.get("/schedules/api/events", query_string=JUNE)
+    with count_queries() as statements:
+        response = admin_client.get("/schedules/api/events", query_string=JUNE)
+    single_count = len(statements)
+
+    for day in range(3, 9):
+        customer, prop = create_customer_property(f"顧客{day}")
+        create_schedule(datetime(2025, 6, day, 9), customer=customer, prop=prop)
+    with count_queries() as statements:
+        response = admin_client.get("/schedules/api/events", query_string=JUNE)
+
+    events = response.get_json()
+    assert len(events) == 7
+    assert events[0]["extendedProps"]["customer_name"] == "山田様"
+    assert events[0]["extendedProps"]["property_name"] == "山田ビル"
+    assert events[0]["backgroundColor"] == "#ffc107"
+    assert len(statements) == single_count
+
+
+def test_events_not_modified_until_changed(admin_client):
+    """変更がなければ304を返し、予定・物件名の変更後は新しい内容を返すこと"""
+    customer, prop = create_customer_property("佐藤")
+    schedule = create_schedule(datetime(2025, 6, 10, 9), customer=customer, prop=prop)
+
+    response = admin_client.get("/schedules/api/events", query_string=JUNE)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert b": " not in response.data and b", " not in response.data
+
+    headers = {"If-None-Match": etag}
+    response = admin_client.get(
+        "/schedules/api/events", query_string=JUNE, headers=headers
+    )
+    assert response.status_code == 304
+    assert response.data == b""
+
+    # 他のステータスの絞り込みでは別のETagになる
+    response = admin_client.get(
+        "/schedules/api/events",
+        query_string={**JUNE, "status": "completed"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+    schedule.title = "再点検"
+    db.session.commit()
+    response = admin_client.get(
+        "/schedules/api/events", query_string=JUNE, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.get_json()[0]["title"] == "再点検"
+
+    headers = {"If-None-Match": response.headers["ETag"]}
+    prop.name = "佐藤マンション"
+    db.session.commit()
+    response = admin_client.get(
+        "/schedules/api/events", query_string=JUNE, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.get_json()[0]["extendedProps"]["property_name"] == "佐藤マンション"
+
+    db.session.delete(schedule)
+    db.session.commit()
+    response = admin_client.get(
+        "/schedules/api/events",
+        query_string=JUNE,
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 200
+    assert response.get_json() == []
@@ -0,0 +1,61 @@
+import time
+
+from app import create_app, db
+from app.services.email_service import email_service
+from app.services.scheduler_service import SchedulerService
+
+
+# 計測する通知チェックの回数
+TICKS = 20
+
+
+def test_job_reuses_app_without_creating_engines(app, tmp_path, monkeypatch):
+    """通知チェックが設定済みのアプリケーションを使い、1回あたりの処理が軽いこと"""
+    monkeypatch.setattr(email_service, "is_configured", lambda: True)
+    service = SchedulerService()
+    service.init_app(app)
+
+    created_engines = []
+    original_make_engine = db._make_engine
+
+    def make_engine(*args, **kwargs):
+        engine = original_make_engine(*args, **kwargs)
+        created_engines.append(engine)
+        return engine
+
+    monkeypatch.setattr(db, "_make_engine", make_engine)
+
+    service._check_notifications_job()  # 初回の接続を除くため計測しない
+    started = time.perf_counter()
+    for _ in range(TICKS):
+        service._check_notifications_job()
+    tick_time = (time.perf_counter() - started) / TICKS
+
+    assert created_engines == []
+
+    # 以前のようにアプリケーションを作り直す場合の処理時間と比較
+    started = time.perf_counter()
+    create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'other.db'}",
+            "UPLOAD_FOLDER": str(tmp_path / "other_uploads"),
+        }
+    )
+    create_time = time.perf_counter() - started
+
+    assert len(created_engines) == 1
+    assert tick_time < create_time
+
+
+def test_job_without_app_is_skipped(monkeypatch):
+    """アプリケーションが設定されていない場合は何もしないこと"""
+    called = []
+    monkeypatch.setattr(
+        email_service, "check_and_send_notifications", lambda: called.append(True)
+    )
+
+    SchedulerService()._check_notifications_job()
+
+    assert called == []
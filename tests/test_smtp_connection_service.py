@@ -0,0 +1,242 @@
+import base64
+import smtplib
+import socketserver
+import threading
+import time
+from email.message import EmailMessage
+
+import pytest
+
+from app.services.email_service import EmailService
+from app.services.smtp_connection_service import SMTPConnectionManager
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """テスト用SMTPサーバーの1接続分の処理（EHLO・AUTH PLAIN・送信のみ対応）"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections.append(self.connection)
+        self.reply("220 localhost ESMTP")
+        envelope = {}
+        while True:
+            try:
+                line = self.rfile.readline()
+            except OSError:
+                return
+            if not line:
+                return
+            command = line.decode("ascii").rstrip("\r\n")
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                _, username, password = (
+                    base64.b64decode(command.split()[2]).decode().split("\0")
+                )
+                server.logins.append((username, password))
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                envelope = {"from": command[10:].strip("<>"), "to": []}
+                server.mail_commands += 1
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                address = command[8:].strip("<>")
+                if address.startswith("unknown"):
+                    self.reply("550 5.1.1 User unknown")
+                    continue
+                envelope["to"].append(address)
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    line = self.rfile.readline()
+                    if line in (b".\r\n", b""):
+                        break
+                    data.append(line)
+                envelope["data"] = b"".join(data)
+                server.messages.append(envelope)
+                self.reply("250 OK")
+            elif verb in ("NOOP", "RSET"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """接続数・ログイン・受信したメールを記録するテスト用SMTPサーバー"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = []
+        self.logins = []
+        self.messages = []
+        self.mail_commands = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def drop_connections(self):
+        """サーバー側から全ての接続を切断する"""
+        with self.lock:
+            for connection in self.connections:
+                try:
+                    connection.shutdown(2)
+                except OSError:
+                    pass
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_manager(server, **options):
+    return SMTPConnectionManager(
+        "127.0.0.1",
+        server.port,
+        use_tls=False,
+        username="user",
+        password="secret",
+        timeout=5,
+        **options,
+    )
+
+
+def make_message(number):
+    message = EmailMessage()
+    message["From"] = "system@example.com"
+    message["To"] = f"user{number}@example.com"
+    message["Subject"] = f"通知 {number}"
+    message.set_content("本文")
+    return message
+
+
+def test_session_is_reused_across_sends(smtp_server):
+    """複数のメールを1回の接続・ログインで送信すること"""
+    manager = make_manager(smtp_server)
+
+    for number in range(5):
+        manager.send(make_message(number))
+
+    assert manager.connect_count == 1
+    assert len(smtp_server.connections) == 1
+    assert smtp_server.logins == [("user", "secret")]
+    assert [message["to"] for message in smtp_server.messages] == [
+        [f"user{number}@example.com"] for number in range(5)
+    ]
+    manager.close()
+
+
+def test_reconnects_when_server_drops_connection(smtp_server):
+    """サーバーに切断された接続は接続し直して再送すること"""
+    manager = make_manager(smtp_server)
+    manager.send(make_message(1))
+
+    smtp_server.drop_connections()
+    manager.send(make_message(2))
+
+    assert manager.connect_count == 2
+    assert len(smtp_server.messages) == 2
+    assert len(smtp_server.logins) == 2
+    manager.close()
+
+
+def test_rejected_recipient_is_not_resent(smtp_server):
+    """送信先が拒否された場合は接続し直して再送せず、エラーにすること"""
+    manager = make_manager(smtp_server)
+    message = make_message(1)
+    message.replace_header("To", "unknown@example.com")
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        manager.send(message)
+
+    assert smtp_server.mail_commands == 1
+    assert manager.connect_count == 1
+    assert len(smtp_server.connections) == 1
+
+    # 接続はそのまま次の送信に使う
+    manager.send(make_message(2))
+    assert manager.connect_count == 1
+    assert len(smtp_server.messages) == 1
+    manager.close()
+
+
+def test_idle_and_message_limits_reconnect(smtp_server):
+    """アイドル時間・1接続あたりの送信数の上限を過ぎた接続は閉じること"""
+    manager = make_manager(
+        smtp_server, idle_timeout=0.05, max_messages_per_connection=2
+    )
+
+    manager.send(make_message(1))
+    time.sleep(0.1)
+    assert manager.close_idle()
+    assert not manager.is_connected
+
+    for number in range(4):
+        manager.send(make_message(number))
+    # アイドル後の1回目と、上限の2通ごと
+    assert manager.connect_count == 3
+
+    # バッチ中は上限を過ぎても接続を閉じず、バッチの後の送信で接続し直す
+    with manager.batch():
+        for number in range(4):
+            manager.send(make_message(number))
+    assert manager.connect_count == 3
+    manager.send(make_message(5))
+    assert manager.connect_count == 4
+    manager.close()
+
+
+def test_send_messages_batches_in_one_session(smtp_server):
+    """まとめて送信したメールが1つの接続で送信されること"""
+    manager = make_manager(smtp_server)
+
+    assert manager.send_messages([make_message(number) for number in range(10)]) == 10
+    assert manager.connect_count == 1
+    assert len(smtp_server.messages) == 10
+    manager.close()
+
+
+def test_email_service_uses_persistent_connection(smtp_server):
+    """EmailServiceのメール送信が接続を使い回し、設定の変更で接続し直すこと"""
+    service = EmailService()
+    service.smtp_server = "127.0.0.1"
+    service.smtp_port = smtp_server.port
+    service.use_tls = False
+    service.username = "user"
+    service.password = "secret"
+    service.default_sender = "system@example.com"
+    service.enabled = True
+
+    for number in range(3):
+        assert service.send_email(
+            [f"user{number}@example.com"], "件名", "<p>本文</p>", "本文"
+        )
+    assert service.connection.connect_count == 1
+    assert len(smtp_server.messages) == 3
+
+    service.password = "changed"
+    assert service.send_email(["user@example.com"], "件名", "<p>本文</p>")
+    assert smtp_server.logins[-1] == ("user", "changed")
+    service.connection.close()
@@ -0,0 +1,121 @@
+from datetime import date, time
+
+from app import db
+from app.models.customer import Customer
+from app.models.property import Property
+from app.models.report import Report
+from app.models.work_time import WorkTime
+from app.models.work_detail import WorkDetail
+from app.models.air_conditioner import AirConditioner
+from app.services.summary_service import summary_service
+
+
+def create_order(reception_type, status, work_date, quantity=1, total_amount=None):
+    """受付種別・ステータス・作業日を指定して報告書を作成"""
+    customer = Customer(name="集計顧客")
+    db.session.add(customer)
+    db.session.flush()
+    property_obj = Property(
+        name="集計物件", customer_id=customer.id, reception_type=reception_type
+    )
+    db.session.add(property_obj)
+    db.session.flush()
+    report = Report(date=work_date, property_id=property_obj.id, status=status)
+    db.session.add(report)
+    db.session.flush()
+    air_conditioner = AirConditioner(
+        property_id=property_obj.id, quantity=quantity, total_amount=total_amount
+    )
+    db.session.add(air_conditioner)
+    db.session.flush()
+    db.session.add_all(
+        [
+            WorkTime(
+                report_id=report.id,
+                property_id=property_obj.id,
+                work_date=work_date,
+                start_time=time(9, 0),
+                end_time=time(12, 0),
+            ),
+            WorkDetail(
+                report_id=report.id,
+                property_id=property_obj.id,
+                air_conditioner_id=air_conditioner.id,
+                description="エアコン洗浄",
+            ),
+        ]
+    )
+    db.session.commit()
+    return report
+
+
+def create_orders():
+    create_order("個人", "completed", date(2025, 1, 10), quantity=2, total_amount=20000)
+    create_order("個人", "pending", date(2025, 1, 20), quantity=1, total_amount=None)
+    create_order("法人", "draft", date(2025, 3, 5), quantity=3, total_amount=45000)
+    create_order("法人", "cancelled", date(2025, 3, 6), quantity=5, total_amount=50000)
+    create_order("法人", "completed", date(2024, 12, 31), quantity=4, total_amount=40000)
+
+
+def test_count_summary_pivots_grouped_rows(app):
+    """件数ベースの集計が月・受付種別・完了状況ごとに振り分けられること"""
+    create_orders()
+
+    summary = summary_service.build_monthly_summary(2025, "count")
+
+    assert summary["reception_types"] == ["個人", "法人"]
+    january = summary["monthly_data"][0]
+    assert january["reception_types"]["個人"] == {
+        "completed": 1,
+        "pending": 1,
+        "total": 2,
+    }
+    assert january["totals"] == {"completed": 1, "pending": 1, "total": 2}
+    march = summary["monthly_data"][2]
+    # キャンセルは集計対象外、下書きは未完了として集計
+    assert march["reception_types"]["法人"] == {"completed": 0, "pending": 1, "total": 1}
+    assert summary["reception_type_totals"]["法人"]["total"] == 1
+    assert summary["grand_totals"] == {"completed": 1, "pending": 2, "total": 3}
+
+
+def test_quantity_and_amount_summaries(app):
+    """台数・金額ベースの集計値が合計されること"""
+    create_orders()
+
+    quantity = summary_service.build_monthly_summary(2025, "quantity")
+    assert quantity["monthly_data"][0]["reception_types"]["個人"] == {
+        "completed": 2,
+        "pending": 1,
+        "total": 3,
+    }
+    assert quantity["grand_totals"]["total"] == 6
+
+    amount = summary_service.build_monthly_summary(2025, "amount")
+    assert amount["monthly_data"][0]["reception_types"]["個人"]["total"] == 20000
+    assert amount["reception_type_totals"]["法人"]["pending"] == 45000
+    assert amount["grand_totals"] == {"completed": 20000, "pending": 45000, "total": 65000}
+
+
+def test_summary_uses_one_aggregate_query(app):
+    """受付種別の取得と集計済みデータの読み込みの2回のクエリで1年分の表を作成すること"""
+    from tests.test_report_query_service import count_queries
+
+    create_orders()
+    with count_queries() as statements:
+        summary_service.build_monthly_summary(2025, "count")
+    assert len(statements) == 2
+
+
+def test_monthly_summary_pdf_downloads(admin_client):
+    """受注月間表PDFが集計サービスの結果から作成されること"""
+    create_orders()
+
+    response = admin_client.get(
+        "/reports/monthly-summary/pdf", query_string={"year": 2025, "type": "amount"}
+    )
+
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF-")
+    assert admin_client.get(
+        "/reports/monthly-summary", query_string={"year": 2025}
+    ).status_code == 200
@@ -0,0 +1,69 @@
+from app import db
+from app.models.user import User
+from tests.test_report_query_service import count_queries
+
+
+def create_user(username, role="viewer"):
+    user = User(username=username, email=f"{username}@example.com", role=role)
+    user.set_password("password")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def login(client, user):
+    with client.session_transaction() as session:
+        session["user_id"] = user.id
+
+
+def user_queries(statements):
+    return sum("FROM users" in statement for statement in statements)
+
+
+def test_protected_request_looks_up_user_at_most_once(admin_client):
+    """保護された画面ではユーザーの検索がリクエストごとに1回以下であること"""
+    with count_queries() as statements:
+        response = admin_client.get("/auth/admin/users")
+    assert response.status_code == 200
+    assert user_queries(statements) == 2  # ログイン中のユーザー・ユーザー一覧
+
+    # 権限がキャッシュされていれば、ユーザーを使わないAPIでは検索しない
+    db.session.expire_all()
+    with count_queries() as statements:
+        response = admin_client.get("/notifications/api/status")
+    assert response.status_code == 200
+    assert user_queries(statements) == 0
+
+
+def test_disabled_user_is_rejected_immediately(app, admin_client):
+    """ユーザーを無効にすると、キャッシュの期限を待たずにアクセスできなくなること"""
+    staff = create_user("staff")
+    staff_client = app.test_client()
+    login(staff_client, staff)
+    assert staff_client.get("/notifications/api/status").status_code == 200
+
+    admin_client.get(f"/auth/admin/users/{staff.id}/toggle")
+
+    response = staff_client.get("/notifications/api/status")
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/auth/login")
+
+
+def test_role_change_applies_immediately(app, admin_client):
+    """権限を変更すると、次のリクエストから新しい権限で確認すること"""
+    staff = create_user("staff")
+    staff_client = app.test_client()
+    login(staff_client, staff)
+    assert staff_client.get("/auth/admin/users").status_code == 302
+
+    admin_client.post(
+        f"/auth/admin/users/{staff.id}/edit",
+        data={
+            "username": "staff",
+            "email": "staff@example.com",
+            "name": "staff",
+            "role": "admin",
+        },
+    )
+
+    assert staff_client.get("/auth/admin/users").status_code == 200